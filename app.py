@@ -1,20 +1,23 @@
 import streamlit as st
-import cv2
-import mediapipe as mp
-import numpy as np
 from datetime import datetime
-import pandas as pd
 import time
-import plotly.express as px
-import plotly.graph_objects as go
 import sys
 import os
 
 # Add utils to path
 sys.path.append(os.path.dirname(__file__))
+# Only light modules load at startup; cv2/mediapipe, pandas/plotly and
+# streamlit-webrtc are imported by the view or singleton that needs them
+from utils.attention import AttentionStateMachine, DISTRACTED, FOCUSED, GRACE, PAUSED, is_attentive
+from utils.checkpoint import (CheckpointStore, build_checkpoint, finalize_orphans, restore_attention,
+                              session_from_checkpoint)
 from utils.data_manager import DataManager
+from utils.metrics import metrics
+from utils.run_meter import RunMeter
 import config
 
+script_started = time.perf_counter()
+
 # Page configuration
 st.set_page_config(
     page_title=config.APP_TITLE,
@@ -23,28 +26,241 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize MediaPipe
-mp_face_detection = mp.solutions.face_detection
-mp_drawing = mp.solutions.drawing_utils
+# Script executions and server CPU, shared by every browser session
+@st.cache_resource
+def get_run_meter():
+    return RunMeter()
+
+run_meter = get_run_meter()
+run_meter.record_run()
+
+# Metrics file writer / Prometheus endpoint, started once per server
+@st.cache_resource
+def start_metrics_export():
+    if config.METRICS_FILE:
+        metrics.start_file_export(config.METRICS_FILE)
+    if config.METRICS_PORT:
+        metrics.serve_prometheus(config.METRICS_PORT)
+    return metrics
+
+start_metrics_export()
+
+def show_diagnostics(placeholder):
+    """Render rolling timer percentiles and counters into a sidebar placeholder"""
+    if not metrics.enabled or not st.session_state.get("show_diagnostics"):
+        return
+    snapshot = metrics.snapshot()
+    rows = [
+        f"| {name} | {timer['count']} | {timer['p50_ms']:.1f} | {timer['p95_ms']:.1f} | {timer['p99_ms']:.1f} |"
+        for name, timer in sorted(snapshot["timers"].items())
+    ]
+    counters = ", ".join(f"{name}: {value}" for name, value in sorted(snapshot["counters"].items()))
+    placeholder.markdown(
+        "| Timer | n | p50 ms | p95 ms | p99 ms |\n|---|---:|---:|---:|---:|\n" + "\n".join(rows)
+        + (f"\n\n**Counters:** {counters}" if counters else "")
+        if rows or counters else "No samples yet"
+    )
+
+# Detection engine is shared across reruns and browser sessions so the
+# camera and model stay open; it is only built once monitoring is first needed
+@st.cache_resource
+def get_detection_engine():
+    from utils.detection_scheduler import DetectionScheduler
+    from utils.engine_clients import EngineHub
+    scheduler = DetectionScheduler() if config.ADAPTIVE_DETECTION else None
+    if config.ENGINE_BACKEND == "processes":
+        # Capture and inference run in their own processes, off this one's GIL
+        from utils.shared_frames import SharedFrameDetector
+        return EngineHub(SharedFrameDetector(source=config.FRAME_SOURCE, scheduler=scheduler))
+    from utils.detection_engine import DetectionEngine
+    return EngineHub(DetectionEngine(source=config.FRAME_SOURCE, scheduler=scheduler))
+
+def get_engine_client():
+    """This browser session's hold on the shared engine, with its own result queue"""
+    if "engine_client" not in st.session_state:
+        st.session_state.engine_client = get_detection_engine().client()
+    return st.session_state.engine_client
+
+def create_video_processor():
+    from utils.detection_scheduler import DetectionScheduler
+    from utils.webrtc_monitor import AttentionVideoProcessor
+    return AttentionVideoProcessor(DetectionScheduler() if config.ADAPTIVE_DETECTION else None)
+
+# streamlit-webrtc module, or None when it is not installed
+@st.cache_resource
+def get_webrtc():
+    try:
+        import streamlit_webrtc
+    except ImportError:
+        return None
+    return streamlit_webrtc
+
+webrtc = get_webrtc() if config.MONITOR_MODE == "webrtc" else None
+use_webrtc = webrtc is not None
+
+# Data manager is shared across reruns so its read cache stays warm
+@st.cache_resource
+def get_data_manager():
+    return DataManager()
 
-# Initialize Data Manager
-data_manager = DataManager()
+data_manager = get_data_manager()
+
+# Small per-session checkpoint files; the history is only written on End
+@st.cache_resource
+def get_checkpoints():
+    return CheckpointStore()
+
+checkpoints = get_checkpoints()
+
+# Analytics frames are rebuilt only when the stored data changes; the
+# result is shared read-only between reruns and browser sessions
+@st.cache_resource(max_entries=2)
+def get_analytics(data_version):
+    from utils import analytics
+    return analytics.build_analytics(data_manager.get_all_sessions())
+
+def show_session_history():
+    """Paginated Session History with a date filter and a streaming export"""
+    from utils import analytics
+    from utils.export import available_formats, prune_exports
+
+    col_from, col_to, col_format, col_export = st.columns([2, 2, 1, 1])
+    start_date = col_from.date_input("From", value=None, key="history_from")
+    end_date = col_to.date_input("To", value=None, key="history_to")
+    export_format = col_format.selectbox("Format", available_formats(), key="history_format")
+
+    # Cursors of the pages visited so far; a new filter starts from the newest page
+    if st.session_state.get("history_filter") != (start_date, end_date):
+        st.session_state.history_filter = (start_date, end_date)
+        st.session_state.history_cursors = [None]
+    cursors = st.session_state.history_cursors
+    sessions, next_cursor = data_manager.get_sessions_page(cursors[-1], config.HISTORY_PAGE_SIZE,
+                                                           start_date, end_date)
+    total = data_manager.count_sessions(start_date, end_date)
+    st.dataframe(analytics.format_history(analytics.sessions_frame(sessions)),
+                 use_container_width=True, hide_index=True)
+
+    col_newer, col_page, col_older = st.columns([1, 4, 1])
+    if col_newer.button("◀ Newer", disabled=len(cursors) == 1, use_container_width=True):
+        cursors.pop()
+        st.rerun()
+    pages = max(1, -(-total // config.HISTORY_PAGE_SIZE))
+    col_page.caption(f"Page {len(cursors)} of {pages} · {total} sessions")
+    if col_older.button("Older ▶", disabled=next_cursor is None, use_container_width=True):
+        cursors.append(next_cursor)
+        st.rerun()
+
+    if col_export.button("⬇️ Export", use_container_width=True):
+        path = os.path.join(config.EXPORT_DIR, f"sessions-{datetime.now():%Y%m%d-%H%M%S}.{export_format}")
+        count = data_manager.export_sessions(path, export_format, start_date, end_date)
+        if count is None:
+            st.error("Export failed")
+            st.session_state.history_export = None
+        else:
+            st.session_state.history_export = path
+            prune_exports(config.EXPORT_DIR, config.EXPORT_KEEP)
+            st.success(f"Exported {count} sessions to {path}")
+    export_path = st.session_state.get("history_export")
+    if export_path and os.path.exists(export_path):
+        with open(export_path, "rb") as f:
+            st.download_button("💾 Download export", f, file_name=os.path.basename(export_path))
 
 # Initialize session state
 if 'study_start_time' not in st.session_state:
     st.session_state.study_start_time = None
 if 'session_duration' not in st.session_state:
     st.session_state.session_duration = 0
-if 'distraction_count' not in st.session_state:
-    st.session_state.distraction_count = 0
 if 'is_studying' not in st.session_state:
     st.session_state.is_studying = False
-if 'last_face_time' not in st.session_state:
-    st.session_state.last_face_time = time.time()
-if 'focus_time' not in st.session_state:
-    st.session_state.focus_time = 0
-if 'last_alert_time' not in st.session_state:
-    st.session_state.last_alert_time = 0
+if 'attention' not in st.session_state:
+    st.session_state.attention = None
+if 'timeline' not in st.session_state:
+    st.session_state.timeline = None
+if 'session_key' not in st.session_state:
+    st.session_state.session_key = None
+if 'last_checkpoint' not in st.session_state:
+    st.session_state.last_checkpoint = 0.0
+if 'checkpoint_saved' not in st.session_state:
+    st.session_state.checkpoint_saved = False
+
+# Once per browser session: sessions orphaned too long ago to resume are saved
+if 'orphans_checked' not in st.session_state:
+    st.session_state.orphans_checked = True
+    recovered = finalize_orphans(checkpoints, data_manager, exclude=(st.session_state.session_key,))
+    if recovered:
+        st.toast(f"💾 Saved {len(recovered)} unfinished session(s) from earlier")
+
+def checkpoint_session(now=None):
+    """Checkpoint the running session (and flush its timeline)
+
+    Returns False if the session's checkpoint was claimed elsewhere (the
+    session was resumed or saved from another tab) and must not continue.
+    """
+    now = now or time.time()
+    key = st.session_state.session_key
+    if st.session_state.checkpoint_saved and not checkpoints.exists(key):
+        return False
+    timeline = st.session_state.timeline
+    if timeline is not None:
+        timeline.flush()
+    checkpoints.save(build_checkpoint(
+        key, st.session_state.study_start_time, st.session_state.attention,
+        timeline.key if timeline is not None else None, now
+    ))
+    st.session_state.last_checkpoint = now
+    st.session_state.checkpoint_saved = True
+    return True
+
+def reset_session():
+    """Forget the current session without saving it"""
+    timeline = st.session_state.timeline
+    if timeline is not None:
+        timeline.close()
+    st.session_state.timeline = None
+    st.session_state.is_studying = False
+    st.session_state.attention = None
+    st.session_state.session_key = None
+    st.session_state.checkpoint_saved = False
+    if not use_webrtc:
+        get_engine_client().stop()
+
+def abandon_session():
+    """Drop a session that was taken over in another tab"""
+    reset_session()
+    st.toast("⚠️ This session was resumed or saved from another tab, so it was closed here")
+
+def finish_session():
+    """Save the running session, drop its checkpoint and reset the session state
+
+    Returns (duration, focus score), or None if another tab took the session over.
+    """
+    # Claiming our own checkpoint makes sure no other tab has saved this session
+    if st.session_state.checkpoint_saved and checkpoints.claim(st.session_state.session_key) is None:
+        abandon_session()
+        return None
+    now = time.time()
+    attention = st.session_state.attention
+    # Paused time is not study time
+    session_duration = int(now - st.session_state.study_start_time - attention.paused_time(now))
+    focus_score = attention.focus_score()
+    
+    session_data = {
+        "start_time": datetime.fromtimestamp(st.session_state.study_start_time).isoformat(),
+        "end_time": datetime.now().isoformat(),
+        "duration": session_duration,
+        "distractions": attention.distraction_count,
+        "focus_score": focus_score
+    }
+    
+    timeline = st.session_state.timeline
+    if timeline is not None:
+        timeline.close()
+        session_data["timeline"] = timeline.key
+        st.session_state.timeline = None
+    
+    data_manager.add_session(session_data)
+    reset_session()
+    return session_duration, focus_score
 
 # Custom CSS
 st.markdown("""
@@ -119,6 +335,10 @@ st.markdown("""
         background-color: #ff6b6b;
         color: white;
     }
+    .status-grace {
+        background-color: #fcc419;
+        color: white;
+    }
     .camera-frame {
         border: 3px solid #667eea;
         border-radius: 15px;
@@ -151,14 +371,10 @@ with st.sidebar:
     
     st.header("📊 Session Overview")
     
-    if st.session_state.is_studying:
-        elapsed = int(time.time() - st.session_state.study_start_time)
-        st.metric("⏱️ Session Time", f"{elapsed // 60}m {elapsed % 60}s")
-        st.metric("🎯 Distractions", st.session_state.distraction_count)
-        
-        focus_score = max(0, 100 - (st.session_state.distraction_count * config.DISTRACTION_PENALTY))
-        st.metric("⭐ Focus Score", f"{focus_score}%")
-    else:
+    # Filled in by the live monitoring loop while a session is running
+    overview_placeholder = st.empty()
+    
+    if not st.session_state.is_studying:
         stats = data_manager.get_statistics()
         st.metric("📚 Total Sessions", stats['total_sessions'])
         st.metric("⏰ Total Study Time", f"{stats['total_study_time'] // 60} min")
@@ -174,61 +390,123 @@ with st.sidebar:
     - Stay hydrated 💧
     """)
     
+    st.divider()
+    
+    # Collection is process-wide and set by METRICS_ENABLED; the checkbox
+    # only shows the panel in this browser session
+    show_metrics = st.checkbox("🩺 Diagnostics", key="show_diagnostics",
+                               help="Capture, detection, storage and script run times")
+    diagnostics_placeholder = st.empty()
+    if show_metrics and metrics.enabled:
+        st.caption(f"Exported to {config.METRICS_FILE or 'no file'}"
+                   + (f" and :{config.METRICS_PORT}/metrics" if config.METRICS_PORT else ""))
+    elif show_metrics:
+        st.caption("Metrics collection is off (set METRICS_ENABLED in config.py)")
+    
     if st.button("🗑️ Clear All Data", type="secondary"):
         if st.button("⚠️ Confirm Clear", type="primary"):
             data_manager.clear_all_data()
             st.success("Data cleared!")
             st.rerun()
 
-# Main content area
-tab1, tab2, tab3 = st.tabs(["🎯 Study Session", "📊 Analytics", "ℹ️ About"])
+# Main content area. Only the selected view is built, so Analytics work
+# (and its pandas/plotly imports) happens only when it is opened
+STUDY_VIEW, ANALYTICS_VIEW, ABOUT_VIEW = "🎯 Study Session", "📊 Analytics", "ℹ️ About"
+view = st.radio("View", [STUDY_VIEW, ANALYTICS_VIEW, ABOUT_VIEW],
+                horizontal=True, label_visibility="collapsed", key="view")
 
-with tab1:
+if view == STUDY_VIEW:
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.subheader("📹 Live Monitoring")
         
+        webrtc_ctx = None
+        if use_webrtc:
+            # Frames go browser -> detection thread -> browser; the script only polls results
+            webrtc_ctx = webrtc.webrtc_streamer(
+                key="study-monitor",
+                mode=webrtc.WebRtcMode.SENDRECV,
+                video_processor_factory=create_video_processor,
+                media_stream_constraints={"video": True, "audio": False},
+                async_processing=True
+            )
+        
         camera_placeholder = st.empty()
         
+        # A session left behind by a crash or a closed tab can be picked up again
+        if not st.session_state.is_studying and st.session_state.attention is None:
+            orphans = checkpoints.orphans(exclude=(st.session_state.session_key,))
+            if orphans:
+                record = orphans[-1]
+                minutes = int(record.get("duration", record["elapsed"])) // 60
+                started = datetime.fromtimestamp(record["started_at"]).strftime("%b %d, %H:%M")
+                st.warning(f"Unfinished session from {started} ({minutes} min, "
+                           f"{record['attention']['distraction_count']} distractions)")
+                resume_col, save_col = st.columns(2)
+                if resume_col.button("↩️ Resume Session", use_container_width=True):
+                    record = checkpoints.claim(record["key"])
+                    if record is not None:
+                        st.session_state.session_key = record["key"]
+                        st.session_state.attention = restore_attention(record)
+                        st.session_state.study_start_time = record["started_at"]
+                        st.session_state.checkpoint_saved = False
+                        if record.get("timeline"):
+                            from utils.timeline import TimelineRecorder
+                            st.session_state.timeline = TimelineRecorder(record["timeline"])
+                        checkpoint_session()
+                    st.rerun()
+                if save_col.button("💾 Save and Close", use_container_width=True):
+                    record = checkpoints.claim(record["key"])
+                    if record is not None:
+                        data_manager.add_session(session_from_checkpoint(record))
+                    st.rerun()
+        
         # Control buttons
         btn_col1, btn_col2, btn_col3 = st.columns(3)
         
         with btn_col1:
             if not st.session_state.is_studying:
                 if st.button("▶️ Start Session", use_container_width=True, type="primary"):
+                    attention = st.session_state.attention
+                    if attention is not None and attention.state == PAUSED:
+                        if st.session_state.checkpoint_saved and not checkpoints.exists(st.session_state.session_key):
+                            abandon_session()
+                            st.rerun()
+                        attention.resume(time.time())
+                    else:
+                        st.session_state.study_start_time = time.time()
+                        st.session_state.attention = AttentionStateMachine(distraction_threshold)
+                        session_key = datetime.now().strftime("%Y%m%d-%H%M%S-") + os.urandom(3).hex()
+                        st.session_state.session_key = session_key
+                        st.session_state.checkpoint_saved = False
+                        if config.TIMELINE_ENABLED:
+                            from utils.timeline import TimelineRecorder
+                            st.session_state.timeline = TimelineRecorder(session_key)
                     st.session_state.is_studying = True
-                    st.session_state.study_start_time = time.time()
-                    st.session_state.distraction_count = 0
-                    st.session_state.focus_time = 0
+                    st.session_state.last_checkpoint = 0.0
                     st.rerun()
         
         with btn_col2:
             if st.session_state.is_studying:
                 if st.button("⏸️ Pause", use_container_width=True):
                     st.session_state.is_studying = False
+                    st.session_state.attention.pause(time.time())
+                    if not checkpoint_session():
+                        abandon_session()
+                        st.rerun()
+                    if not use_webrtc:
+                        get_engine_client().stop()
                     st.info("Session paused. Click Start to resume.")
         
         with btn_col3:
             if st.session_state.is_studying:
                 if st.button("⏹️ End Session", use_container_width=True, type="secondary"):
-                    # Save session
-                    session_duration = int(time.time() - st.session_state.study_start_time)
-                    focus_score = max(0, 100 - (st.session_state.distraction_count * config.DISTRACTION_PENALTY))
-                    
-                    session_data = {
-                        "start_time": datetime.fromtimestamp(st.session_state.study_start_time).isoformat(),
-                        "end_time": datetime.now().isoformat(),
-                        "duration": session_duration,
-                        "distractions": st.session_state.distraction_count,
-                        "focus_score": focus_score
-                    }
-                    
-                    data_manager.add_session(session_data)
-                    
-                    st.session_state.is_studying = False
-                    st.success(f"✅ Session saved! Duration: {session_duration // 60}m, Score: {focus_score}%")
-                    time.sleep(2)
+                    finished = finish_session()
+                    if finished is not None:
+                        session_duration, focus_score = finished
+                        st.success(f"✅ Session saved! Duration: {session_duration // 60}m, Score: {focus_score}%")
+                        time.sleep(2)
                     st.rerun()
     
     with col2:
@@ -237,97 +515,17 @@ with tab1:
         alert_placeholder = st.empty()
         tips_placeholder = st.empty()
 
-    # Main monitoring loop
-    if st.session_state.is_studying:
-        cap = cv2.VideoCapture(0)
-        
-        with mp_face_detection.FaceDetection(
-            min_detection_confidence=config.FACE_DETECTION_CONFIDENCE
-        ) as face_detection:
-            
-            ret, frame = cap.read()
-            
-            if ret:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = face_detection.process(rgb_frame)
-                
-                face_detected = False
-                
-                if results.detections:
-                    face_detected = True
-                    st.session_state.last_face_time = time.time()
-                    st.session_state.focus_time += 1
-                    
-                    if show_camera:
-                        for detection in results.detections:
-                            mp_drawing.draw_detection(rgb_frame, detection)
-                
-                # Check for distraction
-                time_since_face = time.time() - st.session_state.last_face_time
-                current_time = time.time()
-                
-                if time_since_face > distraction_threshold:
-                    # Distraction detected
-                    if current_time - st.session_state.last_alert_time > config.ALERT_COOLDOWN:
-                        alert_placeholder.markdown(
-                            '<div class="alert-danger">⚠️ DISTRACTION DETECTED!<br>Please refocus on your studies!</div>',
-                            unsafe_allow_html=True
-                        )
-                        st.session_state.distraction_count += 1
-                        st.session_state.last_alert_time = current_time
-                    
-                    status_placeholder.markdown("""
-                    <div style='text-align: center;'>
-                        <span class='status-badge status-distracted'>🔴 DISTRACTED</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                elif face_detected:
-                    alert_placeholder.markdown(
-                        '<div class="alert-success">✅ Great Focus!<br>Keep up the good work!</div>',
-                        unsafe_allow_html=True
-                    )
-                    
-                    status_placeholder.markdown("""
-                    <div style='text-align: center;'>
-                        <span class='status-badge status-focused'>🟢 FOCUSED</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Display camera feed
-                if show_camera:
-                    camera_placeholder.markdown('<div class="camera-frame">', unsafe_allow_html=True)
-                    camera_placeholder.image(rgb_frame, channels="RGB", use_container_width=True)
-                else:
-                    camera_placeholder.info("📹 Camera monitoring in background...")
-                
-                # Session stats
-                elapsed = int(time.time() - st.session_state.study_start_time)
-                focus_score = max(0, 100 - (st.session_state.distraction_count * config.DISTRACTION_PENALTY))
-                
-                tips_placeholder.markdown(f"""
-                ### 📈 Session Stats
-                - **Time Elapsed:** {elapsed // 60}m {elapsed % 60}s
-                - **Face Detected:** {'✅' if face_detected else '❌'}
-                - **Distractions:** {st.session_state.distraction_count}
-                - **Focus Score:** {focus_score}%
-                """)
-        
-        cap.release()
-        time.sleep(0.1)
-        st.rerun()
-    
-    else:
+    if not st.session_state.is_studying:
         camera_placeholder.info("👆 Click **'▶️ Start Session'** to begin monitoring your study session")
         status_placeholder.info("💤 Session not active")
 
-with tab2:
+elif view == ANALYTICS_VIEW:
     st.subheader("📊 Study Analytics")
     
-    sessions = data_manager.get_all_sessions()
+    summary = get_analytics(data_manager.get_data_version())
     
-    if sessions:
-        df = pd.DataFrame(sessions)
+    if summary:
+        import plotly.express as px
         
         # Statistics cards
         col1, col2, col3, col4 = st.columns(4)
@@ -336,12 +534,12 @@ with tab2:
             st.markdown(f"""
             <div class="metric-card">
                 <div class="metric-label">Total Sessions</div>
-                <div class="metric-value">{len(df)}</div>
+                <div class="metric-value">{summary['total_sessions']}</div>
             </div>
             """, unsafe_allow_html=True)
         
         with col2:
-            total_time = df['duration'].sum()
+            total_time = summary['total_study_time']
             st.markdown(f"""
             <div class="metric-card">
                 <div class="metric-label">Total Study Time</div>
@@ -350,7 +548,7 @@ with tab2:
             """, unsafe_allow_html=True)
         
         with col3:
-            avg_score = df['focus_score'].mean()
+            avg_score = summary['avg_focus_score']
             st.markdown(f"""
             <div class="metric-card">
                 <div class="metric-label">Avg Focus Score</div>
@@ -359,7 +557,7 @@ with tab2:
             """, unsafe_allow_html=True)
         
         with col4:
-            total_distractions = df['distractions'].sum()
+            total_distractions = summary['total_distractions']
             st.markdown(f"""
             <div class="metric-card">
                 <div class="metric-label">Total Distractions</div>
@@ -369,36 +567,45 @@ with tab2:
         
         st.divider()
         
-        # Charts
+        # Charts (long histories are averaged down to ANALYTICS_MAX_POINTS)
+        chart_df = summary['chart']
         col1, col2 = st.columns(2)
         
         with col1:
             # Focus score trend
-            fig1 = px.line(df, x='date', y='focus_score', 
+            fig1 = px.line(chart_df, x='date', y='focus_score', 
                           title='Focus Score Trend',
                           labels={'focus_score': 'Focus Score (%)', 'date': 'Date'})
             fig1.update_traces(line_color='#667eea', line_width=3)
             st.plotly_chart(fig1, use_container_width=True)
         
         with col2:
-            # Distraction analysis
-            fig2 = px.bar(df, x='date', y='distractions',
-                         title='Distraction Count by Session',
-                         labels={'distractions': 'Distractions', 'date': 'Date'})
+            # Distraction analysis; averaged buckets are not per-session counts
+            averaged = len(chart_df) < summary['total_sessions']
+            fig2 = px.bar(chart_df, x='date', y='distractions',
+                         title='Avg Distractions per Session' if averaged else 'Distraction Count by Session',
+                         labels={'distractions': 'Avg Distractions' if averaged else 'Distractions',
+                                 'date': 'Date'})
             fig2.update_traces(marker_color='#ff6b6b')
             st.plotly_chart(fig2, use_container_width=True)
         
-        # Session table
+        # Study time by hour of day
+        hourly = summary['hourly']
+        if not hourly.empty:
+            fig3 = px.bar(x=hourly.index, y=hourly['duration'] / 60,
+                         title='Study Time by Hour of Day',
+                         labels={'x': 'Hour', 'y': 'Minutes'})
+            fig3.update_traces(marker_color='#764ba2')
+            st.plotly_chart(fig3, use_container_width=True)
+        
+        # Session table, one page at a time straight from the store
         st.subheader("📋 Session History")
-        display_df = df[['date', 'time', 'duration', 'distractions', 'focus_score']].copy()
-        display_df['duration'] = display_df['duration'].apply(lambda x: f"{x // 60}m {x % 60}s")
-        display_df['focus_score'] = display_df['focus_score'].apply(lambda x: f"{x:.1f}%")
-        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        show_session_history()
         
     else:
         st.info("📭 No study sessions recorded yet. Start your first session to see analytics!")
 
-with tab3:
+else:
     st.subheader("ℹ️ About Distraction Sense AI")
     
     st.markdown("""
@@ -464,3 +671,151 @@ st.markdown("""
     <p style='font-size: 0.9rem;'>Distraction Sense AI © 2026 | Built with Streamlit & MediaPipe</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Everything above is one script run; the live loop below is timed per tick
+metrics.observe("app.script_run", time.perf_counter() - script_started)
+metrics.increment("app.script_runs")
+show_diagnostics(diagnostics_placeholder)
+
+# Live monitoring loop. It runs after the whole page has been drawn and
+# updates the placeholders in place, so the rest of the script is not
+# re-executed while a session is running. Any widget interaction stops
+# this run and starts a fresh one as usual. Outside the Study Session
+# view it keeps tracking attention and only updates the sidebar.
+if st.session_state.is_studying:
+    study_view = view == STUDY_VIEW
+    attention = st.session_state.attention
+    timeline = st.session_state.timeline
+    last_state = None
+    last_stats_update = 0.0
+    latest = None
+    waiting_for_camera = None
+    preview_seq = 0
+    
+    while True:
+        tick_started = time.perf_counter()
+        if use_webrtc:
+            playing = study_view and webrtc_ctx.state.playing
+            monitor = webrtc_ctx.video_processor if playing else None
+        else:
+            monitor = get_engine_client()
+            monitor.start()
+        
+        results = []
+        if monitor is not None:
+            if monitor.scheduler is not None:
+                monitor.set_distraction_threshold(distraction_threshold)
+            results = monitor.poll()
+            latest = results[-1] if results else monitor.latest
+        
+        attention.set_distraction_threshold(distraction_threshold)
+        for result in results:
+            events = attention.update(result["timestamp"], is_attentive(result))
+            if timeline is not None:
+                for event in events:
+                    timeline.record_event(event)
+                timeline.record(result, attention.state)
+        
+        # Status and alert only change on state transitions
+        if study_view and attention.state != last_state:
+            last_state = attention.state
+            if attention.state == DISTRACTED:
+                alert_placeholder.markdown(
+                    '<div class="alert-danger">⚠️ DISTRACTION DETECTED!<br>Please refocus on your studies!</div>',
+                    unsafe_allow_html=True
+                )
+                
+                status_placeholder.markdown("""
+                <div style='text-align: center;'>
+                    <span class='status-badge status-distracted'>🔴 DISTRACTED</span>
+                </div>
+                """, unsafe_allow_html=True)
+                
+            elif attention.state == GRACE:
+                status_placeholder.markdown("""
+                <div style='text-align: center;'>
+                    <span class='status-badge status-grace'>🟡 LOOKING AWAY</span>
+                </div>
+                """, unsafe_allow_html=True)
+                
+            elif attention.state == FOCUSED:
+                alert_placeholder.markdown(
+                    '<div class="alert-success">✅ Great Focus!<br>Keep up the good work!</div>',
+                    unsafe_allow_html=True
+                )
+                
+                status_placeholder.markdown("""
+                <div style='text-align: center;'>
+                    <span class='status-badge status-focused'>🟢 FOCUSED</span>
+                </div>
+                """, unsafe_allow_html=True)
+        
+        # Display camera feed (the WebRTC component renders its own video)
+        if study_view:
+            if use_webrtc:
+                if (monitor is None) != waiting_for_camera:
+                    waiting_for_camera = monitor is None
+                    if waiting_for_camera:
+                        camera_placeholder.info("📹 Press **START** on the camera above to begin monitoring")
+                    else:
+                        camera_placeholder.empty()
+            elif show_camera:
+                # Only send a new JPEG when the preview actually changed
+                preview_seq, jpeg = monitor.preview.take(preview_seq)
+                if jpeg is not None:
+                    camera_placeholder.image(jpeg, use_container_width=True)
+            else:
+                camera_placeholder.info("📹 Camera monitoring in background...")
+        
+        # Session stats
+        now = time.time()
+        if now - last_stats_update >= config.UI_STATS_INTERVAL:
+            last_stats_update = now
+            run_meter.sample(now)
+            elapsed = int(now - st.session_state.study_start_time - attention.paused_time(now))
+            attention_stats = attention.get_stats()
+            engine_stats = monitor.get_stats() if monitor is not None else {}
+            meter_stats = run_meter.get_stats()
+            checkpoint_stats = checkpoints.get_stats()
+            focus_time = int(attention_stats['focus_time'])
+            face_detected = latest is not None and latest["face_detected"]
+            
+            with overview_placeholder.container():
+                st.metric("⏱️ Session Time", f"{elapsed // 60}m {elapsed % 60}s")
+                st.metric("🎯 Distractions", attention_stats['distraction_count'])
+                st.metric("⭐ Focus Score", f"{attention_stats['focus_score']}%")
+            
+            if study_view:
+                tips_placeholder.markdown(f"""
+                ### 📈 Session Stats
+                - **Time Elapsed:** {elapsed // 60}m {elapsed % 60}s
+                - **Focused Time:** {focus_time // 60}m {focus_time % 60}s
+                - **Face Detected:** {'✅' if face_detected else '❌'}
+                - **Distractions:** {attention_stats['distraction_count']}
+                - **Focus Score:** {attention_stats['focus_score']}%
+                - **Camera FPS:** {engine_stats.get('capture_fps', 0.0):.1f}
+                - **Inferences Skipped:** {engine_stats.get('inferences_skipped', 0)}
+                - **Preview:** {engine_stats.get('preview_bytes_per_second', 0.0) / 1024:.0f} KB/s, {engine_stats.get('preview_encode_ms', 0.0):.1f} ms/frame
+                - **Script Runs/min:** {meter_stats['runs_per_minute']:.1f}
+                - **Server CPU:** {meter_stats['cpu_percent']:.0f}%
+                - **Checkpoint:** {checkpoint_stats['checkpoint_ms']:.1f} ms, {checkpoint_stats['checkpoint_bytes']} bytes
+                """)
+            show_diagnostics(diagnostics_placeholder)
+        
+        # Cheap checkpoint of the running totals; the history is untouched
+        if now - st.session_state.last_checkpoint >= config.AUTO_SAVE_INTERVAL:
+            if not checkpoint_session(now):
+                abandon_session()
+                st.rerun()
+        
+        if now - st.session_state.study_start_time - attention.paused_time(now) >= config.MAX_SESSION_DURATION:
+            finished = finish_session()
+            if finished is not None:
+                session_duration, focus_score = finished
+                st.toast(f"⏰ Maximum session length reached. Session saved! "
+                         f"Duration: {session_duration // 60}m, Score: {focus_score}%")
+                time.sleep(2)
+            st.rerun()
+        
+        metrics.observe("app.ui_tick", time.perf_counter() - tick_started)
+        time.sleep(config.UI_REFRESH_INTERVAL)
@@ -0,0 +1,98 @@
+"""Per-frame inference cost and frames/second of each ATTENTION_MODE
+
+Runs the same frames through FaceDetector in every attention mode:
+
+- presence: face detection only
+- head_pose: plus the keypoint yaw/pitch estimate, escalating to FaceMesh
+  at an adaptive cadence only for ambiguous frames
+- face_mesh: plus FaceMesh on every detected face
+
+--confidence below LOW_CONFIDENCE_THRESHOLD makes every synthetic
+detection ambiguous, the worst case for head_pose escalation. FaceMesh
+needs a working MediaPipe install; without one the mesh columns read
+"unavailable" and the modes fall back to the keypoint estimate.
+
+Usage:
+    python benchmarks/attention_mode_benchmark.py --frames 600
+    python benchmarks/attention_mode_benchmark.py --detector mediapipe --source recordings/session.mp4
+    python benchmarks/attention_mode_benchmark.py --confidence 0.4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.attention import is_attentive
+from utils.face_detector import FaceDetector, create_face_detector
+from utils.frame_source import SyntheticFaceDetector, create_frame_source
+from utils.head_pose import ATTENTION_MODES
+
+
+def run_mode(source_spec, detector_factory, attention_mode, frames, warmup=30):
+    """Detect up to frames frames in one attention mode, after warmup untimed ones"""
+    source = create_frame_source(source_spec)
+    detector = FaceDetector(detector_factory(), mode="full", attention_mode=attention_mode)
+    count = attentive = 0
+    elapsed = 0.0
+    try:
+        for _ in range(warmup):
+            ok, frame = source.read()
+            if ok:
+                detector.detect(frame, source.timestamp)
+        while count < frames:
+            ok, frame = source.read()
+            if not ok:
+                break
+            start = time.perf_counter()
+            result = detector.detect(frame, source.timestamp)
+            elapsed += time.perf_counter() - start
+            count += 1
+            attentive += is_attentive(result)
+        stats = detector.get_stats()
+    finally:
+        detector.close()
+        source.release()
+    return {
+        "frames": count,
+        "attentive": attentive,
+        "ms_per_frame": 1000 * elapsed / count if count else 0.0,
+        "fps": count / elapsed if elapsed else 0.0,
+        "mesh_available": stats.get("mesh_available", True),
+        "mesh_runs": stats.get("mesh_runs", 0),
+        "mesh_ms": stats.get("mesh_ms", 0.0),
+        "keypoint_pose_ms": stats.get("keypoint_pose_ms", 0.0)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="synthetic:present=40,absent=10,present=40",
+                        help="Frame source spec (recording path or synthetic pattern)")
+    parser.add_argument("--frames", type=int, default=600, help="Frames per mode")
+    parser.add_argument("--detector", choices=["synthetic", "mediapipe"], default="synthetic")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Synthetic detection confidence")
+    args = parser.parse_args()
+
+    if args.detector == "mediapipe":
+        detector_factory = create_face_detector
+    else:
+        detector_factory = lambda: SyntheticFaceDetector(confidence=args.confidence)
+
+    print(f"{args.detector} detector, {args.frames} frames per mode, source {args.source}")
+    print(f"{'mode':<10} {'ms/frame':>9} {'frames/s':>9} {'attentive':>10} {'pose ms':>8} "
+          f"{'mesh runs':>10} {'mesh ms':>8}")
+    for mode in ATTENTION_MODES:
+        stats = run_mode(args.source, detector_factory, mode, args.frames)
+        if mode == "presence":
+            mesh = f"{'-':>10} {'-':>8}"
+        elif not stats["mesh_available"]:
+            mesh = f"{'unavailable':>10} {'-':>8}"
+        else:
+            mesh = f"{stats['mesh_runs']:10d} {stats['mesh_ms']:8.2f}"
+        print(f"{mode:<10} {stats['ms_per_frame']:9.3f} {stats['fps']:9.1f} "
+              f"{stats['attentive']:4d}/{stats['frames']:<5d} {stats['keypoint_pose_ms']:8.3f} {mesh}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Measure session checkpoint cost as the stored history grows
+
+Compares the per-interval cost of a CheckpointStore write with rewriting
+the whole history (what a naive periodic save through DataManager.save_data
+would cost) at several history sizes.
+
+Usage:
+    python benchmarks/checkpoint_benchmark.py --sizes 100,10000,100000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.storage_benchmark import make_sessions
+from utils.attention import AttentionStateMachine
+from utils.checkpoint import CheckpointStore, build_checkpoint
+from utils.data_manager import DataManager
+
+
+def running_attention(seconds=3600, fps=10):
+    """State machine of an hour-long session with regular breaks"""
+    attention = AttentionStateMachine()
+    start = time.time() - seconds
+    for i in range(seconds * fps):
+        attention.update(start + i / fps, (i // fps) % 300 < 240)
+    return start, attention
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,10000,100000", help="Stored session counts")
+    parser.add_argument("--repeat", type=int, default=50, help="Checkpoints per size")
+    parser.add_argument("--rewrites", type=int, default=3, help="Full-history rewrites per size")
+    parser.add_argument("--backend", choices=["jsonl", "sqlite"], default="jsonl")
+    args = parser.parse_args()
+
+    started_at, attention = running_attention()
+    directory = tempfile.mkdtemp(prefix="checkpoint-bench-")
+    try:
+        print(f"{'sessions':>9} {'checkpoint ms':>14} {'max ms':>8} {'bytes':>6} {'full rewrite ms':>16}")
+        for size in (int(size) for size in args.sizes.split(",")):
+            base = os.path.join(directory, str(size))
+            manager = DataManager(os.path.join(base, "sessions.json"), args.backend)
+            sessions = make_sessions(size)
+            manager.save_data({"sessions": sessions})
+
+            store = CheckpointStore(os.path.join(base, "checkpoints"))
+            for _ in range(args.repeat):
+                store.save(build_checkpoint("bench", started_at, attention))
+            stats = store.get_stats()
+
+            start = time.perf_counter()
+            for _ in range(args.rewrites):
+                manager.save_data({"sessions": sessions + [{"duration": 3600, "distractions": 2}]})
+            rewrite_ms = 1000 * (time.perf_counter() - start) / args.rewrites
+            print(f"{size:9d} {stats['checkpoint_ms']:14.2f} {stats['checkpoint_max_ms']:8.2f} "
+                  f"{stats['checkpoint_bytes']:6d} {rewrite_ms:16.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Stress-test concurrent session writes from many processes
+
+Every worker process adds sessions through its own DataManager. At the end
+the store must hold exactly workers * sessions records with unique ids and
+consistent running statistics. Exits non-zero on any loss or duplicate.
+
+Usage:
+    python benchmarks/concurrency_stress.py --workers 8 --sessions 200 --backend jsonl
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_manager import DataManager
+import config
+
+
+def worker(data_file, backend, worker_id, count, start_event):
+    manager = DataManager(data_file, backend=backend)
+    start_event.wait()
+    for i in range(count):
+        manager.add_session({
+            "start_time": f"worker-{worker_id}",
+            "end_time": str(i),
+            "duration": 60,
+            "distractions": worker_id % 3,
+            "focus_score": 100
+        })
+
+
+def run_stress(data_file, backend, workers, sessions):
+    DataManager(data_file, backend=backend)
+    start_event = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=worker, args=(data_file, backend, w, sessions, start_event))
+        for w in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    start = time.perf_counter()
+    start_event.set()
+    for p in processes:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    manager = DataManager(data_file, backend=backend)
+    stored = manager.get_all_sessions()
+    ids = [s["id"] for s in stored]
+    written = {(s["start_time"], s["end_time"]) for s in stored}
+    return {
+        "expected": workers * sessions,
+        "stored": len(stored),
+        "unique_ids": len(set(ids)),
+        "unique_records": len(written),
+        "statistics_consistent": manager.verify_statistics()["consistent"],
+        "seconds": elapsed,
+        "sessions_per_second": len(stored) / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions added per worker")
+    parser.add_argument("--backend", choices=["jsonl", "sqlite"], default=config.STORAGE_BACKEND)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="stress-")
+    try:
+        result = run_stress(os.path.join(directory, "sessions.json"), args.backend, args.workers, args.sessions)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    for key, value in result.items():
+        print(f"{key:<22} {value}")
+    ok = (result["stored"] == result["expected"] == result["unique_ids"] == result["unique_records"]
+          and result["statistics_consistent"])
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
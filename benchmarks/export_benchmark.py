@@ -0,0 +1,117 @@
+"""Latency and peak memory of exporting and paging a large session history
+
+For each backend the history is seeded once, then every measurement runs
+in a fresh process so peak memory is not inherited from earlier runs:
+
+- materialized: get_all_sessions() into a pandas DataFrame, then to_csv
+  (what exporting looked like before the streaming API)
+- csv / jsonl / parquet: DataManager.export_sessions, streamed from the store
+- page: first, middle and last Session History pages by cursor
+
+"peak MB" is how far the process' peak RSS rose above its RSS at the
+start of the measurement (Linux /proc), so it includes pandas / pyarrow
+buffers that tracemalloc cannot see.
+
+Usage:
+    python benchmarks/export_benchmark.py --sizes 1000000
+    python benchmarks/export_benchmark.py --sizes 10000,100000 --backends sqlite
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.storage_benchmark import make_sessions
+from utils.data_manager import DataManager
+from utils.export import available_formats
+
+
+def _status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _reset_peak_rss():
+    """Reset the peak RSS mark and return the current RSS in MB"""
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    return _status_mb("VmRSS")
+
+
+def _peak_rss_mb():
+    return _status_mb("VmHWM")
+
+
+def _export_job(data_file, backend, fmt, out_path):
+    manager = DataManager(data_file, backend)
+    # Import the libraries first, so only data buffers count towards the peak
+    if fmt == "materialized":
+        import pandas as pd
+    elif fmt == "parquet":
+        import pyarrow.parquet  # noqa: F401
+    baseline = _reset_peak_rss()
+    start = time.perf_counter()
+    if fmt == "materialized":
+        sessions = manager.get_all_sessions()
+        pd.DataFrame.from_records(sessions).to_csv(out_path, index=False)
+        count = len(sessions)
+    else:
+        count = manager.export_sessions(out_path, fmt)
+    return count, time.perf_counter() - start, _peak_rss_mb() - baseline
+
+
+def _page_job(data_file, backend, page_size):
+    manager = DataManager(data_file, backend)
+    total = manager.count_sessions()
+    last_id = next(iter(manager.get_sessions_page(limit=1)[0]), {}).get("id", 0)
+    baseline = _reset_peak_rss()
+    timings = []
+    for cursor in (None, last_id - total // 2, page_size + 1):
+        start = time.perf_counter()
+        manager.get_sessions_page(cursor, page_size)
+        timings.append(1000 * (time.perf_counter() - start))
+    return timings, _peak_rss_mb() - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000000", help="Stored session counts")
+    parser.add_argument("--backends", default="jsonl,sqlite")
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    formats = ("materialized",) + available_formats()
+    directory = tempfile.mkdtemp(prefix="export-bench-")
+    try:
+        print(f"{'backend':<7} {'sessions':>9} {'export':<13} {'seconds':>8} {'sessions/s':>11} "
+              f"{'MB':>7} {'peak MB':>8}")
+        for backend in args.backends.split(","):
+            for size in (int(size) for size in args.sizes.split(",")):
+                data_file = os.path.join(directory, f"{backend}-{size}", "sessions.json")
+                DataManager(data_file, backend).save_data({"sessions": make_sessions(size)})
+                with context.Pool(1, maxtasksperchild=1) as pool:
+                    for fmt in formats:
+                        extension = "csv" if fmt == "materialized" else fmt
+                        out_path = os.path.join(directory, f"export-{backend}-{size}-{fmt}.{extension}")
+                        count, seconds, peak = pool.apply(_export_job, (data_file, backend, fmt, out_path))
+                        file_mb = os.path.getsize(out_path) / 1e6
+                        os.remove(out_path)
+                        print(f"{backend:<7} {count:9d} {fmt:<13} {seconds:8.2f} {count / seconds:11.0f} "
+                              f"{file_mb:7.1f} {peak:8.1f}")
+                    timings, peak = pool.apply(_page_job, (data_file, backend, args.page_size))
+                print(f"{backend:<7} {size:9d} {'page ms':<13} first {timings[0]:.2f}, middle {timings[1]:.2f}, "
+                      f"last {timings[2]:.2f} (peak +{peak:.1f} MB)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
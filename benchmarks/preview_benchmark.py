@@ -0,0 +1,73 @@
+"""Measure preview bandwidth and encode cost for several throttling settings
+
+Runs a live-paced source through the detection engine for each setting and
+has a poller take() new preview frames the way the app's live loop does.
+The "unthrottled" row approximates the old preview: every inferred frame
+at full resolution, encoded at high quality.
+
+Usage:
+    python benchmarks/preview_benchmark.py --seconds 10
+    python benchmarks/preview_benchmark.py --source recordings/session.mp4 --fps 5 --width 320 --quality 60
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.detection_engine import DetectionEngine
+from utils.frame_source import SyntheticFaceDetector, create_frame_source
+from utils.preview import PreviewEncoder
+import config
+
+
+def run_preview(source, seconds, preview):
+    """Run the engine for a fixed time, polling the preview like the UI does"""
+    engine = DetectionEngine(source=create_frame_source(source, realtime=True),
+                             detector_factory=SyntheticFaceDetector, inference_mode="full",
+                             preview=preview)
+    seq = 0
+    engine.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    while time.perf_counter() - wall_start < seconds:
+        engine.poll()
+        seq, _ = preview.take(seq)
+        time.sleep(config.UI_REFRESH_INTERVAL)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    engine.stop()
+    stats = engine.get_stats()
+    return {
+        "cpu_percent": 100 * cpu / wall,
+        "kb_per_second": preview.bytes_sent / wall / 1024,
+        "frames_sent": preview.frames_sent,
+        "encode_ms": stats["preview_encode_ms"],
+        "encode_p95_ms": stats["preview_encode_p95_ms"],
+        "skipped_unchanged": stats["preview_skipped_unchanged"],
+        "render_p95_ms": stats["stages"]["render"]["p95_ms"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="synthetic:present=20,absent=10")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each run")
+    parser.add_argument("--fps", type=float, default=config.PREVIEW_FPS)
+    parser.add_argument("--width", type=int, default=config.PREVIEW_MAX_WIDTH)
+    parser.add_argument("--quality", type=int, default=config.PREVIEW_JPEG_QUALITY)
+    args = parser.parse_args()
+
+    settings = [
+        ("unthrottled", dict(max_fps=0, max_width=0, quality=95, change_threshold=-1)),
+        ("throttled", dict(max_fps=args.fps, max_width=args.width, quality=args.quality))
+    ]
+    print(f"{'setting':<12} {'CPU %':>6} {'KB/s':>8} {'sent':>6} {'encode ms':>10} {'p95 ms':>7} {'unchanged':>10}")
+    for name, kwargs in settings:
+        result = run_preview(args.source, args.seconds, PreviewEncoder(**kwargs))
+        print(f"{name:<12} {result['cpu_percent']:6.1f} {result['kb_per_second']:8.1f} "
+              f"{result['frames_sent']:6d} {result['encode_ms']:10.2f} {result['encode_p95_ms']:7.2f} "
+              f"{result['skipped_unchanged']:10d}")
+
+
+if __name__ == "__main__":
+    main()
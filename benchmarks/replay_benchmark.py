@@ -0,0 +1,87 @@
+"""Replay a recorded or synthetic session through the detection engine at full speed
+
+Usage:
+    python benchmarks/replay_benchmark.py --source synthetic:present=20,absent=10
+    python benchmarks/replay_benchmark.py --source recordings/session.mp4 --detector mediapipe
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.detection_engine import DetectionEngine
+from utils.face_detector import INFERENCE_MODES, create_face_detector
+from utils.detection_scheduler import DetectionScheduler
+from utils.frame_source import SyntheticFaceDetector, SyntheticSource, create_frame_source
+import config
+
+
+def run_replay(source, detector_factory, scheduler=None, inference_mode=config.INFERENCE_MODE):
+    """Run every frame of source through the engine and measure frames/second"""
+    engine = DetectionEngine(source=source, detector_factory=detector_factory,
+                             keep_frames=False, drop_when_full=False, scheduler=scheduler,
+                             inference_mode=inference_mode)
+    frames = 0
+    faces = 0
+    start = time.perf_counter()
+    engine.start()
+    while engine.is_running() or engine.results.qsize():
+        for result in engine.poll():
+            frames += 1
+            faces += result["face_detected"]
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    engine.stop()
+
+    stats = engine.get_stats()
+    return {
+        "frames": frames,
+        "frames_with_face": faces,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "detect_latency_ms": stats["detect_latency_ms"],
+        "inference_p95_ms": stats.get("inference_p95_ms", 0.0),
+        "inferences_run": stats.get("inferences_run", frames),
+        "inferences_skipped": stats.get("inferences_skipped", 0),
+        "stages": stats["stages"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="synthetic:present=20,absent=10",
+                        help="Video file, image folder or synthetic script")
+    parser.add_argument("--detector", choices=["auto", "mediapipe", "scripted"], default="auto",
+                        help="Scripted detector reports synthetic ground truth")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Use the adaptive detection scheduler")
+    parser.add_argument("--mode", choices=INFERENCE_MODES,
+                        help="Inference mode (default: config, or full for the scripted detector)")
+    parser.add_argument("--width", type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument("--height", type=int, default=config.CAMERA_HEIGHT)
+    args = parser.parse_args()
+
+    source = create_frame_source(args.source, width=args.width, height=args.height)
+    is_synthetic = isinstance(source, SyntheticSource)
+    if args.detector == "scripted" and not is_synthetic:
+        parser.error("--detector scripted needs a synthetic source")
+    use_scripted = args.detector == "scripted" or (args.detector == "auto" and is_synthetic)
+    detector_factory = SyntheticFaceDetector if use_scripted else create_face_detector
+
+    mode = args.mode or ("full" if use_scripted else config.INFERENCE_MODE)
+    scheduler = DetectionScheduler() if args.adaptive else None
+    result = run_replay(source, detector_factory, scheduler, mode)
+    print(f"Frames:         {result['frames']} ({result['frames_with_face']} with face)")
+    print(f"Elapsed:        {result['seconds']:.2f} s")
+    print(f"Pipeline FPS:   {result['fps']:.1f}")
+    print(f"Detect latency: {result['detect_latency_ms']:.2f} ms (p95 {result['inference_p95_ms']:.2f} ms)")
+    print(f"Inferences:     {result['inferences_run']} run, {result['inferences_skipped']} skipped")
+    for name, stage in result["stages"].items():
+        if stage["count"]:
+            print(f"Stage {name:<10} p50 {stage['p50_ms']:.2f} ms, p95 {stage['p95_ms']:.2f} ms, "
+                  f"max {stage['max_ms']:.2f} ms, {stage['dropped']} dropped")
+
+
+if __name__ == "__main__":
+    main()
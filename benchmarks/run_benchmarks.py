@@ -0,0 +1,307 @@
+"""Reproducible benchmark suite: detector, attention logic and storage, with baseline comparison
+
+Every run measures fixed, seeded inputs so numbers are comparable between
+commits on the same machine:
+
+- detector: frames/s and latency of each inference mode on the same frames
+  at several resolutions (synthetic by default, or frames of a recording)
+- attention: AttentionStateMachine updates/s on scripted presence streams
+- storage: DataManager add / day query / week query / statistics / cold
+  load latency at 100, 10k and 1M stored sessions
+
+Timings are best-of-N to cut scheduler noise. Results are written as JSON
+together with machine info and a calibration time (a fixed CPU workload);
+against a baseline, timings are scaled by the calibration ratio so a
+busier or slower host does not read as a code regression. The script exits
+with status 1 if any timing got worse by more than --tolerance (and by
+more than --min-ms for millisecond figures).
+
+Usage:
+    python benchmarks/run_benchmarks.py                         # full suite, compare with baseline
+    python benchmarks/run_benchmarks.py --quick                 # skip the 1M-session storage run
+    python benchmarks/run_benchmarks.py --suites detector,attention --save-baseline
+    python benchmarks/run_benchmarks.py --source recordings/session.mp4 --detector mediapipe
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cv2
+import numpy as np
+from benchmarks.storage_benchmark import make_sessions
+from utils.attention import AttentionStateMachine
+from utils.data_manager import DataManager
+from utils.face_detector import INFERENCE_MODES, FaceDetector, create_face_detector
+from utils.frame_source import SyntheticFaceDetector, create_frame_source
+import config
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOLUTIONS = ((320, 240), (640, 480), (1280, 720))
+STORAGE_SIZES = (100, 10000, 1000000)
+# Scripted presence patterns (seconds present, seconds absent) at 30 FPS
+ATTENTION_SCRIPTS = {"steady": (600, 0), "flicker": (0.3, 0.2), "breaks": (20, 15)}
+
+
+def machine_info():
+    """Enough about the host and versions to know when numbers are comparable"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "commit": commit
+    }
+
+
+def calibrate(repeat=7):
+    """Best-of milliseconds of a fixed Python + numpy workload"""
+    matrix = np.random.default_rng(0).random((192, 192))
+
+    def workload():
+        sum(i * i for i in range(100000))
+        matrix @ matrix
+
+    return min(timings(workload, repeat))
+
+
+def timings(fn, repeat):
+    """Per-call milliseconds of repeat calls"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(1000 * (time.perf_counter() - start))
+    return samples
+
+
+def load_frames(spec, width, height, count):
+    """The first count frames of spec, resized to width x height"""
+    source = create_frame_source(spec, width=width, height=height)
+    frames = []
+    try:
+        while len(frames) < count:
+            ret, frame = source.read()
+            if not ret:
+                break
+            if frame.shape[1] != width or frame.shape[0] != height:
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            frames.append(frame.copy())
+    finally:
+        source.release()
+    return frames
+
+
+def bench_detector(spec, detector_factory, frame_count, repeat):
+    results = {}
+    for width, height in RESOLUTIONS:
+        frames = load_frames(spec, width, height, frame_count)
+        if not frames:
+            raise RuntimeError(f"no frames read from {spec}")
+        for mode in INFERENCE_MODES:
+            detector = FaceDetector(detector_factory(), mode=mode)
+            detector.detect(frames[0], 0.0)  # warm-up
+            best = None
+            for _ in range(repeat):
+                samples = []
+                faces = 0
+                start = time.perf_counter()
+                for index, frame in enumerate(frames):
+                    frame_start = time.perf_counter()
+                    faces += detector.detect(frame, index / config.CAMERA_FPS)["face_detected"]
+                    samples.append(1000 * (time.perf_counter() - frame_start))
+                elapsed = time.perf_counter() - start
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, samples)
+            elapsed, samples = best
+            detector.close()
+            key = f"detector.{width}x{height}.{mode}"
+            results[f"{key}.frames_per_second"] = len(frames) / elapsed
+            results[f"{key}.p50_ms"] = statistics.median(samples)
+            results[f"{key}.p95_ms"] = float(np.percentile(samples, 95))
+            results[f"{key}.faces"] = faces
+    return results
+
+
+def scripted_stream(present, absent, seconds, fps=config.CAMERA_FPS):
+    """(timestamp, face_present) pairs following a present/absent cycle"""
+    period = present + absent
+    return [(i / fps, (i / fps) % period < present) for i in range(int(seconds * fps))]
+
+
+def bench_attention(seconds, repeat):
+    results = {}
+    for name, (present, absent) in ATTENTION_SCRIPTS.items():
+        stream = scripted_stream(present, absent, seconds)
+        best = None
+        for _ in range(repeat):
+            attention = AttentionStateMachine()
+            start = time.perf_counter()
+            for timestamp, face_present in stream:
+                attention.update(timestamp, face_present)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        stats = attention.get_stats()
+        results[f"attention.{name}.updates_per_second"] = len(stream) / best
+        results[f"attention.{name}.distractions"] = stats["distraction_count"]
+    return results
+
+
+def bench_storage(sizes, backends, repeat):
+    results = {}
+    directory = tempfile.mkdtemp(prefix="suite-bench-")
+    try:
+        for size in sizes:
+            sessions = make_sessions(size)
+            today = datetime.now().date()
+            for backend in backends:
+                data_file = os.path.join(directory, f"{backend}-{size}", "sessions.json")
+                os.makedirs(os.path.dirname(data_file))
+                manager = DataManager(data_file, backend=backend)
+                start = time.perf_counter()
+                manager.save_data({"sessions": sessions})
+                seed_seconds = time.perf_counter() - start
+
+                key = f"storage.{backend}.{size}"
+                new_session = {"duration": 1500, "distractions": 1, "focus_score": 95}
+                cold = DataManager(data_file, backend=backend)
+                results[f"{key}.cold_load_ms"] = timings(cold.get_all_sessions, 1)[0]
+                results[f"{key}.add_ms"] = min(timings(lambda: manager.add_session(new_session), repeat))
+                results[f"{key}.today_ms"] = min(timings(manager.get_today_sessions, repeat))
+                results[f"{key}.week_ms"] = min(timings(lambda: manager.get_week_sessions(today), repeat))
+                results[f"{key}.statistics_ms"] = min(timings(manager.get_statistics, repeat))
+                results[f"{key}.seed_seconds"] = seed_seconds
+            del sessions
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def lower_is_better(metric):
+    return metric.endswith("_ms") or metric.endswith("_seconds")
+
+
+def compare(results, baseline, tolerance, min_ms, speed_ratio=1.0):
+    """Rows of (metric, baseline, current, change, regressed) for timed metrics in both runs
+
+    speed_ratio is current / baseline calibration time; baseline figures are
+    scaled by it before comparing.
+    """
+    rows = []
+    for metric, current in sorted(results.items()):
+        previous = baseline.get(metric)
+        timed_metric = lower_is_better(metric) or metric.endswith("_per_second")
+        if not timed_metric or not previous:
+            continue
+        if lower_is_better(metric):
+            expected = previous * speed_ratio
+            change = (current - expected) / expected
+            regressed = change > tolerance and not (metric.endswith("_ms") and current - expected < min_ms)
+        else:
+            expected = previous / speed_ratio
+            change = (current - expected) / expected
+            regressed = change < -tolerance
+        rows.append((metric, previous, current, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suites", default="detector,attention,storage")
+    parser.add_argument("--source", default="synthetic:present=2,absent=1",
+                        help="Frames for the detector suite (synthetic script, video or image folder)")
+    parser.add_argument("--detector", choices=["synthetic", "mediapipe"], default="synthetic")
+    parser.add_argument("--frames", type=int, default=150, help="Frames per resolution")
+    parser.add_argument("--attention-seconds", type=float, default=600.0,
+                        help="Length of each scripted attention stream")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in STORAGE_SIZES),
+                        help="Stored session counts for the storage suite")
+    parser.add_argument("--quick", action="store_true", help="Leave out storage sizes above 10k")
+    parser.add_argument("--backends", default="jsonl,sqlite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=os.path.join(BENCHMARK_DIR, "results", "latest.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCHMARK_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative slowdown that counts as a regression")
+    parser.add_argument("--min-ms", type=float, default=0.05,
+                        help="Ignore slowdowns smaller than this for millisecond timings")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="Compare raw timings without the calibration ratio")
+    args = parser.parse_args()
+
+    suites = args.suites.split(",")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    if args.quick:
+        sizes = [size for size in sizes if size <= 10000]
+    detector_factory = SyntheticFaceDetector if args.detector == "synthetic" else create_face_detector
+
+    calibration_ms = calibrate()
+    results = {}
+    if "detector" in suites:
+        print("Running detector suite...")
+        results.update(bench_detector(args.source, detector_factory, args.frames, args.repeat))
+    if "attention" in suites:
+        print("Running attention suite...")
+        results.update(bench_attention(args.attention_seconds, args.repeat))
+    if "storage" in suites:
+        print(f"Running storage suite ({', '.join(str(size) for size in sizes)} sessions)...")
+        results.update(bench_storage(sizes, args.backends.split(","), args.repeat))
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "machine": machine_info(),
+        "calibration_ms": calibration_ms,
+        "settings": {"source": args.source, "detector": args.detector, "frames": args.frames,
+                     "attention_seconds": args.attention_seconds, "repeat": args.repeat},
+        "results": results
+    }
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        for metric, value in sorted(results.items()):
+            print(f"{metric:<48} {value:>14.3f}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("machine", {}).get("machine") != report["machine"]["machine"]:
+        print("Warning: baseline was recorded on a different machine type")
+    speed_ratio = 1.0
+    if not args.no_normalize and baseline.get("calibration_ms"):
+        speed_ratio = calibration_ms / baseline["calibration_ms"]
+        print(f"Calibration: {calibration_ms:.2f} ms now vs {baseline['calibration_ms']:.2f} ms in the baseline "
+              f"(timings scaled by {speed_ratio:.2f})")
+    rows = compare(results, baseline.get("results", {}), args.tolerance, args.min_ms, speed_ratio)
+    print(f"{'metric':<48} {'baseline':>12} {'current':>12} {'change':>8}")
+    for metric, previous, current, change, regressed in rows:
+        print(f"{metric:<48} {previous:12.3f} {current:12.3f} {100 * change:+7.1f}%{'  REGRESSION' if regressed else ''}")
+    regressions = sum(row[4] for row in rows)
+    print(f"{regressions} regression(s) beyond {100 * args.tolerance:.0f}% against {args.baseline} "
+          f"(commit {baseline.get('machine', {}).get('commit') or 'unknown'})")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Throughput of the shared-memory frame ring vs. pickling frames through multiprocessing.Queue
+
+Both pipelines move every frame of a recorded (synthetic) source from a
+capture process to inference worker processes and collect the results in
+this process, losing nothing:
+
+- queue: the capture process puts each frame on a bounded Queue (pickled
+  and copied twice); workers put result dicts on a result Queue
+- ring: SharedFrameDetector, frames decoded into shared slots, only
+  sequence numbers and packed result structs cross processes
+
+With --detector none the workers only convert colours, which isolates
+the cost of moving frames.
+
+Usage:
+    python benchmarks/shared_frames_benchmark.py --seconds 20 --workers 2
+    python benchmarks/shared_frames_benchmark.py --width 1280 --height 720 --detector synthetic
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.face_detector import FaceDetector
+from utils.frame_source import SyntheticFaceDetector, create_frame_source
+from utils.shared_frames import SharedFrameDetector
+import config
+
+
+class NullDetector:
+    """Detector that finds nothing, so only frame transport is measured"""
+
+    def process(self, rgb_frame):
+        return SimpleNamespace(detections=None)
+
+    def close(self):
+        pass
+
+
+def _queue_capture(spec, width, height, frames):
+    source = create_frame_source(spec, width=width, height=height)
+    for _ in range(source.frame_count() or 0):
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.put((source.timestamp, frame))
+    frames.put(None)
+
+
+def _queue_worker(frames, results, detector_factory):
+    face = FaceDetector(detector_factory(), mode="full")
+    while True:
+        item = frames.get()
+        if item is None:
+            frames.put(None)
+            break
+        timestamp, frame = item
+        results.put(face.detect(frame, timestamp))
+    results.put(None)
+
+
+def run_queue(spec, width, height, workers, detector_factory):
+    context = multiprocessing.get_context("spawn")
+    frames = context.Queue(maxsize=config.SHARED_RING_SLOTS)
+    results = context.Queue()
+    processes = [context.Process(target=_queue_capture, args=(spec, width, height, frames))] + [
+        context.Process(target=_queue_worker, args=(frames, results, detector_factory))
+        for _ in range(workers)
+    ]
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    for process in processes:
+        process.start()
+    count = finished = 0
+    while finished < workers:
+        if results.get() is None:
+            finished += 1
+        else:
+            count += 1
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    for process in processes:
+        process.join()
+    return count, wall, cpu
+
+
+def run_ring(spec, width, height, workers, detector_factory):
+    detector = SharedFrameDetector(spec, workers=workers, detector_factory=detector_factory,
+                                   inference_mode="full", width=width, height=height, realtime=False,
+                                   keep_frames=False, drop_when_full=False)
+    count = 0
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    detector.start()
+    while detector.is_running() or detector.results.qsize():
+        count += len(detector.poll())
+        time.sleep(0.002)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    detector.stop()
+    return count, wall, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=20.0, help="Length of the synthetic recording")
+    parser.add_argument("--width", type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument("--height", type=int, default=config.CAMERA_HEIGHT)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--detector", choices=["none", "synthetic"], default="none")
+    args = parser.parse_args()
+
+    spec = f"synthetic:present={args.seconds / 2},absent={args.seconds / 2}"
+    detector_factory = NullDetector if args.detector == "none" else SyntheticFaceDetector
+    print(f"{args.width}x{args.height}, {args.workers} worker(s), detector={args.detector}")
+    print(f"{'transport':<10} {'frames':>7} {'seconds':>8} {'frames/s':>9} {'MB/s':>7} {'parent CPU %':>13}")
+    frame_mb = args.width * args.height * 3 / 1e6
+    for name, run in (("queue", run_queue), ("ring", run_ring)):
+        count, wall, cpu = run(spec, args.width, args.height, args.workers, detector_factory)
+        print(f"{name:<10} {count:7d} {wall:8.2f} {count / wall:9.1f} {count * frame_mb / wall:7.1f} "
+              f"{100 * cpu / wall:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
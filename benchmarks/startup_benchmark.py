@@ -0,0 +1,110 @@
+"""Measure app cold-start: import time and first paint of app.py
+
+Every sample runs in a fresh interpreter, so nothing is cached between
+samples. First paint is the first full script run through streamlit's
+AppTest; the heavy modules it pulled in are listed so lazy loading can
+be checked. Import time of each heavy module is measured on its own.
+
+Usage:
+    python benchmarks/startup_benchmark.py --repeat 5
+    python benchmarks/startup_benchmark.py --view analytics --sessions 10000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+HEAVY_MODULES = ("cv2", "mediapipe", "numpy", "pandas", "plotly", "streamlit_webrtc")
+VIEWS = {"study": "🎯 Study Session", "analytics": "📊 Analytics", "about": "ℹ️ About"}
+
+
+def child_first_paint(view, data_file):
+    """One cold start in this (fresh) process; returns timings as a dict"""
+    import config
+    config.DATA_FILE = data_file
+
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_import = time.perf_counter() - start
+
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    if view != "study":
+        app.session_state["view"] = VIEWS[view]
+    start = time.perf_counter()
+    app.run()
+    first_paint = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+    start = time.perf_counter()
+    app.run()
+    warm_run = time.perf_counter() - start
+    return {
+        "streamlit_import_s": streamlit_import,
+        "first_paint_s": first_paint,
+        "warm_run_s": warm_run,
+        "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules]
+    }
+
+
+def child_import(module):
+    start = time.perf_counter()
+    try:
+        __import__(module)
+    except ImportError:
+        return {"import_s": None}
+    return {"import_s": time.perf_counter() - start}
+
+
+def run_child(*args):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *args],
+                            capture_output=True, text=True, cwd=ROOT, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts to sample")
+    parser.add_argument("--view", choices=sorted(VIEWS), default="study",
+                        help="View selected on first paint")
+    parser.add_argument("--sessions", type=int, default=0, help="Stored sessions to seed")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        kind, *rest = args.child
+        result = child_first_paint(*rest) if kind == "paint" else child_import(*rest)
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "sessions.json")
+        if args.sessions:
+            from benchmarks.storage_benchmark import make_sessions
+            from utils.data_manager import DataManager
+            DataManager(data_file).save_data({"sessions": make_sessions(args.sessions)})
+        samples = [run_child("paint", args.view, data_file) for _ in range(args.repeat)]
+
+    print(f"Cold start, view={args.view}, {args.sessions} sessions, {args.repeat} samples (median)")
+    for key, label in (("streamlit_import_s", "Streamlit import"),
+                       ("first_paint_s", "First paint"),
+                       ("warm_run_s", "Warm rerun")):
+        print(f"  {label:<18} {1000 * statistics.median(s[key] for s in samples):8.1f} ms")
+    print(f"  Heavy modules loaded: {', '.join(samples[-1]['heavy_modules_loaded']) or 'none'}")
+
+    print("Standalone import time")
+    for module in HEAVY_MODULES:
+        result = run_child("import", module)
+        took = "not installed" if result["import_s"] is None else f"{1000 * result['import_s']:8.1f} ms"
+        print(f"  {module:<18} {took}")
+
+
+if __name__ == "__main__":
+    main()
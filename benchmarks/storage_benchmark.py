@@ -0,0 +1,114 @@
+"""Compare session storage backends on add, today-query and statistics
+
+Usage:
+    python benchmarks/storage_benchmark.py --sessions 100000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_manager import DataManager
+
+
+class LegacyJsonManager:
+    """The original whole-file sessions.json behaviour, kept as a baseline"""
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+
+    def seed(self, sessions):
+        with open(self.data_file, "w") as f:
+            json.dump({"sessions": sessions, "total_study_time": 0, "total_distractions": 0}, f, indent=4)
+
+    def add_session(self, session_data):
+        with open(self.data_file, "r") as f:
+            data = json.load(f)
+        data["sessions"].append(dict(session_data, id=len(data["sessions"]) + 1))
+        with open(self.data_file, "w") as f:
+            json.dump(data, f, indent=4)
+
+    def get_today_sessions(self):
+        today = datetime.now().strftime("%Y-%m-%d")
+        with open(self.data_file, "r") as f:
+            return [s for s in json.load(f)["sessions"] if s.get("date") == today]
+
+    def get_statistics(self):
+        with open(self.data_file, "r") as f:
+            sessions = json.load(f)["sessions"]
+        return sum(s["duration"] for s in sessions), sum(s["distractions"] for s in sessions)
+
+
+def make_sessions(count, days=730, seed=0):
+    """Synthetic history spread over the last `days` days"""
+    rng = random.Random(seed)
+    today = datetime.now()
+    sessions = []
+    for i in range(count):
+        day = today - timedelta(days=days * (count - i) // count)
+        duration = rng.randint(300, 7200)
+        distractions = rng.randint(0, 12)
+        sessions.append({
+            "id": i + 1,
+            "start_time": day.isoformat(),
+            "end_time": (day + timedelta(seconds=duration)).isoformat(),
+            "duration": duration,
+            "distractions": distractions,
+            "focus_score": max(0, 100 - distractions * 5),
+            "date": day.strftime("%Y-%m-%d"),
+            "time": day.strftime("%H:%M:%S")
+        })
+    return sessions
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return 1000 * (time.perf_counter() - start) / repeat
+
+
+def bench_backend(name, directory, sessions, repeat):
+    data_file = os.path.join(directory, name, "sessions.json")
+    os.makedirs(os.path.dirname(data_file))
+    if name == "legacy-json":
+        manager = LegacyJsonManager(data_file)
+        manager.seed(sessions)
+    else:
+        manager = DataManager(data_file, backend=name)
+        manager.save_data({"sessions": sessions})
+
+    new_session = {"duration": 1500, "distractions": 1, "focus_score": 95}
+    return {
+        "add_ms": timed(lambda: manager.add_session(new_session), repeat),
+        "today_ms": timed(manager.get_today_sessions, repeat),
+        "statistics_ms": timed(manager.get_statistics, repeat)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backends", default="legacy-json,jsonl,sqlite")
+    args = parser.parse_args()
+
+    sessions = make_sessions(args.sessions)
+    directory = tempfile.mkdtemp(prefix="storage-bench-")
+    try:
+        print(f"{'backend':<12} {'add ms':>10} {'today ms':>10} {'stats ms':>10}   ({args.sessions} sessions)")
+        for name in args.backends.split(","):
+            result = bench_backend(name, directory, sessions, args.repeat)
+            print(f"{name:<12} {result['add_ms']:>10.2f} {result['today_ms']:>10.2f} {result['statistics_ms']:>10.2f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare script executions and server CPU of the old rerun loop and the live polling loop
+
+The old monitoring loop slept UI_REFRESH_INTERVAL and then re-ran the whole
+script. Its cost is projected from the measured cost of one full script
+run (via streamlit's AppTest) plus the detection work. The live loop only
+polls detection results, so it is measured directly.
+
+Usage:
+    python benchmarks/ui_refresh_benchmark.py --sessions 1000 --seconds 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def measure_script_runs(runs):
+    """Average wall and CPU seconds of one full app.py execution"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_FILE, default_timeout=60)
+    app.run()  # warm-up: imports and cached resources
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    for _ in range(runs):
+        app.run()
+    return ((time.perf_counter() - wall_start) / runs,
+            (time.process_time() - cpu_start) / runs)
+
+
+def measure_live_loop(seconds, source):
+    """CPU percent of detection plus the polling loop over a fixed time"""
+    from utils.attention import AttentionStateMachine, is_attentive
+    from utils.detection_engine import DetectionEngine
+    from utils.frame_source import SyntheticFaceDetector, create_frame_source
+
+    frames = create_frame_source(source, realtime=True)
+    engine = DetectionEngine(source=frames, detector_factory=SyntheticFaceDetector,
+                             inference_mode="full")
+    attention = AttentionStateMachine(config.DEFAULT_DISTRACTION_THRESHOLD)
+    polls = 0
+    engine.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    while time.perf_counter() - wall_start < seconds:
+        for result in engine.poll():
+            attention.update(result["timestamp"], is_attentive(result))
+        polls += 1
+        time.sleep(config.UI_REFRESH_INTERVAL)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    engine.stop()
+    return 100 * cpu / wall, polls / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000,
+                        help="Stored sessions, so the Analytics tab has real work")
+    parser.add_argument("--runs", type=int, default=20, help="Script runs to average")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Live loop duration")
+    parser.add_argument("--source", default="synthetic:present=20,absent=10")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app builds its DataManager and engine from config at import time
+        config.DATA_FILE = os.path.join(tmp, "sessions.json")
+        config.FRAME_SOURCE = args.source
+        config.TIMELINE_DIR = os.path.join(tmp, "timelines")
+
+        from benchmarks.storage_benchmark import make_sessions
+        from utils.data_manager import DataManager
+        DataManager(config.DATA_FILE).save_data({"sessions": make_sessions(args.sessions)})
+
+        run_wall, run_cpu = measure_script_runs(args.runs)
+        live_cpu, polls_per_second = measure_live_loop(args.seconds, args.source)
+
+    reruns_per_second = 1 / (config.UI_REFRESH_INTERVAL + run_wall)
+    rerun_cpu = live_cpu + 100 * run_cpu * reruns_per_second
+    print(f"Full script run:     {1000 * run_wall:.1f} ms wall, {1000 * run_cpu:.1f} ms CPU")
+    print(f"Rerun loop (before): {60 * reruns_per_second:.0f} script runs/min, ~{rerun_cpu:.0f}% CPU (projected)")
+    print(f"Live loop (after):   0 script runs/min while monitoring, {live_cpu:.0f}% CPU "
+          f"({polls_per_second:.1f} polls/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,28 +8,113 @@ MIN_DETECTION_CONFIDENCE = 0.5
 DEFAULT_DISTRACTION_THRESHOLD = 10  # seconds
 MAX_DISTRACTION_THRESHOLD = 30
 MIN_DISTRACTION_THRESHOLD = 5
+ABSENCE_DEBOUNCE = 0.5  # seconds the face must be missing before leaving the focused state
+FOCUS_RECOVERY_TIME = 1.0  # seconds the face must be back before returning to focused
+MAX_FRAME_GAP = 5.0  # longest gap between frames credited to a state
 
 # Camera Settings
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 CAMERA_FPS = 30
+CAMERA_INDEX = 0
+FRAME_SOURCE = CAMERA_INDEX  # Device index, video file, image folder or "synthetic:present=10,absent=5"
+
+# Detection Engine Settings
+RESULT_QUEUE_SIZE = 30  # Detection results buffered between polls
+ENGINE_CLIENT_TIMEOUT = 30  # Seconds without a poll before a browser session stops holding the shared engine
+PIPELINE_QUEUE_SIZE = 2  # Frames buffered between capture, preprocess and inference stages
+PREVIEW_QUEUE_SIZE = 1  # Frames waiting for preview rendering (oldest dropped)
+STATS_WINDOW = 60  # Frames used for FPS / latency measurements
+ENGINE_BACKEND = "threads"  # "threads" (DetectionEngine) or "processes" (capture + inference outside the app process)
+SHARED_RING_SLOTS = 8  # Shared-memory frame slots between the capture and inference processes
+SHARED_WORKERS = 0  # Inference processes for the "processes" backend; 0 = one less than the CPU count
+
+# Preview Settings (server-side camera feed shown in the browser)
+PREVIEW_FPS = 10  # Max preview frames encoded per second, independent of the detection rate
+PREVIEW_MAX_WIDTH = 480  # Preview frames are downscaled to this width (0 = full resolution)
+PREVIEW_JPEG_QUALITY = 70  # JPEG quality of the preview (1-100)
+PREVIEW_CHANGE_THRESHOLD = 2.0  # Mean thumbnail change below which a frame is not re-encoded
+
+# Inference Settings
+INFERENCE_MODE = "roi"  # "full", "downscaled" or "roi"
+INFERENCE_SCALE = 0.5  # Resize factor for full-frame searches in downscaled/roi mode
+ROI_MARGIN = 0.5  # Padding around the tracked face box, relative to its size
+ROI_INPUT_SIZE = 192  # Side of the square buffer the ROI crop is resized into
+ROI_MAX_MISSES = 2  # Consecutive ROI misses before falling back to full-frame search
+
+# Attention Mode Settings
+ATTENTION_MODE = "presence"  # "presence" (face in frame), "head_pose" (keypoints + adaptive face mesh) or "face_mesh" (mesh every frame)
+HEAD_YAW_LIMIT = 30  # degrees of head turn before the student counts as looking away
+HEAD_PITCH_DOWN_LIMIT = 20  # degrees of looking down (e.g. at a phone on the desk)
+HEAD_PITCH_UP_LIMIT = 25  # degrees of looking up
+HEAD_POSE_MARGIN = 8  # degrees around a limit where the keypoint estimate counts as ambiguous
+HEAD_PITCH_NEUTRAL = 0.5  # nose tip position between eye line and mouth when facing the screen
+MESH_MIN_INTERVAL = 0.2  # seconds between face mesh runs while the cheap estimate keeps being overruled
+MESH_MAX_INTERVAL = 2.0  # longest gap between face mesh runs while the estimate stays ambiguous
+
+# Adaptive Detection Settings
+ADAPTIVE_DETECTION = True
+DETECTION_STABLE_INTERVAL = 1.0  # seconds between inferences while a face is steadily present
+DETECTION_ACTIVE_INTERVAL = 0.0  # seconds between inferences when the face is lost or uncertain
+MAX_ONSET_LATENCY = 2.0  # max delay before a distraction onset is noticed
+LOW_CONFIDENCE_THRESHOLD = 0.7  # detections below this keep the detector at the active rate
+STABLE_DETECTIONS_REQUIRED = 3  # confident detections before dropping to the stable rate
+MOTION_GATE_ENABLED = True
+MOTION_GATE_THRESHOLD = 4.0  # mean grey-level change that counts as motion
 
 # Alert Settings
 ALERT_SOUND_ENABLED = True
 ALERT_COOLDOWN = 5  # seconds between alerts
 
 # Session Settings
-AUTO_SAVE_INTERVAL = 60  # Save session data every 60 seconds
-MAX_SESSION_DURATION = 7200  # 2 hours max
+AUTO_SAVE_INTERVAL = 60  # Checkpoint the running session every 60 seconds
+MAX_SESSION_DURATION = 7200  # 2 hours max; longer sessions are saved and closed automatically
+CHECKPOINT_DIR = "data/checkpoints"  # One small file per session in progress
+CHECKPOINT_STALE_AFTER = 180  # seconds without a checkpoint before a session counts as orphaned
+CHECKPOINT_RESUME_WINDOW = 3600  # Older orphaned sessions are saved instead of offered for resume
+CHECKPOINT_PAUSED_STALE_AFTER = 14400  # A paused session's checkpoint counts as orphaned only after this
 
 # Data Storage
-DATA_FILE = "data/sessions.json"
+STORAGE_BACKEND = "jsonl"  # "jsonl" (append-only log) or "sqlite" (data/sessions.db)
+DATA_FILE = "data/sessions.json"  # Legacy file; migrated to sessions.snapshot.jsonl + sessions.log.jsonl
+LOG_COMPACT_THRESHOLD = 500  # Appended sessions before the log is folded into the snapshot
 BACKUP_ENABLED = True
+TIMELINE_ENABLED = True  # Record per-frame detection timelines for each session
+TIMELINE_DIR = "data/timelines"
+TIMELINE_CHUNK_SIZE = 4096  # Rows buffered in memory before a flush
+ANALYTICS_MAX_POINTS = 500  # Sessions per chart before the history is averaged into buckets
+HISTORY_PAGE_SIZE = 50  # Sessions per page of the Session History table
+EXPORT_DIR = "data/exports"
+EXPORT_KEEP = 5  # Newest export files kept in EXPORT_DIR; older ones are deleted after each export
+EXPORT_BATCH_SIZE = 10000  # Sessions per Parquet row group (CSV / JSON lines stream row by row)
+
+# Monitoring Service (several sources, shared inference processes)
+MONITOR_SOURCES = [CAMERA_INDEX]  # Any FRAME_SOURCE specs, one per student/camera (monitor_cli.py --sources)
+MONITOR_WORKERS = 0  # Inference processes; 0 = one less than the CPU count
+MONITOR_TARGET_FPS = 10  # Per-stream inference rate when the pool keeps up
+MONITOR_IN_FLIGHT_PER_WORKER = 2  # Frames queued per worker before streams are throttled
+
+# Batch Analysis (recorded videos)
+BATCH_WORKERS = 0  # Worker processes; 0 = CPU count
+BATCH_STRIDE = 5  # Analyse every Nth frame (6 samples/s at 30 FPS)
+BATCH_CHUNK_SECONDS = 120  # Long videos are split into chunks of this length
+BATCH_INFERENCE_MODE = "downscaled"  # ROI tracking gains little on strided frames
+BATCH_TIMELINE_DIR = "data/batch"
+
+# Diagnostics (timers/counters around capture, detection, storage and script runs)
+METRICS_ENABLED = False  # Collect timers/counters for the whole process (the sidebar panel only displays them); near-zero cost when off
+METRICS_WINDOW = 1000  # Samples per timer kept for rolling p50/p95/p99
+METRICS_FILE = "data/metrics.json"  # Snapshot rewritten while enabled ('' to skip)
+METRICS_EXPORT_INTERVAL = 10  # seconds between metrics file writes
+METRICS_PORT = 0  # Serve Prometheus text on http://127.0.0.1:<port>/metrics (0 = off)
 
 # UI Settings
 APP_TITLE = "Distraction Sense - AI Study Assistant"
 APP_ICON = "🎓"
 THEME_COLOR = "#1f77b4"
+MONITOR_MODE = "webrtc"  # "webrtc" (browser camera via streamlit-webrtc) or "engine" (server-side capture)
+UI_REFRESH_INTERVAL = 0.1  # seconds between polls of the live monitoring loop
+UI_STATS_INTERVAL = 1.0  # seconds between session stats updates
 
 # Productivity Scoring
 DISTRACTION_PENALTY = 5  # Each distraction reduces score by 5%
@@ -0,0 +1,265 @@
+"""Headless distraction monitor: the app's detection and attention pipeline without Streamlit
+
+Prints attention transitions and alerts as they happen (or JSON lines with
+--json) and saves the session through DataManager when the source ends,
+--duration elapses, or on Ctrl+C / SIGTERM. With --sources it monitors
+several cameras or files at once (one session per source) through the
+MonitorService inference pool.
+
+Usage:
+    python monitor_cli.py                                   # default camera, runs until Ctrl+C
+    python monitor_cli.py --source 1 --threshold 15 --duration 3600
+    python monitor_cli.py --source recordings/session.mp4 --json > events.jsonl
+    python monitor_cli.py --source synthetic:present=20,absent=15 --no-save
+    python monitor_cli.py --metrics-port 9464                # Prometheus text on :9464/metrics
+    python monitor_cli.py --sources 0 1 2 --workers 2        # one session per camera
+    python monitor_cli.py --sources                          # config.MONITOR_SOURCES
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.attention import AttentionStateMachine, is_attentive
+from utils.data_manager import DataManager
+from utils.detection_engine import DetectionEngine
+from utils.metrics import metrics
+from utils.monitor_service import MonitorService
+from utils.detection_scheduler import DetectionScheduler
+from utils.face_detector import INFERENCE_MODES, create_face_detector
+from utils.frame_source import SyntheticFaceDetector, SyntheticSource, create_frame_source
+import config
+
+
+class EventPrinter:
+    """Writes status events as text or JSON lines"""
+
+    def __init__(self, as_json=False, bell=False, stream=sys.stdout):
+        self.as_json = as_json
+        self.bell = bell
+        self.stream = stream
+
+    def emit(self, kind, **fields):
+        if self.as_json:
+            line = json.dumps({"event": kind, "at": datetime.now().isoformat(timespec="seconds"), **fields})
+        else:
+            details = " ".join(f"{k}={_format(v)}" for k, v in fields.items())
+            line = f"[{datetime.now():%H:%M:%S}] {kind:<10} {details}"
+            if kind == "alert" and self.bell:
+                line += "\a"
+        print(line, file=self.stream, flush=True)
+
+
+def _format(value):
+    return f"{value:.1f}" if isinstance(value, float) else value
+
+
+def run_monitor(engine, attention, printer, duration=None, stop_event=None, status_interval=0.0):
+    """Drive the engine until the source ends, duration passes or stop_event is set"""
+    stop_event = stop_event or threading.Event()
+    started = time.time()
+    last_status = started
+    engine.start()
+    try:
+        while not stop_event.is_set():
+            results = engine.poll()
+            for result in results:
+                for event in attention.update(result["timestamp"], is_attentive(result)):
+                    offset = event.timestamp - attention.started_at
+                    if event.kind == "alert":
+                        printer.emit("alert", t=offset, state=event.state)
+                    else:
+                        printer.emit("state", t=offset, previous=event.previous, state=event.state)
+
+            now = time.time()
+            if status_interval and now - last_status >= status_interval:
+                last_status = now
+                stats = attention.get_stats()
+                printer.emit("status", state=stats["state"], focus_score=stats["focus_score"],
+                             distractions=stats["distraction_count"],
+                             fps=engine.get_stats()["capture_fps"])
+            if duration is not None and now - started >= duration:
+                break
+            if not results:
+                if not engine.is_running() and engine.results.empty():
+                    break
+                time.sleep(0.01)
+    finally:
+        engine.stop()
+    return time.time() - started
+
+
+def run_service(service, printer, duration=None, stop_event=None, status_interval=0.0):
+    """Drive a MonitorService until every stream ends, duration passes or stop_event is set"""
+    stop_event = stop_event or threading.Event()
+    started = time.time()
+    last_status = started
+    service.start()
+    try:
+        while not stop_event.is_set() and not service.wait(timeout=0.1):
+            now = time.time()
+            if status_interval and now - last_status >= status_interval:
+                last_status = now
+                for stream in service.get_stats()["streams"]:
+                    printer.emit("status", stream=stream["name"], state=stream["state"],
+                                 focus_score=stream["focus_score"], distractions=stream["distraction_count"],
+                                 fps=stream["inference_fps"])
+            if duration is not None and now - started >= duration:
+                break
+    finally:
+        service.stop()
+    return time.time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=config.FRAME_SOURCE,
+                        help="Camera index, video file, image folder or synthetic[:script]")
+    parser.add_argument("--sources", nargs="*",
+                        help="Monitor several sources with a shared inference pool "
+                             "(no values: config.MONITOR_SOURCES)")
+    parser.add_argument("--threshold", type=float, default=config.DEFAULT_DISTRACTION_THRESHOLD,
+                        help="Seconds away before a distraction alert")
+    parser.add_argument("--cooldown", type=float, default=config.ALERT_COOLDOWN,
+                        help="Seconds between repeated alerts")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    parser.add_argument("--detector", choices=["auto", "mediapipe", "synthetic"], default="auto",
+                        help="auto uses the synthetic detector for synthetic sources")
+    parser.add_argument("--mode", choices=INFERENCE_MODES, help="Inference mode (default: config)")
+    parser.add_argument("--adaptive", action=argparse.BooleanOptionalAction, default=config.ADAPTIVE_DETECTION,
+                        help="Adaptive detection scheduling")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Pace files and synthetic sources at their frame rate (default: as fast as possible)")
+    parser.add_argument("--engine", choices=["threads", "processes"], default=config.ENGINE_BACKEND,
+                        help="processes: capture and detection in separate processes via shared memory")
+    parser.add_argument("--workers", type=int,
+                        help="Inference processes with --engine processes or --sources (0 = CPU count - 1)")
+    parser.add_argument("--width", type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument("--height", type=int, default=config.CAMERA_HEIGHT)
+    parser.add_argument("--status-interval", type=float, default=0.0,
+                        help="Print a status line every N seconds (0 = off)")
+    parser.add_argument("--json", action="store_true", help="Emit JSON lines instead of text")
+    parser.add_argument("--bell", action="store_true", help="Ring the terminal bell on alerts")
+    parser.add_argument("--no-save", action="store_true", help="Do not save the session")
+    parser.add_argument("--data-file", default=config.DATA_FILE)
+    parser.add_argument("--backend", choices=["jsonl", "sqlite"], default=config.STORAGE_BACKEND)
+    parser.add_argument("--metrics-file", help="Record timers and write them to this JSON file on exit")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="Record timers and serve them in Prometheus format on this port")
+    args = parser.parse_args()
+
+    if args.metrics_file or args.metrics_port:
+        metrics.enabled = True
+        if args.metrics_port:
+            metrics.serve_prometheus(args.metrics_port)
+
+    if args.sources is not None:
+        run_sources(parser, args)
+        if args.metrics_file:
+            metrics.write_json(args.metrics_file)
+        return
+
+    source = create_frame_source(args.source, width=args.width, height=args.height, realtime=args.realtime)
+    is_synthetic = isinstance(source, SyntheticSource)
+    if args.detector == "synthetic" and not is_synthetic:
+        parser.error("--detector synthetic needs a synthetic source")
+    use_synthetic = args.detector == "synthetic" or (args.detector == "auto" and is_synthetic)
+    detector_factory = SyntheticFaceDetector if use_synthetic else create_face_detector
+    mode = args.mode or ("full" if use_synthetic else config.INFERENCE_MODE)
+
+    # Recorded sources must not lose frames; live cameras keep only fresh ones
+    scheduler = DetectionScheduler() if args.adaptive else None
+    if args.engine == "processes":
+        from utils.shared_frames import SharedFrameDetector
+        source.release()
+        engine = SharedFrameDetector(source=args.source, workers=config.SHARED_WORKERS if args.workers is None
+                                     else args.workers, detector_factory=detector_factory,
+                                     inference_mode=mode, scheduler=scheduler, width=args.width,
+                                     height=args.height, realtime=args.realtime,
+                                     keep_frames=False, drop_when_full=source.live)
+    else:
+        engine = DetectionEngine(source=source, detector_factory=detector_factory, keep_frames=False,
+                                 drop_when_full=source.live, inference_mode=mode, scheduler=scheduler)
+    if engine.scheduler is not None:
+        engine.scheduler.set_distraction_threshold(args.threshold)
+    attention = AttentionStateMachine(args.threshold, alert_cooldown=args.cooldown)
+    printer = EventPrinter(args.json, args.bell)
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    start_time = datetime.now()
+    printer.emit("start", source=str(args.source), threshold=args.threshold, mode=mode)
+    elapsed = run_monitor(engine, attention, printer, args.duration, stop_event, args.status_interval)
+
+    stats = attention.get_stats()
+    engine_stats = engine.get_stats()
+    session_data = {
+        "start_time": start_time.isoformat(),
+        "end_time": datetime.now().isoformat(),
+        "duration": int(stats["active_time"]),
+        "distractions": stats["distraction_count"],
+        "focus_score": stats["focus_score"]
+    }
+    if not args.no_save:
+        DataManager(args.data_file, args.backend).add_session(session_data)
+    printer.emit("end", duration=session_data["duration"], distractions=session_data["distractions"],
+                 focus_score=session_data["focus_score"], frames=engine_stats["frames_captured"],
+                 speed=stats["active_time"] / elapsed if elapsed else 0.0, saved=not args.no_save)
+    if args.metrics_file:
+        metrics.write_json(args.metrics_file)
+
+
+def run_sources(parser, args):
+    """--sources: one session per source through MonitorService
+
+    The service samples every stream at MONITOR_TARGET_FPS in wall-clock
+    time, so files and synthetic sources always play at their frame rate.
+    """
+    specs = args.sources or config.MONITOR_SOURCES
+    is_synthetic = all(str(spec).startswith("synthetic") for spec in specs)
+    if args.detector == "synthetic" and not is_synthetic:
+        parser.error("--detector synthetic needs synthetic sources")
+    use_synthetic = args.detector == "synthetic" or (args.detector == "auto" and is_synthetic)
+    mode = args.mode or ("full" if use_synthetic else config.INFERENCE_MODE)
+    data_manager = None if args.no_save else DataManager(args.data_file, args.backend)
+    printer = EventPrinter(args.json, args.bell)
+
+    def on_event(name, event):
+        stream = next(stream for stream in service.streams if stream.name == name)
+        offset = event.timestamp - stream.attention.started_at
+        if event.kind == "alert":
+            printer.emit("alert", stream=name, t=offset, state=event.state)
+        else:
+            printer.emit("state", stream=name, t=offset, previous=event.previous, state=event.state)
+
+    service = MonitorService(specs, workers=config.MONITOR_WORKERS if args.workers is None else args.workers,
+                             data_manager=data_manager, distraction_threshold=args.threshold,
+                             alert_cooldown=args.cooldown,
+                             detector_factory=SyntheticFaceDetector if use_synthetic else create_face_detector,
+                             inference_mode=mode, on_event=on_event)
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    printer.emit("start", sources=len(specs), workers=service.workers, threshold=args.threshold, mode=mode)
+    run_service(service, printer, args.duration, stop_event, args.status_interval)
+    for stream in service.streams:
+        session = stream.saved_session
+        if session is None:
+            printer.emit("end", stream=stream.name, frames=stream.frames_captured, saved=False)
+            continue
+        printer.emit("end", stream=stream.name, duration=session["duration"],
+                     distractions=session["distractions"], focus_score=session["focus_score"],
+                     frames=stream.frames_captured, saved=not args.no_save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from utils.attention import DISTRACTED, FOCUSED, GRACE, PAUSED, AttentionStateMachine
+
+
+def feed(machine, start, end, face_present, step=0.1):
+    """Feed one result every step seconds over [start, end); returns the events"""
+    events = []
+    count = int(round((end - start) / step))
+    for i in range(count):
+        events += machine.update(start + i * step, face_present)
+    return events
+
+
+def alerts(events):
+    return [event for event in events if event.kind == "alert"]
+
+
+def make_machine(**kwargs):
+    options = dict(distraction_threshold=5, alert_cooldown=2, absence_debounce=0.5, recovery_time=1.0,
+                   max_frame_gap=5.0)
+    options.update(kwargs)
+    return AttentionStateMachine(**options)
+
+
+def test_absence_moves_through_grace_to_distracted():
+    machine = make_machine()
+    feed(machine, 0, 2, True)
+    events = feed(machine, 2, 8, False)
+    transitions = [(e.previous, e.state) for e in events if e.kind == "transition"]
+    assert transitions == [(FOCUSED, GRACE), (GRACE, DISTRACTED)]
+    distracted_at = next(e.timestamp for e in events if e.state == DISTRACTED)
+    # The face was last seen at 1.9 s
+    assert abs(distracted_at - 6.9) < 1e-6
+    assert machine.distraction_count == 1
+
+
+def test_alerts_repeat_every_cooldown_while_absent():
+    machine = make_machine()
+    feed(machine, 0, 2, True)
+    events = feed(machine, 2, 12, False)
+    # Face last seen at 1.9 s: distracted at 6.9 s, then alerts every 2 s
+    assert [round(e.timestamp, 1) for e in alerts(events)] == [6.9, 8.9, 10.9]
+
+
+def test_no_alert_once_face_is_back_during_recovery():
+    machine = make_machine(recovery_time=3.0)
+    feed(machine, 0, 2, True)
+    feed(machine, 2, 8, False)
+    assert machine.state == DISTRACTED
+    # The face is back but has not been present for recovery_time yet, and
+    # the alert cooldown has long passed: still no alert
+    events = feed(machine, 10, 12.5, True)
+    assert machine.state == DISTRACTED
+    assert alerts(events) == []
+    events = feed(machine, 12.5, 13.5, True)
+    assert machine.state == FOCUSED
+    assert alerts(events) == []
+
+
+def test_brief_flicker_is_debounced():
+    machine = make_machine()
+    feed(machine, 0, 2, True)
+    events = feed(machine, 2, 2.3, False) + feed(machine, 2.3, 4, True)
+    assert events == []
+    assert machine.state == FOCUSED
+
+
+def test_time_accounting_does_not_depend_on_frame_rate():
+    slow, fast = make_machine(), make_machine()
+    for machine, step in ((slow, 0.5), (fast, 0.02)):
+        feed(machine, 0, 20, True, step)
+        machine.update(20, True)
+    assert abs(slow.get_stats()["focus_time"] - 20) < 1e-6
+    assert abs(fast.get_stats()["focus_time"] - 20) < 1e-6
+
+
+def test_paused_time_is_excluded_from_active_time():
+    machine = make_machine()
+    feed(machine, 0, 10, True)
+    machine.pause(10)
+    assert machine.state == PAUSED
+    assert machine.paused_time(100) == 90
+    machine.resume(100)
+    feed(machine, 100, 110, True)
+    machine.update(110, True)
+    stats = machine.get_stats()
+    assert abs(stats["active_time"] - 20) < 1e-6
+    assert abs(stats["paused_time"] - 90) < 1e-6
+
+
+def test_stalled_camera_credits_only_max_frame_gap():
+    machine = make_machine(max_frame_gap=5.0)
+    machine.update(0, True)
+    machine.update(30, True)
+    stats = machine.get_stats()
+    assert stats["focus_time"] == 5.0
+    assert stats["gap_time"] == 25.0
+
+
+def test_round_trip_through_dict():
+    machine = make_machine()
+    feed(machine, 0, 2, True)
+    feed(machine, 2, 8, False)
+    restored = AttentionStateMachine.from_dict(machine.to_dict())
+    assert restored.state == DISTRACTED
+    assert restored.get_stats() == machine.get_stats()
@@ -0,0 +1,80 @@
+from utils.attention import AttentionStateMachine
+from utils.checkpoint import (CheckpointStore, build_checkpoint, finalize_orphans, restore_attention,
+                              session_from_checkpoint)
+
+
+class RecordingDataManager:
+    def __init__(self):
+        self.sessions = []
+
+    def add_session(self, session):
+        self.sessions.append(session)
+        return session
+
+
+def running_session(started_at=1000.0, seconds=60, pause_at=None):
+    attention = AttentionStateMachine(distraction_threshold=5)
+    for i in range(seconds * 10):
+        attention.update(started_at + i / 10, True)
+    if pause_at is not None:
+        attention.pause(pause_at)
+    return attention
+
+
+def test_save_is_atomic_and_leaves_no_temp_file(tmp_path):
+    store = CheckpointStore(str(tmp_path), fsync=False)
+    assert store.save(build_checkpoint("a", 1000.0, running_session(), now=1060.0))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json"]
+    assert store.exists("a")
+    assert store.get_stats()["checkpoints"] == 1
+
+
+def test_orphans_skip_fresh_excluded_and_recently_paused(tmp_path):
+    store = CheckpointStore(str(tmp_path), fsync=False)
+    store.save(build_checkpoint("fresh", 1000.0, running_session(), now=1060.0))
+    store.save(build_checkpoint("stale", 1000.0, running_session(), now=1060.0 - 600))
+    store.save(build_checkpoint("mine", 1000.0, running_session(), now=1060.0 - 600))
+    store.save(build_checkpoint("paused", 1000.0, running_session(pause_at=1060.0), now=1060.0 - 600))
+    keys = [r["key"] for r in store.orphans(stale_after=120, exclude=("mine",), now=1060.0,
+                                            paused_stale_after=3600)]
+    assert keys == ["stale"]
+    keys = [r["key"] for r in store.orphans(stale_after=120, exclude=("mine",), now=1060.0 + 3600,
+                                            paused_stale_after=3600)]
+    assert sorted(keys) == ["fresh", "paused", "stale"]
+
+
+def test_claim_hands_a_checkpoint_to_one_caller(tmp_path):
+    store = CheckpointStore(str(tmp_path), fsync=False)
+    store.save(build_checkpoint("a", 1000.0, running_session(), now=1060.0))
+    first = store.claim("a")
+    assert first is not None and first["key"] == "a"
+    assert store.claim("a") is None
+    assert not store.exists("a")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_duration_excludes_paused_time():
+    attention = running_session(seconds=60, pause_at=1060.0)
+    record = build_checkpoint("a", 1000.0, attention, now=1660.0)
+    assert record["paused"]
+    assert abs(record["elapsed"] - 660.0) < 1e-6
+    assert abs(record["duration"] - 60.0) < 0.2
+    assert session_from_checkpoint(record)["duration"] == int(record["duration"])
+
+
+def test_restored_attention_is_paused_with_same_totals():
+    attention = running_session()
+    record = build_checkpoint("a", 1000.0, attention, now=1060.0)
+    restored = restore_attention(record)
+    assert restored.state == "paused"
+    assert restored.get_stats()["focus_time"] == attention.get_stats()["focus_time"]
+
+
+def test_finalize_orphans_saves_each_orphan_once(tmp_path):
+    store = CheckpointStore(str(tmp_path), fsync=False)
+    store.save(build_checkpoint("old", 1000.0, running_session(), now=1060.0))
+    data_manager = RecordingDataManager()
+    assert len(finalize_orphans(store, data_manager, older_than=60, now=5000.0)) == 1
+    assert finalize_orphans(store, data_manager, older_than=60, now=5000.0) == []
+    assert len(data_manager.sessions) == 1
+    assert data_manager.sessions[0]["focus_score"] == 100
@@ -0,0 +1,82 @@
+import numpy as np
+
+from utils.detection_scheduler import DetectionScheduler
+
+
+def make_scheduler(**kwargs):
+    options = dict(distraction_threshold=10, stable_interval=1.0, active_interval=0.0, max_onset_latency=2.0,
+                   low_confidence=0.5, stable_detections=3, motion_gate=False, motion_threshold=8.0)
+    options.update(kwargs)
+    return DetectionScheduler(**options)
+
+
+def run(scheduler, start, end, face, confidence=0.9, step=0.1, frame=None):
+    """Drive the scheduler like the engine does; returns the timestamps it ran at"""
+    ran = []
+    count = int(round((end - start) / step))
+    for i in range(count):
+        timestamp = start + i * step
+        if scheduler.should_run(timestamp, frame):
+            scheduler.record(timestamp, face, confidence)
+            ran.append(round(timestamp, 1))
+    return ran
+
+
+def test_every_frame_until_stable_then_stable_interval():
+    scheduler = make_scheduler()
+    ran = run(scheduler, 0, 3, True)
+    assert ran[:3] == [0.0, 0.1, 0.2]
+    assert ran[3:] == [1.2, 2.2]
+
+
+def test_lost_face_returns_to_every_frame():
+    scheduler = make_scheduler()
+    run(scheduler, 0, 3, True)
+    ran = run(scheduler, 3.2, 3.6, False)
+    assert ran == [3.2, 3.3, 3.4, 3.5]
+
+
+def test_low_confidence_is_not_stable():
+    scheduler = make_scheduler()
+    ran = run(scheduler, 0, 1, True, confidence=0.3)
+    assert len(ran) == 10
+
+
+def test_interval_never_exceeds_distraction_threshold():
+    scheduler = make_scheduler(stable_interval=5.0, max_onset_latency=5.0)
+    scheduler.set_distraction_threshold(0.5)
+    ran = run(scheduler, 0, 3, True)
+    gaps = [b - a for a, b in zip(ran, ran[1:])]
+    assert max(gaps) <= 0.5 + 1e-9
+
+
+def test_motion_gate_skips_static_frames_only_while_stable():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    scheduler = make_scheduler(motion_gate=True, stable_interval=0.5)
+    run(scheduler, 0, 0.3, True, frame=frame)
+    assert scheduler.is_stable()
+    ran = run(scheduler, 0.3, 1.9, True, frame=frame)
+    assert ran == []
+    assert scheduler.get_stats()["skipped_static"] > 0
+    # The latency bound forces a run at 2.2 s that finds no face; from then
+    # on the static scene no longer gates inference
+    ran = run(scheduler, 1.9, 2.6, False, frame=frame)
+    assert ran == [2.2, 2.3, 2.4, 2.5]
+
+
+def test_motion_triggers_early_inference():
+    still = np.zeros((48, 64, 3), dtype=np.uint8)
+    moved = np.full((48, 64, 3), 200, dtype=np.uint8)
+    scheduler = make_scheduler(motion_gate=True, stable_interval=1.0)
+    run(scheduler, 0, 0.3, True, frame=still)
+    assert scheduler.should_run(0.4, moved)
+    assert scheduler.get_stats()["motion_triggered"] == 1
+
+
+def test_reset_forgets_streak_and_last_run():
+    scheduler = make_scheduler()
+    run(scheduler, 0, 1, True)
+    scheduler.reset()
+    assert not scheduler.is_stable()
+    assert scheduler.last_run_at is None
+    assert scheduler.should_run(1.05)
@@ -0,0 +1,95 @@
+import os
+import threading
+
+import pytest
+
+from utils.session_store import JsonLinesSessionStore, create_session_store
+
+
+def make_session(day, duration=600, distractions=2, focus_score=90):
+    return {
+        "start_time": f"2024-01-{day:02d}T10:00:00",
+        "end_time": f"2024-01-{day:02d}T10:10:00",
+        "duration": duration,
+        "distractions": distractions,
+        "focus_score": focus_score,
+        "date": f"2024-01-{day:02d}",
+        "time": "10:10:00"
+    }
+
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def store(request, tmp_path):
+    store = create_session_store(str(tmp_path / "sessions.json"), request.param)
+    store.ensure()
+    yield store
+    if hasattr(store, "close"):
+        store.close()
+
+
+def test_ids_increase_and_sessions_keep_order(store):
+    added = [store.add(make_session(day)) for day in range(1, 6)]
+    assert [s["id"] for s in added] == [1, 2, 3, 4, 5]
+    assert [s["date"] for s in store.iter_sessions()] == [s["date"] for s in added]
+
+
+def test_statistics_follow_adds(store):
+    store.add(make_session(1, duration=600, distractions=2, focus_score=90))
+    store.add(make_session(2, duration=1200, distractions=0, focus_score=100))
+    stats = store.statistics()
+    assert stats["total_sessions"] == 2
+    assert stats["total_study_time"] == 1800
+    assert stats["total_distractions"] == 2
+    assert stats["avg_focus_score"] == 95
+    assert stats["max_session_duration"] == 1200
+
+
+def test_pages_newest_first_by_cursor(store):
+    for day in range(1, 8):
+        store.add(make_session(day))
+    first = store.page(limit=3)
+    assert [s["id"] for s in first] == [7, 6, 5]
+    second = store.page(first[-1]["id"], limit=3)
+    assert [s["id"] for s in second] == [4, 3, 2]
+    assert [s["id"] for s in store.page(limit=10, start_date="2024-01-03", end_date="2024-01-04")] == [4, 3]
+
+
+def test_compaction_keeps_every_session_once(tmp_path):
+    store = JsonLinesSessionStore(str(tmp_path / "sessions.json"), compact_threshold=3)
+    store.ensure()
+    for day in range(1, 8):
+        store.add(make_session(day))
+    assert [s["id"] for s in store.iter_sessions()] == list(range(1, 8))
+    assert store.statistics()["total_sessions"] == 7
+
+
+def test_torn_log_line_is_recovered(tmp_path):
+    store = JsonLinesSessionStore(str(tmp_path / "sessions.json"))
+    store.ensure()
+    store.add(make_session(1))
+    with open(store.log_file, "a") as f:
+        f.write('{"id": 2, "dur')
+    reopened = JsonLinesSessionStore(str(tmp_path / "sessions.json"))
+    reopened.ensure()
+    assert [s["id"] for s in reopened.iter_sessions()] == [1]
+    assert reopened.add(make_session(2))["id"] == 2
+
+
+def test_concurrent_writers_never_reuse_ids(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    stores = [JsonLinesSessionStore(path) for _ in range(4)]
+    for store in stores:
+        store.ensure()
+
+    def write(store):
+        for day in range(1, 11):
+            store.add(make_session(day))
+
+    threads = [threading.Thread(target=write, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [s["id"] for s in stores[0].iter_sessions()]
+    assert sorted(ids) == list(range(1, 41))
+    assert os.path.exists(stores[0].log_file)
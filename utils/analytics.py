@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import config
+
+
+def sessions_frame(sessions):
+    """Typed DataFrame of sessions, built once per data version"""
+    df = pd.DataFrame.from_records(sessions)
+    if df.empty:
+        return pd.DataFrame({
+            "date": pd.Series(dtype="datetime64[ns]"),
+            "time": pd.Series(dtype="object"),
+            "start": pd.Series(dtype="datetime64[ns]"),
+            "duration": pd.Series(dtype="int64"),
+            "distractions": pd.Series(dtype="int64"),
+            "focus_score": pd.Series(dtype="float64")
+        })
+
+    frame = pd.DataFrame({
+        "date": pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce"),
+        "time": df["time"].fillna("") if "time" in df else "",
+        "duration": pd.to_numeric(df["duration"], errors="coerce").fillna(0).astype("int64"),
+        "distractions": pd.to_numeric(df["distractions"], errors="coerce").fillna(0).astype("int64"),
+        "focus_score": pd.to_numeric(df["focus_score"], errors="coerce").fillna(0).astype("float64")
+    })
+    start = pd.to_datetime(df["start_time"], errors="coerce") if "start_time" in df else None
+    if start is None or start.isna().all():
+        start = pd.to_datetime(frame["date"].dt.strftime("%Y-%m-%d") + " " + frame["time"], errors="coerce")
+    frame["start"] = start
+    return frame
+
+
+def rollup(frame, key):
+    """Sessions, study time, distractions and mean focus score per key"""
+    grouped = frame.groupby(key, sort=True)
+    return pd.DataFrame({
+        "sessions": grouped.size(),
+        "duration": grouped["duration"].sum(),
+        "distractions": grouped["distractions"].sum(),
+        "focus_score": grouped["focus_score"].mean()
+    })
+
+
+def format_history(frame):
+    """Session History table with vectorized column formatting"""
+    duration = frame["duration"].to_numpy()
+    minutes = (duration // 60).astype(str)
+    seconds = (duration % 60).astype(str)
+    return pd.DataFrame({
+        "date": frame["date"].dt.strftime("%Y-%m-%d"),
+        "time": frame["time"],
+        "duration": np.char.add(np.char.add(minutes, "m "), np.char.add(seconds, "s")),
+        "distractions": frame["distractions"],
+        "focus_score": np.char.mod("%.1f%%", frame["focus_score"].to_numpy())
+    }, index=frame.index)
+
+
+def downsample(frame, max_points=config.ANALYTICS_MAX_POINTS):
+    """Average consecutive sessions into at most max_points buckets
+
+    Keeps chart payloads bounded for long histories; each bucket is plotted
+    at the date of its first session.
+    """
+    if len(frame) <= max_points:
+        return frame
+    bucket = np.arange(len(frame)) * max_points // len(frame)
+    grouped = frame.groupby(bucket)
+    return pd.DataFrame({
+        "date": grouped["date"].first(),
+        "focus_score": grouped["focus_score"].mean(),
+        "distractions": grouped["distractions"].mean()
+    })
+
+
+def build_analytics(sessions, max_points=config.ANALYTICS_MAX_POINTS):
+    """Everything the Analytics tab needs, computed in one vectorized pass"""
+    frame = sessions_frame(sessions)
+    if frame.empty:
+        return None
+
+    dated = frame.dropna(subset=["date"])
+    weeks = dated["date"].dt.strftime("%G-W%V")
+    hours = frame["start"].dt.hour.dropna().astype("int64").rename("hour")
+    return {
+        "total_sessions": len(frame),
+        "total_study_time": int(frame["duration"].sum()),
+        "avg_focus_score": float(frame["focus_score"].mean()),
+        "total_distractions": int(frame["distractions"].sum()),
+        "daily": rollup(dated, dated["date"]),
+        "weekly": rollup(dated, weeks),
+        "hourly": rollup(frame.loc[hours.index], hours),
+        "chart": downsample(frame[["date", "focus_score", "distractions"]], max_points)
+    }
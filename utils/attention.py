@@ -0,0 +1,200 @@
+from collections import namedtuple
+import config
+
+FOCUSED = "focused"
+GRACE = "grace"
+DISTRACTED = "distracted"
+PAUSED = "paused"
+STATES = (FOCUSED, GRACE, DISTRACTED, PAUSED)
+
+AttentionEvent = namedtuple("AttentionEvent", ["timestamp", "kind", "previous", "state"])
+
+
+def is_attentive(result):
+    """Whether a detection result counts as attending: a face that is not turned away"""
+    return result["face_detected"] and not result.get("looking_away", False)
+
+
+class AttentionStateMachine:
+    """Focus accounting driven by detection timestamps
+
+    States:
+    - focused: face present
+    - grace: face missing for less than distraction_threshold seconds
+    - distracted: face missing for at least distraction_threshold seconds
+    - paused: session paused, time is not attributed to attention
+
+    Elapsed time between consecutive updates is credited to the current
+    state, so totals do not depend on the frame rate. A gap longer than
+    max_frame_gap while active (a stalled camera) credits only max_frame_gap
+    to the state and the rest to gap_time; time while paused is credited in
+    full, so active time plus paused time always covers the whole session.
+    Flicker is debounced: the face must be missing for absence_debounce
+    seconds before leaving focused, and present for recovery_time seconds
+    before returning to it.
+
+    update() returns a (usually empty) list of AttentionEvent tuples:
+    "transition" on every state change and "alert" when distracted, repeated
+    every alert_cooldown seconds while the face is still missing.
+    """
+
+    def __init__(self, distraction_threshold=config.DEFAULT_DISTRACTION_THRESHOLD,
+                 alert_cooldown=config.ALERT_COOLDOWN,
+                 absence_debounce=config.ABSENCE_DEBOUNCE,
+                 recovery_time=config.FOCUS_RECOVERY_TIME,
+                 max_frame_gap=config.MAX_FRAME_GAP):
+        self.distraction_threshold = distraction_threshold
+        self.alert_cooldown = alert_cooldown
+        self.absence_debounce = absence_debounce
+        self.recovery_time = recovery_time
+        self.max_frame_gap = max_frame_gap
+
+        self.state = FOCUSED
+        self.durations = {state: 0.0 for state in STATES}
+        self.distraction_count = 0
+        self.alert_count = 0
+        self.started_at = None
+        self.last_timestamp = None
+        self.last_face_time = None
+        self.present_since = None
+        self.last_alert_time = None
+        self.gap_time = 0.0
+
+    def update(self, timestamp, face_present):
+        """Feed one detection result; returns the events it caused
+
+        Results that repeat an earlier detection (frames skipped by the
+        detection scheduler) count at their own timestamp, so a skip can
+        only make a distraction onset late, never early.
+        """
+        events = []
+        if self.started_at is None:
+            self.started_at = timestamp
+            self.last_face_time = timestamp
+        self._advance(timestamp)
+        if self.state == PAUSED:
+            return events
+
+        if face_present:
+            self.last_face_time = max(self.last_face_time, timestamp)
+            if self.present_since is None:
+                self.present_since = timestamp
+        else:
+            self.present_since = None
+
+        absent_for = timestamp - self.last_face_time
+        if self.state == FOCUSED:
+            if not face_present and absent_for >= self.absence_debounce:
+                self._transition(timestamp, GRACE, events)
+        elif face_present:
+            if timestamp - self.present_since >= self.recovery_time:
+                self._transition(timestamp, FOCUSED, events)
+        if self.state == GRACE and absent_for >= self.distraction_threshold:
+            self.distraction_count += 1
+            self._transition(timestamp, DISTRACTED, events)
+
+        # No alerts once the face is back, even before recovery_time has passed
+        if self.state == DISTRACTED and not face_present:
+            if self.last_alert_time is None or timestamp - self.last_alert_time >= self.alert_cooldown:
+                self.last_alert_time = timestamp
+                self.alert_count += 1
+                events.append(AttentionEvent(timestamp, "alert", DISTRACTED, DISTRACTED))
+        return events
+
+    def pause(self, timestamp):
+        """Stop attributing time to attention states"""
+        events = []
+        if self.state != PAUSED:
+            self._advance(timestamp)
+            self._transition(timestamp, PAUSED, events)
+        return events
+
+    def resume(self, timestamp):
+        """Resume after pause() as if the face was just seen; the whole pause counts as paused"""
+        events = []
+        if self.state == PAUSED:
+            self._advance(timestamp)
+            self.last_face_time = timestamp
+            self.present_since = timestamp
+            self._transition(timestamp, FOCUSED, events)
+        return events
+
+    def paused_time(self, now=None):
+        """Seconds spent paused, including a pause still running at now"""
+        paused = self.durations[PAUSED]
+        if self.state == PAUSED and now is not None and self.last_timestamp is not None:
+            paused += max(0.0, now - self.last_timestamp)
+        return paused
+
+    def set_distraction_threshold(self, seconds):
+        """Change the distraction threshold mid-session"""
+        self.distraction_threshold = seconds
+
+    def focus_score(self):
+        """Score from the number of distraction episodes"""
+        score = config.PERFECT_SCORE - self.distraction_count * config.DISTRACTION_PENALTY
+        return max(config.MIN_SCORE, score)
+
+    def get_stats(self):
+        """Get time spent per state, distraction count and focus score"""
+        tracked = sum(self.durations[s] for s in (FOCUSED, GRACE, DISTRACTED))
+        active = tracked + self.gap_time
+        return {
+            "state": self.state,
+            "focus_time": self.durations[FOCUSED],
+            "grace_time": self.durations[GRACE],
+            "distracted_time": self.durations[DISTRACTED],
+            "paused_time": self.durations[PAUSED],
+            "gap_time": self.gap_time,
+            "active_time": active,
+            "focus_ratio": self.durations[FOCUSED] / tracked if tracked else 1.0,
+            "distraction_count": self.distraction_count,
+            "alert_count": self.alert_count,
+            "focus_score": self.focus_score()
+        }
+
+    def to_dict(self):
+        """Running totals and timing state, enough to continue the session later"""
+        return {
+            "distraction_threshold": self.distraction_threshold,
+            "state": self.state,
+            "durations": dict(self.durations),
+            "distraction_count": self.distraction_count,
+            "alert_count": self.alert_count,
+            "started_at": self.started_at,
+            "last_timestamp": self.last_timestamp,
+            "last_face_time": self.last_face_time,
+            "present_since": self.present_since,
+            "last_alert_time": self.last_alert_time,
+            "gap_time": self.gap_time
+        }
+
+    @classmethod
+    def from_dict(cls, data, **kwargs):
+        """Rebuild a state machine saved with to_dict()"""
+        machine = cls(data.get("distraction_threshold", config.DEFAULT_DISTRACTION_THRESHOLD), **kwargs)
+        machine.state = data.get("state", FOCUSED)
+        machine.durations.update(data.get("durations", {}))
+        for name in ("distraction_count", "alert_count", "started_at", "last_timestamp",
+                     "last_face_time", "present_since", "last_alert_time", "gap_time"):
+            if name in data:
+                setattr(machine, name, data[name])
+        return machine
+
+    def _advance(self, timestamp):
+        if self.last_timestamp is not None:
+            elapsed = timestamp - self.last_timestamp
+            if elapsed > 0:
+                credited = elapsed if self.state == PAUSED else min(elapsed, self.max_frame_gap)
+                self.durations[self.state] += credited
+                self.gap_time += elapsed - credited
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+
+    def _transition(self, timestamp, state, events):
+        if state == self.state:
+            return
+        events.append(AttentionEvent(timestamp, "transition", self.state, state))
+        if state != DISTRACTED:
+            self.last_alert_time = None
+        self.state = state
@@ -0,0 +1,217 @@
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import numpy as np
+import config
+from utils.attention import AttentionStateMachine, STATES, is_attentive
+from utils.face_detector import FaceDetector, create_face_detector
+from utils.frame_source import create_frame_source
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+_worker_detector = None
+_worker_mode = None
+
+
+def find_videos(paths):
+    """Expand directories into the video files they contain"""
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            videos.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(VIDEO_EXTENSIONS)
+            ))
+        else:
+            videos.append(path)
+    return videos
+
+
+def plan_chunks(spec, chunk_seconds=config.BATCH_CHUNK_SECONDS, stride=config.BATCH_STRIDE):
+    """Split a video into (spec, start_frame, end_frame) chunks
+
+    Chunk starts are multiples of stride, so the sampled frames are the same
+    as in a single pass. A source of unknown length is one open-ended chunk.
+    """
+    source = create_frame_source(spec)
+    try:
+        count = source.frame_count()
+        fps = source.fps
+    finally:
+        source.release()
+    if not count:
+        return [(spec, 0, None)]
+    size = max(stride, int(chunk_seconds * fps) // stride * stride)
+    return [(spec, start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def _init_worker(detector_factory, inference_mode):
+    global _worker_detector, _worker_mode
+    _worker_detector = detector_factory()
+    _worker_mode = inference_mode
+
+
+def analyze_chunk(spec, start, end, stride=config.BATCH_STRIDE):
+    """Detect faces on every stride-th frame of [start, end) in a worker
+
+    Frames between samples are grabbed without decoding. Timestamps are
+    media seconds (frame index / fps).
+    """
+    detector = FaceDetector(_worker_detector, mode=_worker_mode)
+    source = create_frame_source(spec)
+    times, faces, confidences = [], [], []
+    index = start
+    try:
+        source.seek(start)
+        while end is None or index < end:
+            if (index - start) % stride == 0:
+                ok, frame = source.read()
+                if not ok:
+                    break
+                result = detector.detect(frame, index / source.fps)
+                times.append(result["timestamp"])
+                faces.append(is_attentive(result))
+                confidences.append(result["confidence"])
+            elif not source.skip():
+                break
+            index += 1
+        fps = source.fps
+    finally:
+        source.release()
+    return {
+        "spec": spec,
+        "start": start,
+        "frames_read": index - start,
+        "fps": fps,
+        "times": np.array(times, dtype=np.float64),
+        "faces": np.array(faces, dtype=bool),
+        "confidence": np.array(confidences, dtype=np.float32)
+    }
+
+
+def summarize_video(spec, chunks, distraction_threshold=config.DEFAULT_DISTRACTION_THRESHOLD):
+    """Merge a video's chunk results into a session record and per-second timeline"""
+    chunks = sorted(chunks, key=lambda chunk: chunk["start"])
+    times = np.concatenate([chunk["times"] for chunk in chunks])
+    faces = np.concatenate([chunk["faces"] for chunk in chunks])
+    frames = sum(chunk["frames_read"] for chunk in chunks)
+    fps = chunks[0]["fps"]
+
+    attention = AttentionStateMachine(distraction_threshold)
+    states = np.empty(len(times), dtype=np.uint8)
+    codes = {state: code for code, state in enumerate(STATES)}
+    for i, (timestamp, face) in enumerate(zip(times, faces)):
+        attention.update(timestamp, bool(face))
+        states[i] = codes[attention.state]
+
+    stats = attention.get_stats()
+    duration = frames / fps if fps else 0.0
+    if os.path.isfile(spec):
+        # A recording's modification time is roughly when it ended
+        ended = datetime.fromtimestamp(os.path.getmtime(spec))
+    else:
+        ended = datetime.now()
+    started = ended - timedelta(seconds=duration)
+    session = {
+        "start_time": started.isoformat(),
+        "end_time": ended.isoformat(),
+        "duration": int(duration),
+        "distractions": stats["distraction_count"],
+        "focus_score": stats["focus_score"],
+        "date": started.strftime("%Y-%m-%d"),
+        "time": started.strftime("%H:%M:%S"),
+        "source": spec
+    }
+    return session, per_second_timeline(times, faces, states), frames, len(times)
+
+
+def per_second_timeline(times, faces, states):
+    """Face ratio and last attention state for every second of media time"""
+    if not len(times):
+        return []
+    seconds = times.astype(np.int64)
+    counts = np.bincount(seconds)
+    ratios = np.bincount(seconds, weights=faces) / np.maximum(counts, 1)
+    last = np.r_[np.flatnonzero(np.diff(seconds)), len(seconds) - 1]
+    state_by_second = np.full(len(counts), -1, dtype=np.int16)
+    state_by_second[seconds[last]] = states[last]
+    return [
+        {"second": int(second), "face_ratio": round(float(ratios[second]), 3),
+         "state": STATES[state_by_second[second]] if state_by_second[second] >= 0 else ""}
+        for second in range(len(counts))
+    ]
+
+
+def write_timeline_csv(path, timeline):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["second", "face_ratio", "state"])
+        writer.writeheader()
+        writer.writerows(timeline)
+
+
+def analyze_videos(specs, workers=config.BATCH_WORKERS, stride=config.BATCH_STRIDE,
+                   chunk_seconds=config.BATCH_CHUNK_SECONDS, detector_factory=create_face_detector,
+                   inference_mode=config.BATCH_INFERENCE_MODE,
+                   distraction_threshold=config.DEFAULT_DISTRACTION_THRESHOLD,
+                   data_manager=None, timeline_dir=None):
+    """Score many recordings across a process pool
+
+    Every video is cut into chunks and all chunks go into one pool, longest
+    videos first, so a few long recordings still use every core. Returns
+    per-video reports plus aggregate throughput. Sessions are added to
+    data_manager and per-second timelines written as CSV when given.
+    detector_factory must be picklable (workers are spawned).
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [chunk for spec in specs for chunk in plan_chunks(spec, chunk_seconds, stride)]
+    tasks.sort(key=lambda task: -((task[2] or 0) - task[1]))
+
+    start = time.perf_counter()
+    chunks = {spec: [] for spec in specs}
+    errors = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(detector_factory, inference_mode)) as pool:
+        futures = {pool.submit(analyze_chunk, spec, first, end, stride): spec for spec, first, end in tasks}
+        for future in as_completed(futures):
+            spec = futures[future]
+            try:
+                chunks[spec].append(future.result())
+            except Exception as e:
+                print(f"Error analyzing {spec}: {e}")
+                errors[spec] = str(e)
+    elapsed = time.perf_counter() - start
+
+    reports = []
+    for spec in specs:
+        if spec in errors or not chunks[spec]:
+            reports.append({"source": spec, "error": errors.get(spec, "no frames")})
+            continue
+        session, timeline, frames, samples = summarize_video(spec, chunks[spec], distraction_threshold)
+        report = {"source": spec, "session": session, "frames": frames, "samples": samples}
+        if timeline_dir:
+            name = os.path.splitext(os.path.basename(spec))[0] or "video"
+            report["timeline"] = os.path.join(timeline_dir, f"{len(reports):03d}-{name}.seconds.csv")
+            write_timeline_csv(report["timeline"], timeline)
+        if data_manager is not None:
+            report["session"] = data_manager.add_session(session)
+        reports.append(report)
+
+    frames = sum(report.get("frames", 0) for report in reports)
+    samples = sum(report.get("samples", 0) for report in reports)
+    return {
+        "videos": reports,
+        "workers": workers,
+        "chunks": len(tasks),
+        "seconds": elapsed,
+        "frames": frames,
+        "samples": samples,
+        "fps": frames / elapsed if elapsed else 0.0,
+        "samples_per_second": samples / elapsed if elapsed else 0.0
+    }
@@ -0,0 +1,187 @@
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+import config
+from utils.attention import AttentionStateMachine, PAUSED
+from utils.metrics import metrics
+
+
+class CheckpointStore:
+    """Checkpoint files of sessions that are still in progress
+
+    Every running session owns one small JSON file with its running totals
+    (a few hundred bytes). save() rewrites it via temp file, fsync and
+    rename, so a checkpoint costs the same no matter how large the session
+    history is; the history itself is only written once when the session
+    ends. A checkpoint that stops being refreshed (crash, closed tab) goes
+    stale and shows up in orphans(); claim() hands it to exactly one caller.
+    The owner of a session claims its own checkpoint before saving it, so a
+    session taken over elsewhere is never saved twice.
+    """
+
+    def __init__(self, directory=config.CHECKPOINT_DIR, fsync=True):
+        self.directory = directory
+        self.fsync = fsync
+        self.checkpoints = 0
+        self.last_bytes = 0
+        self._latencies = deque(maxlen=config.STATS_WINDOW)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def save(self, record):
+        """Atomically write the checkpoint of record["key"]"""
+        start = time.perf_counter()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path(record["key"])
+            tmp_path = path + ".tmp"
+            payload = json.dumps(record, separators=(",", ":"))
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing checkpoint: {e}")
+            return False
+        elapsed = time.perf_counter() - start
+        self.checkpoints += 1
+        self.last_bytes = len(payload)
+        self._latencies.append(elapsed)
+        metrics.observe("checkpoint.save", elapsed)
+        return True
+
+    def exists(self, key):
+        """Whether the checkpoint of key is still there (not claimed by someone else)"""
+        return os.path.exists(self.path(key))
+
+    def remove(self, key):
+        """Drop the checkpoint of a session that was saved normally"""
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error removing checkpoint: {e}")
+
+    def load_all(self):
+        """Every readable checkpoint record"""
+        records = []
+        if not os.path.isdir(self.directory):
+            return records
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    records.append(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Error reading checkpoint {name}: {e}")
+        return records
+
+    def orphans(self, stale_after=config.CHECKPOINT_STALE_AFTER, exclude=(), now=None,
+                paused_stale_after=config.CHECKPOINT_PAUSED_STALE_AFTER):
+        """Checkpoints not refreshed for stale_after seconds, oldest first
+
+        A paused session is not refreshed while it waits, so its checkpoint
+        only counts after paused_stale_after.
+        """
+        now = now or time.time()
+        return [
+            record for record in self.load_all()
+            if record.get("key") not in exclude and now - record.get("updated_at", 0) >= (
+                max(stale_after, paused_stale_after) if record.get("paused") else stale_after)
+        ]
+
+    def claim(self, key):
+        """Take over an orphan: returns its record, or None if someone else got it first"""
+        path = self.path(key)
+        claimed_path = path + ".claimed"
+        try:
+            os.replace(path, claimed_path)
+        except FileNotFoundError:
+            return None
+        try:
+            with open(claimed_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading checkpoint {key}: {e}")
+            return None
+        finally:
+            try:
+                os.remove(claimed_path)
+            except OSError:
+                pass
+
+    def get_stats(self):
+        """Checkpoint count, write latency and size"""
+        latencies = sorted(self._latencies)
+        return {
+            "checkpoints": self.checkpoints,
+            "checkpoint_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "checkpoint_max_ms": 1000 * latencies[-1] if latencies else 0.0,
+            "checkpoint_bytes": self.last_bytes
+        }
+
+
+def build_checkpoint(key, started_at, attention, timeline_key=None, now=None):
+    """Checkpoint record of a running session
+
+    elapsed is wall time since the start, duration excludes paused time.
+    """
+    now = now or time.time()
+    elapsed = now - started_at
+    return {
+        "key": key,
+        "started_at": started_at,
+        "updated_at": now,
+        "elapsed": elapsed,
+        "duration": max(0.0, elapsed - attention.paused_time(now)),
+        "paused": attention.state == PAUSED,
+        "attention": attention.to_dict(),
+        "timeline": timeline_key
+    }
+
+
+def restore_attention(record):
+    """Paused AttentionStateMachine continuing a checkpointed session"""
+    attention = AttentionStateMachine.from_dict(record["attention"])
+    attention.pause(attention.last_timestamp or record["updated_at"])
+    return attention
+
+
+def session_from_checkpoint(record, max_duration=config.MAX_SESSION_DURATION):
+    """Session data for DataManager.add_session() from an orphaned checkpoint
+
+    The session is closed at its last checkpoint, so at most one interval
+    of the crashed session is lost.
+    """
+    attention = AttentionStateMachine.from_dict(record["attention"])
+    ended = datetime.fromtimestamp(record["updated_at"])
+    session = {
+        "start_time": datetime.fromtimestamp(record["started_at"]).isoformat(),
+        "end_time": ended.isoformat(),
+        "duration": int(min(record.get("duration", record["elapsed"]), max_duration)),
+        "distractions": attention.distraction_count,
+        "focus_score": attention.focus_score(),
+        "date": ended.strftime("%Y-%m-%d"),
+        "time": ended.strftime("%H:%M:%S")
+    }
+    if record.get("timeline"):
+        session["timeline"] = record["timeline"]
+    return session
+
+
+def finalize_orphans(store, data_manager, older_than=config.CHECKPOINT_RESUME_WINDOW, exclude=(), now=None):
+    """Save orphaned sessions too old to resume; returns the saved sessions"""
+    saved = []
+    for record in store.orphans(older_than, exclude, now):
+        record = store.claim(record["key"])
+        if record is not None:
+            saved.append(data_manager.add_session(session_from_checkpoint(record)))
+    return saved
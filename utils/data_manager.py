@@ -1,32 +1,84 @@
-import json
-import os
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 import config
+from utils.export import export_sessions
+from utils.metrics import metrics
+from utils.session_stats import SessionAggregates, rollup_statistics
+from utils.session_store import EMPTY_STATISTICS, create_session_store
+
+def _as_date(day):
+    if day is None:
+        return datetime.now().date()
+    if isinstance(day, str):
+        return datetime.strptime(day, "%Y-%m-%d").date()
+    return day
+
+def _date_key(day):
+    """YYYY-MM-DD for a date bound, None for an open one"""
+    return None if day is None else _as_date(day).strftime("%Y-%m-%d")
 
 class DataManager:
-    def __init__(self, data_file=config.DATA_FILE):
+    def __init__(self, data_file=config.DATA_FILE, backend=config.STORAGE_BACKEND):
         self.data_file = data_file
+        self.store = create_session_store(data_file, backend)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_lock = threading.RLock()
+        self._cache_signature = None
+        self._cache_sessions = None
         self.ensure_data_file()
-    
+
     def ensure_data_file(self):
-        """Ensure data file exists with proper structure"""
-        if not os.path.exists(os.path.dirname(self.data_file)):
-            os.makedirs(os.path.dirname(self.data_file))
-        
-        if not os.path.exists(self.data_file):
-            initial_data = {
-                "sessions": [],
-                "total_study_time": 0,
-                "total_distractions": 0,
-                "created_at": datetime.now().isoformat()
-            }
-            self.save_data(initial_data)
-    
+        """Ensure the session store exists, migrating an old sessions.json if present"""
+        try:
+            self.store.ensure()
+        except Exception as e:
+            print(f"Error preparing data store: {e}")
+
+    def _cached_sessions(self):
+        """Session list served from memory until the store signature changes"""
+        with self._cache_lock:
+            signature = self.store.signature()
+            if self._cache_sessions is not None and signature == self._cache_signature:
+                self.cache_hits += 1
+                metrics.increment("storage.cache_hits")
+            else:
+                self.cache_misses += 1
+                metrics.increment("storage.cache_misses")
+                with metrics.timer("storage.read_all"):
+                    self._cache_sessions = list(self.store.iter_sessions())
+                self._cache_signature = signature
+            return self._cache_sessions
+
+    def invalidate_cache(self):
+        """Drop cached reads"""
+        with self._cache_lock:
+            self._cache_sessions = None
+            self._cache_signature = None
+
+    def get_cache_stats(self):
+        """Get read cache hit/miss counters"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_ratio": self.cache_hits / total if total else 0.0,
+            "cached_sessions": len(self._cache_sessions) if self._cache_sessions is not None else 0
+        }
+
+    def get_data_version(self):
+        """Opaque value that changes whenever the stored history changes"""
+        return self.store.signature()
+
     def load_data(self):
-        """Load data from JSON file"""
+        """Load the full history into the legacy dict layout"""
         try:
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
+            sessions = list(self._cached_sessions())
+            data = self.store.metadata()
+            data["sessions"] = sessions
+            data["total_study_time"] = sum(s.get("duration", 0) for s in sessions)
+            data["total_distractions"] = sum(s.get("distractions", 0) for s in sessions)
+            return data
         except Exception as e:
             print(f"Error loading data: {e}")
             return {
@@ -34,78 +86,192 @@ class DataManager:
                 "total_study_time": 0,
                 "total_distractions": 0
             }
-    
+
     def save_data(self, data):
-        """Save data to JSON file"""
+        """Replace the whole history with data (atomic snapshot rewrite)"""
         try:
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=4)
+            header = {k: v for k, v in data.items() if k != "sessions"}
+            header.setdefault("total_study_time", 0)
+            header.setdefault("total_distractions", 0)
+            with metrics.timer("storage.replace_all"):
+                self.store.replace_all(header, data.get("sessions", []))
+            self.invalidate_cache()
             return True
         except Exception as e:
             print(f"Error saving data: {e}")
             return False
-    
+
     def add_session(self, session_data):
-        """Add a new study session"""
-        data = self.load_data()
-        
+        """Add a new study session (appended under a lock, ids never reused)"""
         session = {
-            "id": len(data["sessions"]) + 1,
             "start_time": session_data.get("start_time"),
             "end_time": session_data.get("end_time"),
             "duration": session_data.get("duration", 0),
             "distractions": session_data.get("distractions", 0),
             "focus_score": session_data.get("focus_score", 100),
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "time": datetime.now().strftime("%H:%M:%S")
+            "date": session_data.get("date") or datetime.now().strftime("%Y-%m-%d"),
+            "time": session_data.get("time") or datetime.now().strftime("%H:%M:%S")
         }
-        
-        data["sessions"].append(session)
-        data["total_study_time"] += session["duration"]
-        data["total_distractions"] += session["distractions"]
-        
-        self.save_data(data)
+        for key in ("timeline", "stream", "source"):
+            if session_data.get(key):
+                session[key] = session_data[key]
+
+        try:
+            with self._cache_lock:
+                with metrics.timer("storage.add_session"):
+                    session = self.store.add(session)
+                before, after = self.store.last_write
+                if self._cache_sessions is not None and before == self._cache_signature:
+                    # Nobody else wrote since we cached: extend instead of re-reading
+                    self._cache_sessions.append(session)
+                    self._cache_signature = after
+                else:
+                    self.invalidate_cache()
+        except Exception as e:
+            print(f"Error saving session: {e}")
         return session
-    
+
     def get_all_sessions(self):
         """Get all study sessions"""
-        data = self.load_data()
-        return data.get("sessions", [])
-    
+        try:
+            return list(self._cached_sessions())
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return []
+
     def get_today_sessions(self):
         """Get today's study sessions"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        sessions = self.get_all_sessions()
-        return [s for s in sessions if s.get("date") == today]
-    
+        return self.get_sessions_for_day()
+
+    def get_sessions_between(self, start_date, end_date):
+        """Get sessions dated within [start_date, end_date] (dates or YYYY-MM-DD strings)"""
+        start = _as_date(start_date).strftime("%Y-%m-%d")
+        end = _as_date(end_date).strftime("%Y-%m-%d")
+        try:
+            if self.store.indexed:
+                with metrics.timer("storage.sessions_between"):
+                    return self.store.sessions_between(start, end)
+            return [s for s in self._cached_sessions() if start <= s.get("date", "") <= end]
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return []
+
+    def get_sessions_for_day(self, day=None):
+        """Get sessions of one day (default today)"""
+        day = _as_date(day)
+        return self.get_sessions_between(day, day)
+
+    def get_week_sessions(self, day=None):
+        """Get sessions of the Monday-Sunday week containing day (default today)"""
+        day = _as_date(day)
+        monday = day - timedelta(days=day.weekday())
+        return self.get_sessions_between(monday, monday + timedelta(days=6))
+
+    def get_month_sessions(self, day=None):
+        """Get sessions of the calendar month containing day (default today)"""
+        day = _as_date(day)
+        first = day.replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return self.get_sessions_between(first, last)
+
+    def iter_sessions(self, start_date=None, end_date=None, after_id=0):
+        """Yield sessions in id order straight from the store, optionally within a date range
+
+        Dates are inclusive and may be None for an open range; after_id
+        resumes after a previously seen session. Nothing is cached, so
+        memory stays constant however long the history is.
+        """
+        try:
+            yield from self.store.iter_range(_date_key(start_date), _date_key(end_date), after_id)
+        except Exception as e:
+            print(f"Error loading data: {e}")
+
+    def get_sessions_page(self, cursor=None, limit=config.HISTORY_PAGE_SIZE, start_date=None,
+                          end_date=None, newest_first=True):
+        """Get one page of sessions and the cursor of the next page
+
+        Returns (sessions, next_cursor). cursor is None for the first page,
+        then the next_cursor of the previous page; next_cursor is None on
+        the last page. Cursors are session ids, so pages stay stable while
+        new sessions are added.
+        """
+        try:
+            with metrics.timer("storage.page"):
+                sessions = self.store.page(cursor, limit + 1, _date_key(start_date), _date_key(end_date),
+                                           newest_first)
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return [], None
+        if len(sessions) > limit:
+            sessions = sessions[:limit]
+            return sessions, sessions[-1]["id"]
+        return sessions, None
+
+    def count_sessions(self, start_date=None, end_date=None):
+        """Number of sessions within a date range, from the daily aggregates"""
+        start, end = _date_key(start_date), _date_key(end_date)
+        if start is None and end is None:
+            return self.get_statistics()["total_sessions"]
+        daily = self.store.get_aggregates().daily
+        return sum(rollup["count"] for day, rollup in daily.items()
+                   if (start is None or day >= start) and (end is None or day <= end))
+
+    def export_sessions(self, path, fmt=None, start_date=None, end_date=None):
+        """Stream sessions to a CSV, JSON lines or Parquet file in constant memory
+
+        fmt defaults to the file extension. Returns the number of sessions
+        written, or None if the export failed.
+        """
+        try:
+            with metrics.timer("storage.export"):
+                sessions = self.store.iter_range(_date_key(start_date), _date_key(end_date))
+                return export_sessions(sessions, path, fmt)
+        except Exception as e:
+            print(f"Error exporting data: {e}")
+            return None
+
     def get_statistics(self):
-        """Get overall statistics"""
-        data = self.load_data()
-        sessions = data.get("sessions", [])
-        
-        if not sessions:
-            return {
-                "total_sessions": 0,
-                "total_study_time": 0,
-                "total_distractions": 0,
-                "avg_session_duration": 0,
-                "avg_focus_score": 0
-            }
-        
-        total_sessions = len(sessions)
-        total_time = sum(s["duration"] for s in sessions)
-        total_distractions = sum(s["distractions"] for s in sessions)
-        avg_duration = total_time / total_sessions if total_sessions > 0 else 0
-        avg_score = sum(s.get("focus_score", 0) for s in sessions) / total_sessions if total_sessions > 0 else 0
-        
+        """Get overall statistics (constant time, from running aggregates)"""
+        try:
+            with metrics.timer("storage.statistics"):
+                return self.store.statistics()
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return dict(EMPTY_STATISTICS)
+
+    def get_daily_statistics(self):
+        """Get statistics per day, keyed by YYYY-MM-DD"""
+        daily = self.store.get_aggregates().daily
+        return {day: rollup_statistics(rollup) for day, rollup in sorted(daily.items())}
+
+    def get_weekly_statistics(self):
+        """Get statistics per ISO week, keyed like 2026-W03"""
+        weekly = self.store.get_aggregates().weekly
+        return {week: rollup_statistics(rollup) for week, rollup in sorted(weekly.items())}
+
+    def verify_statistics(self):
+        """Compare the running aggregates with a full recompute"""
+        stored = self.store.get_aggregates()
+        recomputed = SessionAggregates.from_sessions(self._cached_sessions())
         return {
-            "total_sessions": total_sessions,
-            "total_study_time": total_time,
-            "total_distractions": total_distractions,
-            "avg_session_duration": avg_duration,
-            "avg_focus_score": avg_score
+            "consistent": stored == recomputed,
+            "stored": stored.statistics(),
+            "recomputed": recomputed.statistics()
         }
-    
+
+    def repair_statistics(self):
+        """Rebuild the running aggregates from the session history"""
+        self.store.rebuild_aggregates()
+        return self.verify_statistics()["consistent"]
+
+    def compact(self):
+        """Compact the backing store (fold log into snapshot / checkpoint WAL)"""
+        with self._cache_lock:
+            fresh = self._cache_sessions is not None and self.store.signature() == self._cache_signature
+            self.store.compact()
+            if fresh:
+                self._cache_signature = self.store.signature()
+
     def clear_all_data(self):
         """Clear all session data (reset)"""
         initial_data = {
@@ -0,0 +1,357 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import config
+from utils.face_detector import FaceDetector, create_face_detector
+from utils.frame_source import create_frame_source
+from utils.attention import is_attentive
+from utils.latency_histogram import LatencyHistogram
+from utils.metrics import metrics
+from utils.preview import PreviewEncoder
+
+# End-of-stream marker passed down the pipeline when a recorded source runs out
+_END = object()
+
+
+class PipelineStage:
+    """Input queue, latency histogram and drop counter of one pipeline stage
+
+    With drop_oldest the queue never blocks the producer: the oldest item
+    is discarded to make room. Otherwise put() blocks, so a slow stage
+    applies backpressure upstream and nothing is lost.
+    """
+
+    def __init__(self, name, queue_size=0, drop_oldest=True):
+        self.name = name
+        self.queue = queue.Queue(maxsize=queue_size) if queue_size else None
+        self.drop_oldest = drop_oldest
+        self.latency = LatencyHistogram()
+        self.processed = 0
+        self.dropped = 0
+
+    def put(self, item, stop_event):
+        if not self.drop_oldest:
+            while not stop_event.is_set():
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            return
+
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, stop_event):
+        """Next item, or None once stop_event is set"""
+        while not stop_event.is_set():
+            try:
+                return self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def get_stats(self):
+        return {
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            **self.latency.to_dict()
+        }
+
+
+class DetectionEngine:
+    """Long-lived capture + face detection pipeline running in background threads
+
+    Capture, preprocessing (the scheduler's skip decision and motion gate),
+    inference and preview rendering each run in their own thread, connected
+    by small bounded queues, so the slowest stage no longer sets the pace of
+    the others. Preview rendering hangs off the inference stage through a
+    drop-oldest queue and never delays results. With drop_when_full (live
+    sources) the capture and inference queues drop their oldest frames;
+    without it they block, so a replay loses nothing.
+
+    Results are pushed into a bounded queue that the UI drains with poll();
+    the render stage feeds preview (a PreviewEncoder), which throttles,
+    downscales and JPEG-encodes the camera feed for the UI. source is anything
+    accepted by create_frame_source(), or None for push mode where frames
+    arrive through process_frame(). With a DetectionScheduler, frames the
+    scheduler skips repeat the last detection and are marked "skipped".
+    """
+
+    def __init__(self, source=config.FRAME_SOURCE, detector_factory=create_face_detector,
+                 queue_size=config.RESULT_QUEUE_SIZE, keep_frames=True, drop_when_full=True,
+                 scheduler=None, inference_mode=config.INFERENCE_MODE,
+                 stage_queue_size=config.PIPELINE_QUEUE_SIZE, preview=None):
+        self.source = create_frame_source(source) if source is not None else None
+        self.detector_factory = detector_factory
+        self.inference_mode = inference_mode
+        self.scheduler = scheduler
+        self.keep_frames = keep_frames
+        self.preview = preview if preview is not None else (PreviewEncoder() if keep_frames else None)
+        self.drop_when_full = drop_when_full
+        self.results = queue.Queue(maxsize=queue_size)
+        self.stages = {
+            "capture": PipelineStage("capture"),
+            "preprocess": PipelineStage("preprocess", stage_queue_size, drop_when_full),
+            "infer": PipelineStage("infer", stage_queue_size, drop_when_full),
+            "render": PipelineStage("render", config.PREVIEW_QUEUE_SIZE, drop_oldest=True)
+        }
+
+        self._detector = None
+        self._threads = []
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+        self.finished = False
+        self.latest = None
+        self._last_detection = None
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._capture_times = deque(maxlen=config.STATS_WINDOW)
+        self._detect_latencies = deque(maxlen=config.STATS_WINDOW)
+
+    def is_running(self):
+        """Check whether any pipeline thread is alive"""
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        """Start the pipeline threads if they are not already running"""
+        with self._lock:
+            if self.is_running() or self.source is None:
+                return
+            self._stop_event.clear()
+            self.finished = False
+            for stage in ("preprocess", "infer", "render"):
+                self.stages[stage].queue = queue.Queue(maxsize=self.stages[stage].queue.maxsize)
+            loops = [("capture", self._capture_loop), ("preprocess", self._preprocess_loop),
+                     ("infer", self._infer_loop)]
+            if self.keep_frames:
+                loops.append(("render", self._render_loop))
+            self._threads = [
+                threading.Thread(target=self._run_stage, args=(name, loop), name=f"detection-{name}", daemon=True)
+                for name, loop in loops
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop the pipeline threads and release the capture device
+
+        Queued results, the latest result and the scheduler / tracking
+        state are dropped too: the engine is shared across sessions, and a
+        restart must not hand the previous session's results to the next.
+        """
+        with self._lock:
+            self._stop_event.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+            self.poll()
+            for stage in ("preprocess", "infer", "render"):
+                self.stages[stage].queue = queue.Queue(maxsize=self.stages[stage].queue.maxsize)
+            self.latest = None
+            self._last_detection = None
+            if self.scheduler is not None:
+                self.scheduler.reset()
+            if self._detector is not None:
+                self._detector.reset()
+
+    def poll(self, max_items=None):
+        """Return all results queued since the last poll (non-blocking)"""
+        items = []
+        while max_items is None or len(items) < max_items:
+            try:
+                items.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def get_stats(self):
+        """Get measured capture FPS, detection latency, queue depth and per-stage stats"""
+        times = list(self._capture_times)
+        latencies = list(self._detect_latencies)
+        capture_fps = 0.0
+        if len(times) > 1 and times[-1] > times[0]:
+            capture_fps = (len(times) - 1) / (times[-1] - times[0])
+        stages = self.stages
+        return {
+            "capture_fps": capture_fps,
+            "detect_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "queue_depth": self.results.qsize(),
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped + stages["preprocess"].dropped + stages["infer"].dropped,
+            "preview_dropped": stages["render"].dropped,
+            "running": self.is_running(),
+            "stages": {name: stage.get_stats() for name, stage in stages.items()},
+            **(self.preview.get_stats() if self.preview is not None else {}),
+            **(self._detector.get_stats() if self._detector is not None else {}),
+            **(self.scheduler.get_stats() if self.scheduler is not None else {})
+        }
+
+    def process_frame(self, frame, captured_at):
+        """Detect (or skip) one BGR frame synchronously and publish the result
+
+        Used by push-style producers such as the WebRTC processor, which
+        construct the engine with source=None; all stages run inline.
+        """
+        self._count_capture()
+        result = self._infer(frame, captured_at, not self._should_skip(captured_at, frame))
+        self._publish(result)
+        if self.keep_frames:
+            self._render(frame, result)
+        return result
+
+    def _run_stage(self, name, loop):
+        try:
+            loop()
+        except Exception as e:
+            print(f"Error in detection engine ({name}): {e}")
+            self._stop_event.set()
+
+    def _capture_loop(self):
+        source = self.source
+        stage = self.stages["capture"]
+        downstream = self.stages["preprocess"]
+        try:
+            while not self._stop_event.is_set():
+                start = time.perf_counter()
+                ret, frame = source.read()
+                if not ret:
+                    if source.live:
+                        time.sleep(0.05)
+                        continue
+                    downstream.put(_END, self._stop_event)
+                    break
+                if source.reuses_buffer:
+                    frame = frame.copy()
+                elapsed = time.perf_counter() - start
+                stage.latency.add(elapsed)
+                metrics.observe("engine.capture", elapsed)
+                stage.processed += 1
+                self._count_capture()
+                downstream.put((frame, source.timestamp), self._stop_event)
+        finally:
+            source.release()
+
+    def _preprocess_loop(self):
+        stage = self.stages["preprocess"]
+        downstream = self.stages["infer"]
+        while True:
+            item = stage.get(self._stop_event)
+            if item is None:
+                return
+            if item is _END:
+                downstream.put(_END, self._stop_event)
+                return
+            frame, captured_at = item
+            start = time.perf_counter()
+            run = not self._should_skip(captured_at, frame)
+            stage.latency.add(time.perf_counter() - start)
+            stage.processed += 1
+            downstream.put((frame, captured_at, run), self._stop_event)
+
+    def _infer_loop(self):
+        stage = self.stages["infer"]
+        render = self.stages["render"]
+        while True:
+            item = stage.get(self._stop_event)
+            if item is None:
+                return
+            if item is _END:
+                render.put(_END, self._stop_event)
+                self.finished = True
+                return
+            frame, captured_at, run = item
+            start = time.perf_counter()
+            result = self._infer(frame, captured_at, run)
+            self._publish(result)
+            elapsed = time.perf_counter() - start
+            stage.latency.add(elapsed)
+            metrics.observe("engine.infer", elapsed)
+            stage.processed += 1
+            if self.keep_frames:
+                render.put((frame, result), self._stop_event)
+
+    def _render_loop(self):
+        stage = self.stages["render"]
+        while True:
+            item = stage.get(self._stop_event)
+            if item is None or item is _END:
+                return
+            self._render(*item)
+
+    def _count_capture(self):
+        self.frames_captured += 1
+        self._capture_times.append(time.time())
+
+    def _infer(self, frame, captured_at, run):
+        if self._detector is None:
+            self._detector = FaceDetector(self.detector_factory(), mode=self.inference_mode)
+        if not run and self._last_detection is not None:
+            return dict(self._last_detection, timestamp=captured_at, skipped=True)
+
+        start = time.perf_counter()
+        result = self._detector.detect(frame, captured_at)
+        self._detect_latencies.append(time.perf_counter() - start)
+        self._last_detection = dict(result)
+        if self.scheduler is not None:
+            self.scheduler.record(captured_at, is_attentive(result), result["confidence"])
+        return result
+
+    def _render(self, frame, result):
+        stage = self.stages["render"]
+        start = time.perf_counter()
+        self.preview.render(frame, result["box"])
+        elapsed = time.perf_counter() - start
+        stage.latency.add(elapsed)
+        metrics.observe("engine.render", elapsed)
+        stage.processed += 1
+
+    def _should_skip(self, timestamp, frame):
+        return self.scheduler is not None and not self.scheduler.should_run(timestamp, frame)
+
+    def _publish(self, result):
+        self.latest = result
+        if not self.drop_when_full:
+            while not self._stop_event.is_set():
+                try:
+                    self.results.put(result, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            return
+
+        while True:
+            try:
+                self.results.put_nowait(result)
+                return
+            except queue.Full:
+                try:
+                    self.results.get_nowait()
+                    self.frames_dropped += 1
+                    metrics.increment("engine.results_dropped")
+                except queue.Empty:
+                    pass
+
+
+def draw_box(image, box, color=(102, 126, 234)):
+    """Draw a relative bounding box onto a frame in place (color in the frame's channel order)"""
+    if box is None:
+        return
+    height, width = image.shape[:2]
+    x, y, w, h = box
+    top_left = (int(x * width), int(y * height))
+    bottom_right = (int((x + w) * width), int((y + h) * height))
+    cv2.rectangle(image, top_left, bottom_right, color, 2)
@@ -0,0 +1,148 @@
+import threading
+
+import cv2
+import numpy as np
+import config
+
+THUMBNAIL_SIZE = (32, 24)
+
+
+class DetectionScheduler:
+    """Decides per frame whether the face detector has to run
+
+    While a face is steadily present with good confidence, inference runs
+    every stable_interval seconds. When the face disappears or confidence
+    drops, it ramps up to active_interval (0 = every frame) until enough
+    confident detections are seen again. An optional frame-difference gate
+    skips inference on static frames and triggers it early on motion; it
+    only gates while the face is stable, so a lost face is re-acquired at
+    the active rate even in a static scene.
+
+    No frame ever goes longer than max_onset_latency seconds without
+    inference, which bounds how late the onset of a distraction is noticed.
+
+    should_run() and record() may be called from different threads (the
+    engine's preprocess and inference stages); state is guarded by a lock.
+    """
+
+    def __init__(self, distraction_threshold=config.DEFAULT_DISTRACTION_THRESHOLD,
+                 stable_interval=config.DETECTION_STABLE_INTERVAL,
+                 active_interval=config.DETECTION_ACTIVE_INTERVAL,
+                 max_onset_latency=config.MAX_ONSET_LATENCY,
+                 low_confidence=config.LOW_CONFIDENCE_THRESHOLD,
+                 stable_detections=config.STABLE_DETECTIONS_REQUIRED,
+                 motion_gate=config.MOTION_GATE_ENABLED,
+                 motion_threshold=config.MOTION_GATE_THRESHOLD):
+        self.stable_interval = stable_interval
+        self.active_interval = active_interval
+        self.max_onset_latency = max_onset_latency
+        self.low_confidence = low_confidence
+        self.stable_detections = stable_detections
+        self.motion_gate = motion_gate
+        self.motion_threshold = motion_threshold
+        self._lock = threading.Lock()
+        self.set_distraction_threshold(distraction_threshold)
+
+        self.last_run_at = None
+        self.confident_streak = 0
+        self.inferences_run = 0
+        self.inferences_skipped = 0
+        self.skipped_static = 0
+        self.motion_triggered = 0
+
+        self._thumbnail = np.empty((THUMBNAIL_SIZE[1], THUMBNAIL_SIZE[0], 3), dtype=np.uint8)
+        self._gray = np.empty((THUMBNAIL_SIZE[1], THUMBNAIL_SIZE[0]), dtype=np.uint8)
+        self._reference = None
+
+    def set_distraction_threshold(self, seconds):
+        """Update the threshold; the latency bound never exceeds it"""
+        with self._lock:
+            self.distraction_threshold = seconds
+            self.max_interval = min(self.max_onset_latency, seconds)
+
+    def is_stable(self):
+        """Whether the face has been confidently present for long enough"""
+        return self.confident_streak >= self.stable_detections
+
+    def current_interval(self):
+        """Seconds to wait between inferences in the current state"""
+        if self.is_stable():
+            return min(self.stable_interval, self.max_interval)
+        return self.active_interval
+
+    def should_run(self, timestamp, frame=None):
+        """Return True if the detector should run on this frame"""
+        with self._lock:
+            return self._should_run(timestamp, frame)
+
+    def _should_run(self, timestamp, frame):
+        if self.last_run_at is None:
+            return self._run(frame)
+
+        since = timestamp - self.last_run_at
+        if since >= self.max_interval:
+            return self._run(frame)
+
+        if self.motion_gate and frame is not None and self._reference is not None and self.is_stable():
+            if self._motion(frame) >= self.motion_threshold:
+                if since >= self.active_interval:
+                    self.motion_triggered += 1
+                    return self._run(frame)
+            else:
+                self.skipped_static += 1
+                return self._skip()
+
+        if since >= self.current_interval():
+            return self._run(frame)
+        return self._skip()
+
+    def record(self, timestamp, face_detected, confidence):
+        """Feed back the outcome of an inference"""
+        with self._lock:
+            self.last_run_at = timestamp
+            if face_detected and confidence >= self.low_confidence:
+                self.confident_streak += 1
+            else:
+                self.confident_streak = 0
+
+    def reset(self):
+        """Forget the last inference and the stable streak (counters are kept)"""
+        with self._lock:
+            self.last_run_at = None
+            self.confident_streak = 0
+            self._reference = None
+
+    def get_stats(self):
+        """Get counters for inferences run vs skipped"""
+        with self._lock:
+            return self._stats()
+
+    def _stats(self):
+        total = self.inferences_run + self.inferences_skipped
+        return {
+            "inferences_run": self.inferences_run,
+            "inferences_skipped": self.inferences_skipped,
+            "skipped_static": self.skipped_static,
+            "motion_triggered": self.motion_triggered,
+            "skip_ratio": self.inferences_skipped / total if total else 0.0,
+            "interval": self.current_interval()
+        }
+
+    def _run(self, frame):
+        self.inferences_run += 1
+        if self.motion_gate and frame is not None:
+            self._reference = self._to_gray(frame).copy()
+        return True
+
+    def _skip(self):
+        self.inferences_skipped += 1
+        return False
+
+    def _to_gray(self, frame):
+        cv2.resize(frame, THUMBNAIL_SIZE, dst=self._thumbnail, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._thumbnail, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        return self._gray
+
+    def _motion(self, frame):
+        gray = self._to_gray(frame)
+        return float(cv2.absdiff(gray, self._reference).mean())
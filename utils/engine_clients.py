@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import deque
+
+import config
+
+
+class EngineHub:
+    """Shares one long-lived detection engine between browser sessions
+
+    Each session works through its own EngineClient. The engine runs while
+    at least one client holds it: start() adds the client and stop() only
+    stops the engine when the last client lets go. Results are fanned out,
+    so every client's poll() sees every detection instead of sessions
+    splitting one queue between them. A client that has not polled for
+    client_timeout seconds (a closed tab) loses its hold, so an abandoned
+    session cannot keep the camera open forever. The scheduler follows the
+    strictest distraction threshold among the clients.
+    """
+
+    def __init__(self, engine, client_timeout=config.ENGINE_CLIENT_TIMEOUT,
+                 queue_size=config.RESULT_QUEUE_SIZE):
+        self.engine = engine
+        self.client_timeout = client_timeout
+        self.queue_size = queue_size
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def client(self):
+        """A new client for one session; it holds nothing until start()"""
+        return EngineClient(self)
+
+    def clients(self):
+        with self._lock:
+            return len(self._clients)
+
+    def _start(self, client):
+        with self._lock:
+            self._expire(time.time())
+            client.last_poll = time.time()
+            if client not in self._clients:
+                client.results.clear()
+                self._clients.add(client)
+                self._apply_threshold()
+            self.engine.start()
+
+    def _stop(self, client):
+        with self._lock:
+            self._clients.discard(client)
+            client.results.clear()
+            if not self._clients:
+                self.engine.stop()
+            else:
+                self._apply_threshold()
+
+    def _poll(self, client, max_items):
+        with self._lock:
+            now = time.time()
+            client.last_poll = now
+            items = self.engine.poll()
+            for other in self._clients:
+                other.results.extend(items)
+            self._expire(now)
+        results = []
+        while client.results and (max_items is None or len(results) < max_items):
+            results.append(client.results.popleft())
+        return results
+
+    def _set_threshold(self, client, seconds):
+        with self._lock:
+            client.distraction_threshold = seconds
+            self._apply_threshold()
+
+    def _apply_threshold(self):
+        thresholds = [c.distraction_threshold for c in self._clients if c.distraction_threshold is not None]
+        if self.engine.scheduler is not None and thresholds:
+            self.engine.scheduler.set_distraction_threshold(min(thresholds))
+
+    def _expire(self, now):
+        stale = {c for c in self._clients if now - c.last_poll > self.client_timeout}
+        if not stale:
+            return
+        self._clients -= stale
+        for client in stale:
+            client.results.clear()
+        if not self._clients:
+            self.engine.stop()
+
+
+class EngineClient:
+    """One session's view of an EngineHub, with the engine's monitoring interface"""
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.results = deque(maxlen=hub.queue_size)
+        self.last_poll = 0.0
+        self.distraction_threshold = None
+
+    @property
+    def scheduler(self):
+        return self.hub.engine.scheduler
+
+    @property
+    def latest(self):
+        return self.hub.engine.latest
+
+    @property
+    def preview(self):
+        return self.hub.engine.preview
+
+    def start(self):
+        """Hold the engine, starting it if no other session is"""
+        self.hub._start(self)
+
+    def stop(self):
+        """Let go of the engine; it stops once no session holds it"""
+        self.hub._stop(self)
+
+    def is_running(self):
+        return self.hub.engine.is_running()
+
+    def poll(self, max_items=None):
+        """Return this session's results produced since its last poll"""
+        return self.hub._poll(self, max_items)
+
+    def set_distraction_threshold(self, seconds):
+        self.hub._set_threshold(self, seconds)
+
+    def get_stats(self):
+        return {**self.hub.engine.get_stats(), "sessions": self.hub.clients()}
@@ -0,0 +1,136 @@
+import csv
+import json
+import os
+import config
+from utils.session_store import SESSION_COLUMNS
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+EXPORT_EXTENSIONS = EXPORT_FORMATS + ("ndjson", "pq")
+# Optional session keys written as extra columns (all plain strings)
+EXPORT_COLUMNS = SESSION_COLUMNS + ("source", "stream", "timeline")
+
+
+def parquet_available():
+    """Whether pyarrow is installed, which Parquet export needs"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_formats():
+    """Export formats usable with the installed packages"""
+    return tuple(fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or parquet_available())
+
+
+def format_from_path(path):
+    """Export format implied by a file extension (.csv, .jsonl/.ndjson, .parquet)"""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    fmt = {"ndjson": "jsonl", "pq": "parquet"}.get(extension, extension)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {extension or path}")
+    return fmt
+
+
+def prune_exports(directory=config.EXPORT_DIR, keep=config.EXPORT_KEEP):
+    """Delete all but the newest keep export files in directory; returns how many were removed"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    paths = [os.path.join(directory, name) for name in names
+             if os.path.splitext(name)[1].lower().lstrip(".") in EXPORT_EXTENSIONS]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    removed = 0
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            print(f"Error removing export {path}: {e}")
+    return removed
+
+
+def export_sessions(sessions, path, fmt=None, batch_size=config.EXPORT_BATCH_SIZE):
+    """Stream sessions (any iterable) to path as CSV, JSON lines or Parquet
+
+    Rows are written as they are read, so memory does not grow with the
+    number of sessions (Parquet buffers one row group of batch_size rows).
+    The file is written under a temporary name and renamed when complete.
+    Returns the number of sessions written.
+    """
+    fmt = fmt or format_from_path(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    tmp_path = path + ".tmp"
+    try:
+        if fmt == "parquet":
+            count = _write_parquet(sessions, tmp_path, batch_size)
+        else:
+            with open(tmp_path, "w", newline="") as f:
+                count = _write_csv(sessions, f) if fmt == "csv" else _write_jsonl(sessions, f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+
+def _write_csv(sessions, f):
+    writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for session in sessions:
+        writer.writerow(session)
+        count += 1
+    return count
+
+
+def _write_jsonl(sessions, f):
+    count = 0
+    for session in sessions:
+        f.write(json.dumps(session, separators=(",", ":")))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def _write_parquet(sessions, path, batch_size):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("start_time", pa.string()),
+        ("end_time", pa.string()),
+        ("duration", pa.int64()),
+        ("distractions", pa.int64()),
+        ("focus_score", pa.float64()),
+        ("date", pa.string()),
+        ("time", pa.string()),
+        ("source", pa.string()),
+        ("stream", pa.string()),
+        ("timeline", pa.string())
+    ])
+    count = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        for session in sessions:
+            batch.append(session)
+            if len(batch) >= batch_size:
+                count += _write_batch(writer, batch, schema)
+                batch = []
+        if batch or not count:
+            count += _write_batch(writer, batch, schema)
+    return count
+
+
+def _write_batch(writer, batch, schema):
+    import pyarrow as pa
+    columns = {name: [session.get(name) for session in batch] for name in schema.names}
+    writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+    return len(batch)
@@ -0,0 +1,189 @@
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+import config
+from utils.head_pose import create_pose_estimator
+from utils.metrics import metrics
+
+INFERENCE_MODES = ("full", "downscaled", "roi")
+
+
+def create_face_detector():
+    """Create a MediaPipe face detector with the configured confidence"""
+    import mediapipe as mp
+    return mp.solutions.face_detection.FaceDetection(
+        min_detection_confidence=config.FACE_DETECTION_CONFIDENCE
+    )
+
+
+def build_result(timestamp, detection):
+    """Reduce a MediaPipe detection output to a small result dict"""
+    result = {
+        "timestamp": timestamp,
+        "detected_at": timestamp,
+        "skipped": False,
+        "face_detected": False,
+        "confidence": 0.0,
+        "box": None,
+        "keypoints": None,
+        "frame": None
+    }
+    detections = getattr(detection, "detections", None)
+    if detections:
+        best = max(detections, key=lambda d: d.score[0])
+        box = best.location_data.relative_bounding_box
+        result["face_detected"] = True
+        result["confidence"] = float(best.score[0])
+        result["box"] = (box.xmin, box.ymin, box.width, box.height)
+        keypoints = getattr(best.location_data, "relative_keypoints", None)
+        if keypoints:
+            result["keypoints"] = tuple((point.x, point.y) for point in keypoints)
+    return result
+
+
+class FaceDetector:
+    """Face detection front-end with full, downscaled and ROI-tracked modes
+
+    - full: BGR->RGB at capture resolution (the original path)
+    - downscaled: resize to INFERENCE_SCALE before conversion
+    - roi: once a face is found, only a square crop around the last box is
+      searched; after ROI_MAX_MISSES misses it falls back to a downscaled
+      full-frame search
+
+    All resizes and conversions write into preallocated buffers. Boxes and
+    keypoints in the returned results are always relative to the full
+    frame. With a head-pose attention mode, results also carry the
+    HeadPoseEstimator verdict (looking_away, yaw, pitch).
+    """
+
+    def __init__(self, detector, mode=config.INFERENCE_MODE, scale=config.INFERENCE_SCALE,
+                 roi_margin=config.ROI_MARGIN, roi_size=config.ROI_INPUT_SIZE,
+                 roi_max_misses=config.ROI_MAX_MISSES, attention_mode=config.ATTENTION_MODE):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {mode}")
+        self.detector = detector
+        self.mode = mode
+        self.scale = scale
+        self.roi_margin = roi_margin
+        self.roi_size = roi_size
+        self.roi_max_misses = roi_max_misses
+        self.attention_mode = attention_mode
+        self.pose = create_pose_estimator(attention_mode)
+
+        self.track_box = None
+        self.roi_misses = 0
+        self.roi_searches = 0
+        self.full_searches = 0
+        self._latencies = deque(maxlen=config.STATS_WINDOW)
+        self._buffers = {}
+
+    def detect(self, frame, timestamp):
+        """Run detection on a BGR frame and return a result dict"""
+        start = time.perf_counter()
+        if self.mode == "full":
+            result = self._search_full(frame, timestamp, 1.0)
+        elif self.mode == "downscaled" or self.track_box is None:
+            result = self._search_full(frame, timestamp, self.scale)
+        else:
+            result = self._search_roi(frame, timestamp)
+        if self.pose is not None:
+            self.pose.annotate(frame, result)
+        elapsed = time.perf_counter() - start
+        self._latencies.append(elapsed)
+        metrics.observe("face_detection", elapsed)
+        return result
+
+    def get_stats(self):
+        """Get inference mode, per-frame latency and search counters"""
+        latencies = sorted(self._latencies)
+        return {
+            "inference_mode": self.mode,
+            "inference_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "inference_p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            "roi_searches": self.roi_searches,
+            "full_searches": self.full_searches,
+            "tracking": self.track_box is not None,
+            "attention_mode": self.attention_mode,
+            **(self.pose.get_stats() if self.pose is not None else {})
+        }
+
+    def reset(self):
+        """Forget the tracked face, e.g. before a new session"""
+        self.track_box = None
+        self.roi_misses = 0
+
+    def close(self):
+        """Release the underlying detector"""
+        if hasattr(self.detector, "close"):
+            self.detector.close()
+        if self.pose is not None:
+            self.pose.close()
+
+    def _buffer(self, name, shape):
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._buffers[name] = buf
+        return buf
+
+    def _search_full(self, frame, timestamp, scale):
+        self.full_searches += 1
+        height, width = frame.shape[:2]
+        if scale != 1.0:
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            small = self._buffer("small", (size[1], size[0], 3))
+            cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_AREA)
+            frame = small
+        rgb = self._buffer("rgb" if scale == 1.0 else "small_rgb", frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+
+        result = build_result(timestamp, self.detector.process(rgb))
+        self.track_box = result["box"] if self.mode == "roi" else None
+        self.roi_misses = 0
+        return result
+
+    def _search_roi(self, frame, timestamp):
+        self.roi_searches += 1
+        height, width = frame.shape[:2]
+        x0, y0, side = self._roi_rect(width, height)
+        crop = frame[y0:y0 + side, x0:x0 + side]
+
+        roi = self._buffer("roi", (self.roi_size, self.roi_size, 3))
+        cv2.resize(crop, (self.roi_size, self.roi_size), dst=roi, interpolation=cv2.INTER_AREA)
+        roi_rgb = self._buffer("roi_rgb", roi.shape)
+        cv2.cvtColor(roi, cv2.COLOR_BGR2RGB, dst=roi_rgb)
+
+        result = build_result(timestamp, self.detector.process(roi_rgb))
+        if not result["face_detected"]:
+            self.roi_misses += 1
+            if self.roi_misses >= self.roi_max_misses:
+                self.track_box = None
+                return self._search_full(frame, timestamp, self.scale)
+            return result
+
+        bx, by, bw, bh = result["box"]
+        result["box"] = (
+            (x0 + bx * side) / width,
+            (y0 + by * side) / height,
+            bw * side / width,
+            bh * side / height
+        )
+        if result["keypoints"]:
+            result["keypoints"] = tuple(((x0 + kx * side) / width, (y0 + ky * side) / height)
+                                        for kx, ky in result["keypoints"])
+        self.track_box = result["box"]
+        self.roi_misses = 0
+        return result
+
+    def _roi_rect(self, width, height):
+        """Square pixel crop around the tracked box, shifted to stay in frame"""
+        x, y, w, h = self.track_box
+        center_x = (x + w / 2) * width
+        center_y = (y + h / 2) * height
+        side = int(max(w * width, h * height) * (1 + 2 * self.roi_margin))
+        side = max(16, min(side, width, height))
+        x0 = int(min(max(center_x - side / 2, 0), width - side))
+        y0 = int(min(max(center_y - side / 2, 0), height - side))
+        return x0, y0, side
@@ -0,0 +1,404 @@
+import os
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import config
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+# Keypoints SyntheticFaceDetector reports, relative to the face box (MediaPipe order)
+SYNTHETIC_KEYPOINTS = ((0.3, 0.38), (0.7, 0.38), (0.5, 0.56), (0.5, 0.74), (0.02, 0.45), (0.98, 0.45))
+
+
+class FrameSource:
+    """Base class for anything that produces BGR frames for the monitoring loop
+
+    Subclasses implement _open(), _read() and _release(). Every frame gets a
+    timestamp in seconds: wall-clock time for live devices, media time for
+    recorded or synthetic sources so replays are deterministic. Recorded
+    sources run at full speed unless realtime=True. Sources that return the
+    same array from every read() set reuses_buffer, so consumers that keep
+    frames around know to copy them.
+    """
+
+    live = False
+    reuses_buffer = False
+
+    def __init__(self, width=config.CAMERA_WIDTH, height=config.CAMERA_HEIGHT,
+                 fps=config.CAMERA_FPS, realtime=False):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.realtime = realtime
+        self.timestamp = None
+        self.frame_index = 0
+        self._opened = False
+        self._started_at = None
+
+    def open(self):
+        """Open the underlying source (idempotent)"""
+        if not self._opened:
+            self._open()
+            self._opened = True
+            self.frame_index = 0
+            self._started_at = time.time()
+
+    def read(self):
+        """Read the next frame as (ok, frame) like cv2.VideoCapture.read"""
+        self.open()
+        ok, frame = self._read()
+        if not ok:
+            return False, None
+
+        if frame.shape[1] != self.width or frame.shape[0] != self.height:
+            frame = cv2.resize(frame, (self.width, self.height))
+        self._advance()
+        return True, frame
+
+    def read_into(self, out):
+        """Read the next frame into the preallocated BGR array out; returns ok
+
+        Sources backed by cv2.VideoCapture decode straight into out when the
+        device delivers out's size; everything else is copied or resized in.
+        """
+        self.open()
+        ok, frame = self._read_into(out)
+        if not ok:
+            return False
+        if frame is not out:
+            if frame.shape[:2] != out.shape[:2]:
+                cv2.resize(frame, (out.shape[1], out.shape[0]), dst=out)
+            else:
+                np.copyto(out, frame)
+        self._advance()
+        return True
+
+    def seek(self, frame_index):
+        """Position the source so the next read() returns frame frame_index"""
+        self.open()
+        if frame_index < self.frame_index:
+            self.release()
+            self.open()
+        self._seek(frame_index)
+        self.frame_index = frame_index
+
+    def skip(self):
+        """Advance one frame without decoding it; False at the end"""
+        self.open()
+        if not self._skip():
+            return False
+        self.frame_index += 1
+        return True
+
+    def frame_count(self):
+        """Total number of frames, or None for live or unbounded sources"""
+        return None
+
+    def release(self):
+        """Release the underlying source"""
+        if self._opened:
+            self._release()
+            self._opened = False
+
+    def __iter__(self):
+        while True:
+            ok, frame = self.read()
+            if not ok:
+                return
+            yield frame
+
+    def _advance(self):
+        if self.live:
+            self.timestamp = time.time()
+        else:
+            self.timestamp = self._started_at + self.frame_index / self.fps
+            if self.realtime:
+                delay = self.timestamp - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+        self.frame_index += 1
+
+    def _open(self):
+        pass
+
+    def _read(self):
+        raise NotImplementedError
+
+    def _read_into(self, out):
+        return self._read()
+
+    def _skip(self):
+        ok, _ = self._read()
+        return ok
+
+    def _seek(self, frame_index):
+        while self.frame_index < frame_index and self.skip():
+            pass
+
+    def _release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """Live capture device"""
+
+    live = True
+
+    def __init__(self, index=config.CAMERA_INDEX, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+        self.cap = None
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+
+    def _read(self):
+        return self.cap.read()
+
+    def _read_into(self, out):
+        return self.cap.read(image=out)
+
+    def _release(self):
+        self.cap.release()
+        self.cap = None
+
+
+class VideoFileSource(FrameSource):
+    """Recorded video file, replayed at full speed by default"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.cap = None
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video file: {self.path}")
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if file_fps and file_fps > 0:
+            self.fps = file_fps
+
+    def frame_count(self):
+        self.open()
+        count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return count if count > 0 else None
+
+    def _read(self):
+        return self.cap.read()
+
+    def _read_into(self, out):
+        return self.cap.read(image=out)
+
+    def _skip(self):
+        return self.cap.grab()
+
+    def _seek(self, frame_index):
+        # FFmpeg seeks to the keyframe at or before the target and decodes
+        # forward from there; grab() the rest if it reports landing short
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        while position < frame_index and self.cap.grab():
+            position += 1
+
+    def _release(self):
+        self.cap.release()
+        self.cap = None
+
+
+class ImageFolderSource(FrameSource):
+    """Directory of still images played back in filename order"""
+
+    def __init__(self, folder, loop=False, **kwargs):
+        super().__init__(**kwargs)
+        self.folder = folder
+        self.loop = loop
+        self.files = []
+        self._position = 0
+
+    def _open(self):
+        self.files = sorted(
+            os.path.join(self.folder, name) for name in os.listdir(self.folder)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._position = 0
+
+    def _read(self):
+        if self._position >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self._position = 0
+        frame = cv2.imread(self.files[self._position])
+        self._position += 1
+        return frame is not None, frame
+
+    def _skip(self):
+        if self._position >= len(self.files):
+            return False
+        self._position += 1
+        return True
+
+    def _seek(self, frame_index):
+        self._position = frame_index
+
+    def frame_count(self):
+        self.open()
+        return None if self.loop else len(self.files)
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames following a script of face-present/absent intervals
+
+    script is a list of (seconds, face_present) pairs. The ground truth for
+    the last frame is kept in face_present so ScriptedFaceDetector can stand
+    in for MediaPipe on machines without a camera or model.
+    """
+
+    reuses_buffer = True
+
+    def __init__(self, script=((60, True),), seed=0, **kwargs):
+        super().__init__(**kwargs)
+        self.script = list(script)
+        self.seed = seed
+        self.face_present = False
+        self.face_box = (0.35, 0.25, 0.3, 0.4)
+        self._boundaries = []
+        self._background = None
+        self._frame = None
+
+    def _open(self):
+        self._boundaries = []
+        elapsed = 0.0
+        for seconds, present in self.script:
+            elapsed += seconds
+            self._boundaries.append((elapsed * self.fps, bool(present)))
+
+        rng = np.random.default_rng(self.seed)
+        self._background = rng.integers(40, 80, (self.height, self.width, 3), dtype=np.uint8)
+        self._frame = np.empty_like(self._background)
+
+    def frame_count(self):
+        self.open()
+        return int(np.ceil(self._boundaries[-1][0])) if self._boundaries else 0
+
+    def _segment(self):
+        for end_frame, segment_present in self._boundaries:
+            if self.frame_index < end_frame:
+                return segment_present
+        return None
+
+    def _skip(self):
+        return self._segment() is not None
+
+    def _seek(self, frame_index):
+        pass
+
+    def _read(self):
+        present = self._segment()
+        if present is None:
+            return False, None
+
+        self.face_present = present
+        np.copyto(self._frame, self._background)
+        if present:
+            x, y, w, h = self.face_box
+            center = (int((x + w / 2) * self.width), int((y + h / 2) * self.height))
+            axes = (int(w * self.width / 2), int(h * self.height / 2))
+            cv2.ellipse(self._frame, center, axes, 0, 0, 360, (150, 180, 220), -1)
+        return True, self._frame
+
+
+class ScriptedFaceDetector:
+    """Detector stand-in that reports the ground truth of a SyntheticSource
+
+    Returns objects shaped like MediaPipe FaceDetection results so the rest
+    of the pipeline cannot tell the difference. It reads the source's state
+    at call time, so it is only exact when detection runs in lock-step with
+    capture; pipelined engines should use SyntheticFaceDetector.
+    """
+
+    def __init__(self, source, confidence=0.95):
+        self.source = source
+        self.confidence = confidence
+
+    def process(self, rgb_frame):
+        if not self.source.face_present:
+            return SimpleNamespace(detections=None)
+        x, y, w, h = self.source.face_box
+        box = SimpleNamespace(xmin=x, ymin=y, width=w, height=h)
+        detection = SimpleNamespace(
+            score=[self.confidence],
+            location_data=SimpleNamespace(relative_bounding_box=box)
+        )
+        return SimpleNamespace(detections=[detection])
+
+    def close(self):
+        pass
+
+
+class SyntheticFaceDetector:
+    """Pixel-based detector for SyntheticSource frames
+
+    Finds the drawn face ellipse by colour, so unlike ScriptedFaceDetector
+    it needs no access to the source and can run in worker processes.
+    work_ms busy-waits per call to emulate the cost of a real model.
+    """
+
+    def __init__(self, confidence=0.95, work_ms=0.0):
+        self.confidence = confidence
+        self.work_ms = work_ms
+
+    def process(self, rgb_frame):
+        if self.work_ms:
+            deadline = time.perf_counter() + self.work_ms / 1000
+            while time.perf_counter() < deadline:
+                pass
+        mask = cv2.inRange(rgb_frame, (120, 0, 0), (255, 255, 255))
+        points = cv2.findNonZero(mask)
+        if points is None:
+            return SimpleNamespace(detections=None)
+        height, width = rgb_frame.shape[:2]
+        x, y, w, h = cv2.boundingRect(points)
+        box = SimpleNamespace(xmin=x / width, ymin=y / height, width=w / width, height=h / height)
+        # Frontal-face keypoints (eyes, nose, mouth, ears) placed inside the ellipse
+        keypoints = [
+            SimpleNamespace(x=(x + fx * w) / width, y=(y + fy * h) / height)
+            for fx, fy in SYNTHETIC_KEYPOINTS
+        ]
+        detection = SimpleNamespace(
+            score=[self.confidence],
+            location_data=SimpleNamespace(relative_bounding_box=box, relative_keypoints=keypoints)
+        )
+        return SimpleNamespace(detections=[detection])
+
+    def close(self):
+        pass
+
+
+def parse_synthetic_script(text):
+    """Parse 'present=10,absent=5' into [(10.0, True), (5.0, False)]"""
+    script = []
+    for part in text.split(","):
+        state, _, seconds = part.strip().partition("=")
+        script.append((float(seconds), state.strip() == "present"))
+    return script
+
+
+def create_frame_source(spec=config.FRAME_SOURCE, **kwargs):
+    """Build a FrameSource from a device index, path or 'synthetic[:script]'"""
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec), **kwargs)
+    if spec.startswith("synthetic"):
+        _, _, script = spec.partition(":")
+        if script:
+            kwargs["script"] = parse_synthetic_script(script)
+        return SyntheticSource(**kwargs)
+    if os.path.isdir(spec):
+        return ImageFolderSource(spec, **kwargs)
+    return VideoFileSource(spec, **kwargs)
@@ -0,0 +1,242 @@
+import math
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+import config
+
+ATTENTION_MODES = ("presence", "head_pose", "face_mesh")
+
+# Generic 3D face model (mm, y up) and the matching FaceMesh landmark ids: nose tip,
+# chin, outer eye corners and mouth corners (each pair image-left first, i.e. the subject's right)
+MODEL_POINTS = np.array([
+    (0.0, 0.0, 0.0),
+    (0.0, -330.0, -65.0),
+    (-225.0, 170.0, -135.0),
+    (225.0, 170.0, -135.0),
+    (-150.0, -150.0, -125.0),
+    (150.0, -150.0, -125.0)
+], dtype=np.float64)
+MESH_LANDMARKS = (1, 152, 33, 263, 61, 291)
+
+# Nose tip depth relative to the eye distance (keypoint yaw) and to the eye-mouth distance (pitch)
+NOSE_DEPTH_RATIO = 0.55
+
+
+def create_face_mesh():
+    """Create a single-face MediaPipe FaceMesh for pose refinement
+
+    Static image mode: the mesh only sees sporadic crops with varying
+    bounds, so tracking landmarks from the previous crop would be wrong.
+    """
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=True,
+        max_num_faces=1,
+        refine_landmarks=False,
+        min_detection_confidence=config.FACE_DETECTION_CONFIDENCE
+    )
+
+
+def pose_from_keypoints(keypoints, width, height, pitch_neutral=config.HEAD_PITCH_NEUTRAL):
+    """Approximate (yaw, pitch) in degrees from the 6 face detection keypoints
+
+    Keypoints are relative (x, y): right eye, left eye, nose tip, mouth
+    centre, right ear, left ear. Yaw comes from how far the nose tip sits
+    off the eye midpoint, pitch from where it sits between the eye line and
+    the mouth. Positive yaw is the subject turning to their left, positive
+    pitch is looking down.
+    """
+    (rex, rey), (lex, ley), (nx, ny), (mx, my) = [(x * width, y * height) for x, y in keypoints[:4]]
+    eye_x, eye_y = (rex + lex) / 2, (rey + ley) / 2
+    eye_distance = math.hypot(lex - rex, ley - rey)
+    face_height = my - eye_y
+    if eye_distance < 1 or face_height < 1:
+        return None
+    yaw = math.degrees(math.atan((nx - eye_x) / eye_distance / NOSE_DEPTH_RATIO))
+    pitch = math.degrees(math.atan(((ny - eye_y) / face_height - pitch_neutral) / NOSE_DEPTH_RATIO))
+    return yaw, pitch
+
+
+def pose_from_landmarks(points, width, height):
+    """(yaw, pitch) in degrees from pixel positions of the MODEL_POINTS landmarks via solvePnP"""
+    focal = float(width)
+    camera = np.array([[focal, 0, width / 2], [0, focal, height / 2], [0, 0, 1]], dtype=np.float64)
+    ok, rotation, _ = cv2.solvePnP(MODEL_POINTS, np.asarray(points, dtype=np.float64), camera,
+                                   np.zeros(4), flags=cv2.SOLVEPNP_ITERATIVE)
+    if not ok:
+        return None
+    matrix, _ = cv2.Rodrigues(rotation)
+    # Image y points down while the model's y points up, so the solution
+    # includes a half turn about x; fold it out of the pitch angle
+    angles = cv2.RQDecomp3x3(matrix)[0]
+    pitch, yaw = angles[0], angles[1]
+    pitch = pitch - 180 if pitch > 90 else pitch + 180 if pitch < -90 else pitch
+    return -yaw, pitch
+
+
+class HeadPoseEstimator:
+    """Decides whether a detected face is turned towards the screen
+
+    Every detection with keypoints gets a cheap yaw/pitch estimate. Only
+    when that estimate is ambiguous (within margin of a limit, or a weak
+    detection) is the FaceMesh landmark model run on the face crop, and
+    then at most once per mesh interval: the interval doubles (up to
+    mesh_max_interval) each time the mesh confirms the cheap verdict and
+    drops back to mesh_min_interval when it overrules it. A mesh run that
+    finds no face also counts as a run and doubles the interval, so an
+    unusable crop is not retried on every frame. Between mesh runs
+    an ambiguous frame reuses the last mesh verdict while it is fresh.
+    With always_mesh every face goes through FaceMesh (the accuracy
+    reference, and the per-frame cost ceiling).
+
+    annotate() adds yaw, pitch, looking_away and pose_source to a result.
+    """
+
+    def __init__(self, mesh_factory=create_face_mesh, always_mesh=False,
+                 yaw_limit=config.HEAD_YAW_LIMIT, pitch_down_limit=config.HEAD_PITCH_DOWN_LIMIT,
+                 pitch_up_limit=config.HEAD_PITCH_UP_LIMIT, margin=config.HEAD_POSE_MARGIN,
+                 mesh_min_interval=config.MESH_MIN_INTERVAL, mesh_max_interval=config.MESH_MAX_INTERVAL):
+        self.mesh_factory = mesh_factory
+        self.always_mesh = always_mesh
+        self.yaw_limit = yaw_limit
+        self.pitch_down_limit = pitch_down_limit
+        self.pitch_up_limit = pitch_up_limit
+        self.margin = margin
+        self.mesh_min_interval = mesh_min_interval
+        self.mesh_max_interval = mesh_max_interval
+        self.mesh_interval = mesh_min_interval
+
+        self._mesh = None
+        self._mesh_failed = False
+        self._last_mesh_time = None
+        self._last_mesh_verdict = None
+        self._crop = None
+        self.estimates = 0
+        self.ambiguous = 0
+        self.mesh_runs = 0
+        self.mesh_misses = 0
+        self.mesh_overrules = 0
+        self._keypoint_latencies = deque(maxlen=config.STATS_WINDOW)
+        self._mesh_latencies = deque(maxlen=config.STATS_WINDOW)
+
+    def annotate(self, frame, result):
+        """Add the pose verdict to a detection result (in place) and return it"""
+        if not result["face_detected"]:
+            return result
+        start = time.perf_counter()
+        self.estimates += 1
+        height, width = frame.shape[:2]
+        keypoints = result.get("keypoints")
+        pose = pose_from_keypoints(keypoints, width, height) if keypoints else None
+        verdict = self._looking_away(pose) if pose is not None else None
+        ambiguous = pose is None or self._is_ambiguous(pose) or \
+            result["confidence"] < config.LOW_CONFIDENCE_THRESHOLD
+        self._keypoint_latencies.append(time.perf_counter() - start)
+        source = "keypoints"
+
+        if self.always_mesh or ambiguous:
+            self.ambiguous += ambiguous
+            timestamp = result["timestamp"]
+            due = self._last_mesh_time is None or timestamp - self._last_mesh_time >= self.mesh_interval
+            if self.always_mesh or due:
+                # Count failed attempts too, so a face the mesh cannot
+                # find is retried at the interval rather than every frame
+                self._last_mesh_time = timestamp
+                mesh_pose = self._run_mesh(frame, result["box"])
+                if mesh_pose is None:
+                    self.mesh_misses += 1
+                    self._last_mesh_verdict = None
+                    self.mesh_interval = min(self.mesh_interval * 2, self.mesh_max_interval)
+                else:
+                    mesh_verdict = self._looking_away(mesh_pose)
+                    if verdict is None or mesh_verdict != verdict:
+                        self.mesh_overrules += verdict is not None
+                        self.mesh_interval = self.mesh_min_interval
+                    else:
+                        self.mesh_interval = min(self.mesh_interval * 2, self.mesh_max_interval)
+                    self._last_mesh_verdict = mesh_verdict
+                    pose, verdict, source = mesh_pose, mesh_verdict, "mesh"
+            elif self._last_mesh_verdict is not None and self._last_mesh_time is not None and \
+                    timestamp - self._last_mesh_time <= self.mesh_max_interval:
+                verdict, source = self._last_mesh_verdict, "mesh_cached"
+
+        if pose is not None:
+            result["yaw"], result["pitch"] = pose
+        result["looking_away"] = bool(verdict)
+        result["pose_source"] = source
+        return result
+
+    def get_stats(self):
+        """Pose estimates, mesh escalations and the cost of each path"""
+        keypoint = list(self._keypoint_latencies)
+        mesh = list(self._mesh_latencies)
+        return {
+            "pose_estimates": self.estimates,
+            "pose_ambiguous": self.ambiguous,
+            "mesh_runs": self.mesh_runs,
+            "mesh_misses": self.mesh_misses,
+            "mesh_overrules": self.mesh_overrules,
+            "mesh_available": not self._mesh_failed,
+            "mesh_interval": self.mesh_interval,
+            "keypoint_pose_ms": 1000 * sum(keypoint) / len(keypoint) if keypoint else 0.0,
+            "mesh_ms": 1000 * sum(mesh) / len(mesh) if mesh else 0.0
+        }
+
+    def close(self):
+        if self._mesh is not None and hasattr(self._mesh, "close"):
+            self._mesh.close()
+
+    def _looking_away(self, pose):
+        yaw, pitch = pose
+        return abs(yaw) > self.yaw_limit or pitch > self.pitch_down_limit or -pitch > self.pitch_up_limit
+
+    def _is_ambiguous(self, pose):
+        yaw, pitch = pose
+        return (abs(abs(yaw) - self.yaw_limit) < self.margin
+                or abs(pitch - self.pitch_down_limit) < self.margin
+                or abs(-pitch - self.pitch_up_limit) < self.margin)
+
+    def _run_mesh(self, frame, box):
+        """FaceMesh pose on an RGB crop around the face box, or None"""
+        if self._mesh_failed or box is None:
+            return None
+        if self._mesh is None:
+            try:
+                self._mesh = self.mesh_factory()
+            except Exception as e:
+                print(f"Error creating face mesh: {e}")
+                self._mesh_failed = True
+                return None
+        start = time.perf_counter()
+        height, width = frame.shape[:2]
+        x, y, w, h = box
+        pad_x, pad_y = w * 0.25, h * 0.25
+        x0, y0 = max(0, int((x - pad_x) * width)), max(0, int((y - pad_y) * height))
+        x1, y1 = min(width, int((x + w + pad_x) * width)), min(height, int((y + h + pad_y) * height))
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+        shape = (y1 - y0, x1 - x0, 3)
+        if self._crop is None or self._crop.shape != shape:
+            self._crop = np.empty(shape, dtype=np.uint8)
+        cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB, dst=self._crop)
+        output = self._mesh.process(self._crop)
+        self.mesh_runs += 1
+        faces = getattr(output, "multi_face_landmarks", None)
+        pose = None
+        if faces:
+            landmarks = faces[0].landmark
+            points = [(landmarks[i].x * shape[1], landmarks[i].y * shape[0]) for i in MESH_LANDMARKS]
+            pose = pose_from_landmarks(points, shape[1], shape[0])
+        self._mesh_latencies.append(time.perf_counter() - start)
+        return pose
+
+
+def create_pose_estimator(attention_mode=config.ATTENTION_MODE):
+    """HeadPoseEstimator for an ATTENTION_MODE, or None for plain presence"""
+    if attention_mode not in ATTENTION_MODES:
+        raise ValueError(f"Unknown attention mode: {attention_mode}")
+    if attention_mode == "presence":
+        return None
+    return HeadPoseEstimator(always_mesh=attention_mode == "face_mesh")
@@ -0,0 +1,52 @@
+import bisect
+import threading
+
+# Bucket upper bounds in milliseconds; the last bucket is open-ended
+DEFAULT_BOUNDS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram, cheap enough to update per frame
+
+    Percentiles are estimated from the bucket bounds (capped at the largest
+    sample), which is plenty to see which pipeline stage is the bottleneck.
+    """
+
+    def __init__(self, bounds_ms=DEFAULT_BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.bounds_ms[index], self.max_ms) if index < len(self.bounds_ms) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        labels = [f"<={b:g}ms" for b in self.bounds_ms] + [f">{self.bounds_ms[-1]:g}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+            "buckets": dict(zip(labels, self.counts))
+        }
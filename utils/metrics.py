@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+
+class _NullTimer:
+    """Timer handed out while metrics are disabled; does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Process-wide timers and counters for the hot paths
+
+    Timers keep the last `window` samples for rolling p50/p95/p99 plus
+    lifetime count and total; counters only add up. While disabled, timer()
+    returns a shared no-op context manager and observe()/increment() return
+    after one attribute check, so instrumented code costs next to nothing.
+    Snapshots can be written to a JSON file or served in the Prometheus
+    text format.
+    """
+
+    def __init__(self, enabled=config.METRICS_ENABLED, window=config.METRICS_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._samples = {}
+        self._totals = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._exporter = None
+        self._server = None
+
+    def timer(self, name):
+        """Context manager timing the enclosed block under name"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def observe(self, name, seconds):
+        """Record one duration measured elsewhere"""
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._totals[name] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def increment(self, name, amount=1):
+        """Add amount to a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        """Forget all samples and counters"""
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """Rolling percentiles per timer and current counter values"""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            totals = {name: list(values) for name, values in self._totals.items()}
+            counters = dict(self._counters)
+
+        timers = {}
+        for name, values in samples.items():
+            count, total = totals[name]
+            timers[name] = {
+                "count": count,
+                "mean_ms": 1000 * total / count if count else 0.0,
+                "p50_ms": 1000 * _percentile(values, 0.50),
+                "p95_ms": 1000 * _percentile(values, 0.95),
+                "p99_ms": 1000 * _percentile(values, 0.99),
+                "max_ms": 1000 * values[-1] if values else 0.0
+            }
+        return {"enabled": self.enabled, "timestamp": time.time(), "timers": timers, "counters": counters}
+
+    def write_json(self, path=config.METRICS_FILE):
+        """Write a snapshot to path atomically"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            print(f"Error writing metrics: {e}")
+            return False
+
+    def to_prometheus(self, prefix="distraction_sense"):
+        """Snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, timer in sorted(snapshot["timers"].items()):
+            metric = f"{prefix}_{_metric_name(name)}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for quantile in ("0.5", "0.95", "0.99"):
+                key = f"p{round(float(quantile) * 100)}_ms"
+                lines.append(f'{metric}{{quantile="{quantile}"}} {timer[key] / 1000:.6f}')
+            lines.append(f"{metric}_sum {timer['mean_ms'] * timer['count'] / 1000:.6f}")
+            lines.append(f"{metric}_count {timer['count']}")
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def start_file_export(self, path=config.METRICS_FILE, interval=config.METRICS_EXPORT_INTERVAL):
+        """Rewrite path every interval seconds while metrics are enabled"""
+        if self._exporter is not None and self._exporter.is_alive():
+            return
+
+        def export():
+            while True:
+                time.sleep(interval)
+                if self.enabled:
+                    self.write_json(path)
+
+        self._exporter = threading.Thread(target=export, name="metrics-export", daemon=True)
+        self._exporter.start()
+
+    def serve_prometheus(self, port=config.METRICS_PORT, host="127.0.0.1"):
+        """Serve /metrics on host:port from a background thread"""
+        if self._server is not None:
+            return self._server
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"Error starting metrics endpoint: {e}")
+            return None
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server
+
+
+def _percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+# Shared by the app, the engine threads and the storage layer
+metrics = Metrics()
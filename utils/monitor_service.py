@@ -0,0 +1,335 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import config
+from utils.attention import AttentionStateMachine, is_attentive
+from utils.face_detector import FaceDetector, create_face_detector
+from utils.frame_source import create_frame_source
+
+
+def _worker_main(task_queue, result_queue, detector_factory, inference_mode):
+    """Inference worker process: one detector, one FaceDetector front-end per stream
+
+    Each stream is pinned to one worker, so its front-end sees every frame
+    of the stream and ROI tracking state never goes stale.
+    """
+    detector = detector_factory()
+    front_ends = {}
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            stream, seq, timestamp, frame = task
+            start = time.perf_counter()
+            try:
+                face = front_ends.get(stream)
+                if face is None:
+                    face = front_ends[stream] = FaceDetector(detector, mode=inference_mode)
+                result = face.detect(frame, timestamp)
+            except Exception as e:
+                print(f"Error in inference worker: {e}")
+                result = None
+            result_queue.put((stream, seq, result, time.perf_counter() - start))
+    finally:
+        detector.close()
+
+
+class StreamState:
+    """One monitored frame source with its attention state and counters"""
+
+    def __init__(self, index, name, source, distraction_threshold, alert_cooldown=config.ALERT_COOLDOWN):
+        self.index = index
+        self.name = name
+        self.source = source
+        self.attention = AttentionStateMachine(distraction_threshold, alert_cooldown=alert_cooldown)
+        self.started_at = None
+        self.finished = False
+        self.saved_session = None
+
+        # Latest captured frame; the capture thread overwrites it, so a
+        # stream that cannot be served in time drops frames instead of queueing
+        self.lock = threading.Lock()
+        self.frame = None
+        self.frame_time = None
+        self.seq = 0
+        self.submitted_seq = 0
+        self.next_due = 0.0
+        self.in_flight = 0
+
+        self.frames_captured = 0
+        self.frames_submitted = 0
+        self.frames_dropped = 0
+        self.latest = None
+        self._capture_times = deque(maxlen=config.STATS_WINDOW)
+        self._result_times = deque(maxlen=config.STATS_WINDOW)
+        self._latencies = deque(maxlen=config.STATS_WINDOW)
+
+
+def _rate(times):
+    if len(times) > 1 and times[-1] > times[0]:
+        return (len(times) - 1) / (times[-1] - times[0])
+    return 0.0
+
+
+class MonitorService:
+    """Monitors several frame sources with a shared pool of inference processes
+
+    Each source gets a capture thread that keeps only its latest frame. A
+    dispatcher thread serves streams round-robin and hands each frame to the
+    worker process its stream is pinned to (stream index modulo workers, so
+    per-stream ROI tracking stays on one detector), never keeping more than
+    max_in_flight frames outstanding overall or its share per worker. When the pool is saturated, streams are served less often
+    and stale frames are dropped, so per-stream FPS falls evenly instead of
+    latency growing. Results drive a per-stream AttentionStateMachine, and
+    each stream's session is saved through the DataManager on stop() or
+    when a file/synthetic source runs out.
+    """
+
+    def __init__(self, sources=config.MONITOR_SOURCES, workers=config.MONITOR_WORKERS,
+                 data_manager=None, distraction_threshold=config.DEFAULT_DISTRACTION_THRESHOLD,
+                 alert_cooldown=config.ALERT_COOLDOWN, target_fps=config.MONITOR_TARGET_FPS, max_in_flight=None,
+                 detector_factory=create_face_detector, inference_mode=config.INFERENCE_MODE,
+                 realtime=True, on_event=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_in_flight = max_in_flight or self.workers * config.MONITOR_IN_FLIGHT_PER_WORKER
+        self.target_fps = target_fps
+        self.data_manager = data_manager
+        self.detector_factory = detector_factory
+        self.inference_mode = inference_mode
+        self.on_event = on_event
+        self.streams = []
+        for index, spec in enumerate(sources):
+            source = create_frame_source(spec, realtime=realtime)
+            self.streams.append(StreamState(index, str(spec), source, distraction_threshold, alert_cooldown))
+
+        # Spawned (not forked) workers: the parent runs threads
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks = []
+        self._worker_in_flight = []
+        self._worker_capacity = max(1, -(-self.max_in_flight // self.workers))
+        self._results = None
+        self._processes = []
+        self._threads = []
+        self._stop_event = threading.Event()
+        self.in_flight = 0
+        self.started_at = None
+        self._result_times = deque(maxlen=config.STATS_WINDOW * 4)
+
+    def is_running(self):
+        return bool(self._threads) and any(t.is_alive() for t in self._threads)
+
+    def start(self):
+        """Start worker processes, capture threads and the dispatcher"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._tasks = [self._context.Queue(maxsize=self._worker_capacity) for _ in range(self.workers)]
+        self._worker_in_flight = [0] * self.workers
+        self._results = self._context.Queue()
+        self._processes = [
+            self._context.Process(target=_worker_main, name=f"monitor-worker-{i}", daemon=True,
+                                  args=(self._tasks[i], self._results, self.detector_factory,
+                                        self.inference_mode))
+            for i in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+        self.started_at = time.time()
+        self._threads = [
+            threading.Thread(target=self._capture, args=(stream,), name=f"monitor-capture-{stream.index}",
+                             daemon=True)
+            for stream in self.streams
+        ]
+        self._threads.append(threading.Thread(target=self._dispatch, name="monitor-dispatch", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop everything and save the session of every stream still open"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        for tasks in self._tasks[:len(self._processes)]:
+            try:
+                tasks.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        for stream in self.streams:
+            self._finish_stream(stream)
+
+    def wait(self, timeout=None):
+        """Block until every stream has finished (file and synthetic sources)"""
+        deadline = None if timeout is None else time.time() + timeout
+        while not all(stream.finished for stream in self.streams):
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def get_stats(self):
+        """Per-stream and aggregate throughput, drops and attention summary"""
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        streams = []
+        for stream in self.streams:
+            stats = stream.attention.get_stats()
+            inference_fps = _rate(stream._result_times)
+            latencies = list(stream._latencies)
+            streams.append({
+                "name": stream.name,
+                "capture_fps": _rate(stream._capture_times),
+                "inference_fps": inference_fps,
+                "detect_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+                "frames_captured": stream.frames_captured,
+                "frames_processed": stream.frames_submitted,
+                "frames_dropped": stream.frames_dropped,
+                "state": stats["state"],
+                "focus_score": stats["focus_score"],
+                "distraction_count": stats["distraction_count"],
+                "finished": stream.finished,
+                "degraded": not stream.finished and inference_fps < 0.9 * self.target_fps
+            })
+        return {
+            "streams": streams,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "inference_fps": _rate(self._result_times),
+            "frames_processed": sum(s["frames_processed"] for s in streams),
+            "frames_dropped": sum(s["frames_dropped"] for s in streams),
+            "elapsed": elapsed,
+            "degraded": any(s["degraded"] for s in streams)
+        }
+
+    def _capture(self, stream):
+        source = stream.source
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = source.read()
+                if not ret:
+                    if source.live:
+                        time.sleep(0.05)
+                        continue
+                    break
+                with stream.lock:
+                    if stream.seq > stream.submitted_seq:
+                        stream.frames_dropped += 1
+                    # The dispatcher may still hold the previous array
+                    stream.frame = frame.copy()
+                    stream.frame_time = source.timestamp
+                    stream.seq += 1
+                    if stream.started_at is None:
+                        stream.started_at = time.time()
+                stream.frames_captured += 1
+                stream._capture_times.append(time.time())
+        except Exception as e:
+            print(f"Error capturing from {stream.name}: {e}")
+        finally:
+            source.release()
+            with stream.lock:
+                stream.frame = None
+                stream.seq = stream.submitted_seq
+            stream.finished = True
+
+    def _dispatch(self):
+        interval = 1.0 / self.target_fps if self.target_fps else 0.0
+        next_stream = 0
+        try:
+            while not self._stop_event.is_set():
+                self._drain_results(block=self.in_flight >= self.max_in_flight)
+
+                now = time.time()
+                submitted = False
+                count = len(self.streams)
+                for offset in range(count):
+                    if self.in_flight >= self.max_in_flight:
+                        break
+                    stream = self.streams[(next_stream + offset) % count]
+                    worker = stream.index % self.workers
+                    if now < stream.next_due or self._worker_in_flight[worker] >= self._worker_capacity:
+                        continue
+                    with stream.lock:
+                        if stream.frame is None or stream.seq == stream.submitted_seq:
+                            continue
+                        task = (stream.index, stream.seq, stream.frame_time, stream.frame)
+                        stream.submitted_seq = stream.seq
+                    self._tasks[worker].put(task)
+                    self._worker_in_flight[worker] += 1
+                    self.in_flight += 1
+                    stream.in_flight += 1
+                    stream.frames_submitted += 1
+                    stream.next_due = now + interval
+                    next_stream = (stream.index + 1) % count
+                    submitted = True
+
+                self._finish_idle_streams()
+                if not submitted:
+                    self._drain_results(block=True, timeout=0.005)
+        except Exception as e:
+            print(f"Error in monitor dispatcher: {e}")
+        finally:
+            while self.in_flight and self._drain_results(block=True, timeout=1.0):
+                pass
+
+    def _drain_results(self, block=False, timeout=0.1):
+        handled = 0
+        while True:
+            try:
+                if block and not handled:
+                    item = self._results.get(timeout=timeout)
+                else:
+                    item = self._results.get_nowait()
+            except queue.Empty:
+                return handled
+            handled += 1
+            stream_index, seq, result, latency = item
+            stream = self.streams[stream_index]
+            self.in_flight -= 1
+            self._worker_in_flight[stream_index % self.workers] -= 1
+            stream.in_flight -= 1
+            if result is not None:
+                self._handle_result(stream, result, latency)
+
+    def _handle_result(self, stream, result, latency):
+        now = time.time()
+        stream.latest = result
+        stream._result_times.append(now)
+        stream._latencies.append(latency)
+        self._result_times.append(now)
+        for event in stream.attention.update(result["timestamp"], is_attentive(result)):
+            if self.on_event is not None:
+                self.on_event(stream.name, event)
+
+    def _finish_idle_streams(self):
+        for stream in self.streams:
+            if stream.finished and stream.saved_session is None and not stream.in_flight:
+                self._finish_stream(stream)
+
+    def _finish_stream(self, stream):
+        """Save the stream's session once"""
+        if stream.saved_session is not None or stream.started_at is None:
+            return
+        stats = stream.attention.get_stats()
+        ended_at = time.time()
+        session_data = {
+            "start_time": datetime.fromtimestamp(stream.started_at).isoformat(),
+            "end_time": datetime.fromtimestamp(ended_at).isoformat(),
+            "duration": int(stats["active_time"]),
+            "distractions": stats["distraction_count"],
+            "focus_score": stats["focus_score"],
+            "stream": stream.name
+        }
+        stream.saved_session = session_data
+        if self.data_manager is not None:
+            stream.saved_session = self.data_manager.add_session(session_data)
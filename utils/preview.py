@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+import config
+from utils.latency_histogram import LatencyHistogram
+
+
+class PreviewEncoder:
+    """Throttled JPEG preview of the camera feed
+
+    render() is called from the engine's render stage for every inferred
+    frame. Frames arriving faster than max_fps are dropped before any work
+    is done; the rest are downscaled to max_width, get the detection box
+    drawn and are JPEG-encoded at the configured quality. Resize and
+    thumbnail buffers are allocated once and reused. A frame whose
+    thumbnail and box match the last encoded one is not encoded again.
+
+    The UI calls take(last_seq), which only returns bytes when a newer
+    frame exists, so an unchanged preview is never re-sent; bytes handed
+    out are counted for the bytes/second figure.
+    """
+
+    def __init__(self, max_fps=config.PREVIEW_FPS, max_width=config.PREVIEW_MAX_WIDTH,
+                 quality=config.PREVIEW_JPEG_QUALITY, change_threshold=config.PREVIEW_CHANGE_THRESHOLD):
+        self.max_fps = max_fps
+        self.max_width = max_width
+        self.quality = quality
+        self.change_threshold = change_threshold
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+
+        self._lock = threading.Lock()
+        self._small = None
+        self._thumb = np.empty((12, 16, 3), dtype=np.uint8)
+        self._last_thumb = np.empty_like(self._thumb)
+        self._last_box = None
+        self._has_last = False
+        self._last_render = 0.0
+        self._jpeg = None
+        self.seq = 0
+
+        self.frames_offered = 0
+        self.frames_encoded = 0
+        self.skipped_rate = 0
+        self.skipped_unchanged = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.encode_time = LatencyHistogram()
+        self._sent = deque(maxlen=config.STATS_WINDOW)
+
+    def render(self, frame, box=None):
+        """Offer a BGR frame and its relative detection box; returns True if encoded"""
+        self.frames_offered += 1
+        now = time.perf_counter()
+        if self.max_fps and now - self._last_render < 1.0 / self.max_fps:
+            self.skipped_rate += 1
+            return False
+        self._last_render = now
+
+        start = time.perf_counter()
+        small = self._downscale(frame)
+        cv2.resize(small, self._thumb.shape[1::-1], dst=self._thumb, interpolation=cv2.INTER_AREA)
+        if self._has_last and box == self._last_box and \
+                cv2.norm(self._thumb, self._last_thumb, cv2.NORM_L1) / self._thumb.size < self.change_threshold:
+            self.skipped_unchanged += 1
+            return False
+        np.copyto(self._last_thumb, self._thumb)
+        self._last_box = box
+        self._has_last = True
+
+        if box is not None:
+            height, width = small.shape[:2]
+            x, y, w, h = box
+            cv2.rectangle(small, (int(x * width), int(y * height)),
+                          (int((x + w) * width), int((y + h) * height)), (234, 126, 102), 2)
+        ok, encoded = cv2.imencode(".jpg", small, self.encode_params)
+        if not ok:
+            return False
+        with self._lock:
+            self._jpeg = encoded.tobytes()
+            self.seq += 1
+        self.frames_encoded += 1
+        self.encode_time.add(time.perf_counter() - start)
+        return True
+
+    def take(self, last_seq=0):
+        """(seq, jpeg bytes) if a frame newer than last_seq exists, else (last_seq, None)"""
+        with self._lock:
+            if self._jpeg is None or self.seq == last_seq:
+                return last_seq, None
+            seq, jpeg = self.seq, self._jpeg
+        self.frames_sent += 1
+        self.bytes_sent += len(jpeg)
+        self._sent.append((time.time(), len(jpeg)))
+        return seq, jpeg
+
+    def get_stats(self):
+        """Preview throughput, skip counts and encode cost"""
+        sent = list(self._sent)
+        bytes_per_second = 0.0
+        if len(sent) > 1 and sent[-1][0] > sent[0][0]:
+            bytes_per_second = sum(size for _, size in sent[1:]) / (sent[-1][0] - sent[0][0])
+        encode = self.encode_time.to_dict()
+        return {
+            "preview_frames_encoded": self.frames_encoded,
+            "preview_skipped_rate": self.skipped_rate,
+            "preview_skipped_unchanged": self.skipped_unchanged,
+            "preview_frames_sent": self.frames_sent,
+            "preview_bytes_sent": self.bytes_sent,
+            "preview_bytes_per_second": bytes_per_second,
+            "preview_encode_ms": encode["mean_ms"],
+            "preview_encode_p95_ms": encode["p95_ms"]
+        }
+
+    def _downscale(self, frame):
+        """Resize into the reused preview buffer (a fresh copy when no resize is needed)"""
+        height, width = frame.shape[:2]
+        if not self.max_width or width <= self.max_width:
+            if self._small is None or self._small.shape != frame.shape:
+                self._small = np.empty_like(frame)
+            np.copyto(self._small, frame)
+            return self._small
+        size = (self.max_width, max(1, int(height * self.max_width / width)))
+        if self._small is None or self._small.shape[:2] != size[::-1]:
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        return self._small
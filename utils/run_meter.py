@@ -0,0 +1,49 @@
+import time
+from collections import deque
+
+
+class RunMeter:
+    """Script executions per minute and server process CPU usage
+
+    record_run() is called once at the top of every Streamlit script run;
+    sample() can be called from long-running loops to keep the CPU figure
+    fresh. CPU is process time (all threads) over wall time in the window.
+    """
+
+    def __init__(self, window=60.0):
+        self.window = window
+        self.total_runs = 0
+        self.started_at = time.time()
+        self._runs = deque()
+        self._samples = deque([(self.started_at, time.process_time())])
+
+    def record_run(self):
+        """Count one script execution"""
+        now = time.time()
+        self.total_runs += 1
+        self._runs.append(now)
+        self.sample(now)
+
+    def sample(self, now=None):
+        """Record a (wall time, process time) point for the CPU figure"""
+        now = now or time.time()
+        self._samples.append((now, time.process_time()))
+        cutoff = now - self.window
+        while self._runs and self._runs[0] < cutoff:
+            self._runs.popleft()
+        while len(self._samples) > 2 and self._samples[1][0] < cutoff:
+            self._samples.popleft()
+
+    def get_stats(self):
+        """Runs per minute and CPU percent over the last window"""
+        now = time.time()
+        span = min(self.window, now - self.started_at) or 1e-9
+        (wall_start, cpu_start), (wall_end, cpu_end) = self._samples[0], self._samples[-1]
+        cpu_percent = 0.0
+        if wall_end > wall_start:
+            cpu_percent = 100 * (cpu_end - cpu_start) / (wall_end - wall_start)
+        return {
+            "runs_per_minute": 60 * len(self._runs) / span,
+            "total_runs": self.total_runs,
+            "cpu_percent": cpu_percent
+        }
@@ -0,0 +1,121 @@
+from datetime import datetime
+
+ROLLUP_FIELDS = ("count", "duration", "distractions", "focus_sum",
+                 "min_duration", "max_duration", "min_focus", "max_focus")
+
+
+def new_rollup():
+    """Empty rollup record"""
+    return {
+        "count": 0,
+        "duration": 0,
+        "distractions": 0,
+        "focus_sum": 0,
+        "min_duration": None,
+        "max_duration": None,
+        "min_focus": None,
+        "max_focus": None
+    }
+
+
+def add_to_rollup(rollup, session):
+    """Fold one session into a rollup in place"""
+    duration = session.get("duration", 0)
+    focus = session.get("focus_score", 0)
+    rollup["count"] += 1
+    rollup["duration"] += duration
+    rollup["distractions"] += session.get("distractions", 0)
+    rollup["focus_sum"] += focus
+    rollup["min_duration"] = duration if rollup["min_duration"] is None else min(rollup["min_duration"], duration)
+    rollup["max_duration"] = duration if rollup["max_duration"] is None else max(rollup["max_duration"], duration)
+    rollup["min_focus"] = focus if rollup["min_focus"] is None else min(rollup["min_focus"], focus)
+    rollup["max_focus"] = focus if rollup["max_focus"] is None else max(rollup["max_focus"], focus)
+
+
+def week_key(date):
+    """ISO week key ('2026-W03') for a YYYY-MM-DD date string"""
+    try:
+        return datetime.strptime(date, "%Y-%m-%d").strftime("%G-W%V")
+    except (TypeError, ValueError):
+        return "unknown"
+
+
+class SessionAggregates:
+    """Running statistics over the session history
+
+    Keeps an overall rollup plus per-day and per-ISO-week rollups. add() is
+    O(1), so statistics never need a pass over the history.
+    """
+
+    def __init__(self):
+        self.total = new_rollup()
+        self.daily = {}
+        self.weekly = {}
+
+    @classmethod
+    def from_sessions(cls, sessions):
+        """Recompute aggregates from scratch"""
+        aggregates = cls()
+        for session in sessions:
+            aggregates.add(session)
+        return aggregates
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls()
+        aggregates.total = dict(data["total"])
+        aggregates.daily = {k: dict(v) for k, v in data.get("daily", {}).items()}
+        aggregates.weekly = {k: dict(v) for k, v in data.get("weekly", {}).items()}
+        return aggregates
+
+    def to_dict(self):
+        return {"total": self.total, "daily": self.daily, "weekly": self.weekly}
+
+    def add(self, session):
+        """Fold one new session into every rollup"""
+        date = session.get("date") or "unknown"
+        add_to_rollup(self.total, session)
+        add_to_rollup(self.daily.setdefault(date, new_rollup()), session)
+        add_to_rollup(self.weekly.setdefault(week_key(date), new_rollup()), session)
+
+    def statistics(self):
+        """Overall statistics in the DataManager.get_statistics layout"""
+        return rollup_statistics(self.total)
+
+    def __eq__(self, other):
+        if not isinstance(other, SessionAggregates):
+            return NotImplemented
+        return (_rollups_equal(self.total, other.total)
+                and _rollup_maps_equal(self.daily, other.daily)
+                and _rollup_maps_equal(self.weekly, other.weekly))
+
+
+def rollup_statistics(rollup):
+    """Convert a rollup into the get_statistics dict"""
+    count = rollup["count"]
+    return {
+        "total_sessions": count,
+        "total_study_time": rollup["duration"],
+        "total_distractions": rollup["distractions"],
+        "avg_session_duration": rollup["duration"] / count if count else 0,
+        "avg_focus_score": rollup["focus_sum"] / count if count else 0,
+        "min_session_duration": rollup["min_duration"] or 0,
+        "max_session_duration": rollup["max_duration"] or 0,
+        "min_focus_score": rollup["min_focus"] or 0,
+        "max_focus_score": rollup["max_focus"] or 0
+    }
+
+
+def _rollups_equal(a, b):
+    for field in ROLLUP_FIELDS:
+        x, y = a.get(field), b.get(field)
+        if x is None or y is None:
+            if x is not y:
+                return False
+        elif abs(x - y) > 1e-6:
+            return False
+    return True
+
+
+def _rollup_maps_equal(a, b):
+    return a.keys() == b.keys() and all(_rollups_equal(a[k], b[k]) for k in a)
@@ -0,0 +1,658 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from itertools import islice
+import config
+from utils.file_lock import FileLock
+from utils.session_stats import ROLLUP_FIELDS, SessionAggregates, new_rollup, rollup_statistics, week_key
+
+SNAPSHOT_FORMAT = 2
+SESSION_COLUMNS = ("id", "start_time", "end_time", "duration", "distractions", "focus_score", "date", "time")
+EMPTY_STATISTICS = rollup_statistics(new_rollup())
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+def _dumps(record):
+    return json.dumps(record, separators=(",", ":"))
+
+
+def _fsync_write(path, lines):
+    """Write lines to path via a temporary file and an atomic rename"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class JsonLinesSessionStore:
+    """Append-only session storage: a compacted snapshot plus a log tail
+
+    Both files are JSON lines. The snapshot starts with a header line
+    holding the last assigned id and the SessionAggregates of the snapshot,
+    followed by one session per line. New sessions are appended to the log
+    with a single write + fsync; aggregates for the log tail are replayed on
+    load and then maintained in memory, and reloaded whenever signature()
+    shows another process changed the files.
+
+    Every mutation holds an exclusive FileLock, so ids are assigned from
+    the on-disk state and never collide across processes. Ids keep
+    increasing after a clear because the header remembers last_id.
+    compact() writes a new snapshot and swaps in an empty log, both via
+    temp file + rename; log records already covered by the snapshot header
+    are ignored, so a crash between the two renames never duplicates
+    sessions. Readers open both files under a shared lock and then read
+    the file handles they hold. A torn last line from a crash mid-append is
+    dropped by recover().
+    """
+
+    indexed = False
+
+    def __init__(self, data_file=config.DATA_FILE, compact_threshold=config.LOG_COMPACT_THRESHOLD):
+        base = os.path.splitext(data_file)[0]
+        self.legacy_file = data_file
+        self.snapshot_file = base + ".snapshot.jsonl"
+        self.log_file = base + ".log.jsonl"
+        self.lock = FileLock(base + ".lock")
+        self.compact_threshold = compact_threshold
+        self.aggregates = SessionAggregates()
+        self.last_write = (None, None)
+        self._seen_signature = None
+
+    def ensure(self):
+        """Create, migrate or recover the store files"""
+        directory = os.path.dirname(self.snapshot_file)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        with self.lock:
+            if not os.path.exists(self.snapshot_file):
+                if os.path.exists(self.legacy_file):
+                    self.migrate_legacy()
+                else:
+                    self.write_snapshot(self._new_header(), [])
+            self.recover()
+            self.load_aggregates()
+            self._seen_signature = self.signature()
+
+    def signature(self):
+        """Identity/mtime/size of both files; changes whenever the store changes"""
+        return (_file_signature(self.snapshot_file), _file_signature(self.log_file))
+
+    def _refresh(self):
+        signature = self.signature()
+        if signature != self._seen_signature:
+            self.load_aggregates()
+            self._seen_signature = signature
+
+    def _open_pair(self):
+        """Open snapshot and log together so a concurrent compaction can't split them"""
+        with self.lock.shared():
+            snapshot = open(self.snapshot_file, "r")
+            try:
+                log = open(self.log_file, "r")
+            except FileNotFoundError:
+                log = None
+        return snapshot, log
+
+    def load_aggregates(self):
+        """Snapshot aggregates plus a replay of the (bounded) log tail"""
+        snapshot, log = self._open_pair()
+        with snapshot:
+            header = json.loads(snapshot.readline())
+            if "aggregates" in header:
+                aggregates = SessionAggregates.from_dict(header["aggregates"])
+            else:
+                aggregates = SessionAggregates.from_sessions(json.loads(line) for line in snapshot if line.strip())
+        for session in _read_log(log):
+            if session.get("id", 0) > header["last_id"]:
+                aggregates.add(session)
+        self.aggregates = aggregates
+
+    def migrate_legacy(self):
+        """Import a whole-file sessions.json into the snapshot"""
+        with self.lock:
+            with open(self.legacy_file, "r") as f:
+                data = json.load(f)
+            sessions = data.get("sessions", [])
+            header = self._new_header()
+            header["created_at"] = data.get("created_at", header["created_at"])
+            header["last_id"] = max((s.get("id", 0) for s in sessions), default=0)
+            self.write_snapshot(header, sessions)
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+
+    def recover(self):
+        """Truncate a torn trailing record left by an interrupted append"""
+        with self.lock:
+            if not os.path.exists(self.log_file):
+                open(self.log_file, "a").close()
+                return
+
+            valid_end = 0
+            with open(self.log_file, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        json.loads(line)
+                    except ValueError:
+                        break
+                    valid_end += len(line)
+            size = os.path.getsize(self.log_file)
+            if valid_end != size:
+                print(f"Recovering session log: dropping {size - valid_end} trailing bytes")
+                with open(self.log_file, "r+b") as f:
+                    f.truncate(valid_end)
+
+    def read_header(self):
+        """Read the snapshot header line"""
+        with open(self.snapshot_file, "r") as f:
+            return json.loads(f.readline())
+
+    def iter_sessions(self):
+        """Yield every stored session in id order without loading the whole history"""
+        snapshot, log = self._open_pair()
+        with snapshot:
+            header = json.loads(snapshot.readline())
+            for line in snapshot:
+                if line.strip():
+                    yield json.loads(line)
+        for session in _read_log(log):
+            if session.get("id", 0) > header["last_id"]:
+                yield session
+
+    def iter_range(self, start_date=None, end_date=None, after_id=0):
+        """Yield sessions with id > after_id dated within [start_date, end_date], in id order
+
+        Either date bound may be None for an open range. Streams the files,
+        so memory stays constant however long the history is.
+        """
+        for session in self.iter_sessions():
+            if session.get("id", 0) <= after_id:
+                continue
+            date = session.get("date", "")
+            if (start_date is None or date >= start_date) and (end_date is None or date <= end_date):
+                yield session
+
+    def iter_reversed(self):
+        """Yield every stored session newest first, reading the snapshot backwards from its end"""
+        snapshot, log = self._open_pair()
+        with snapshot:
+            snapshot = snapshot.buffer
+            header = json.loads(snapshot.readline())
+            header_end = snapshot.tell()
+            # The log tail is short (compacted every compact_threshold sessions)
+            tail = [s for s in _read_log(log) if s.get("id", 0) > header["last_id"]]
+            yield from reversed(tail)
+            for line in _reverse_lines(snapshot, header_end):
+                yield json.loads(line)
+
+    def page(self, cursor=None, limit=config.HISTORY_PAGE_SIZE, start_date=None, end_date=None,
+             newest_first=True):
+        """Up to limit sessions after cursor (an id; None starts at the newest or oldest)
+
+        Newest-first pages read the files backwards from the end, so recent
+        pages are cheap and memory is O(limit); a page deep into the
+        history still parses every newer session on the way.
+        """
+        if not newest_first:
+            return list(islice(self.iter_range(start_date, end_date, cursor or 0), limit))
+        sessions = []
+        for session in self.iter_reversed():
+            date = session.get("date", "")
+            if cursor is not None and session.get("id", 0) >= cursor:
+                continue
+            if (start_date is None or date >= start_date) and (end_date is None or date <= end_date):
+                sessions.append(session)
+                if len(sessions) >= limit:
+                    break
+        return sessions
+
+    def last_id(self):
+        """Highest session id ever assigned"""
+        return self._scan_log()[0]
+
+    def _scan_log(self):
+        """(last id, number of log records) from the header and the log tail"""
+        snapshot, log = self._open_pair()
+        with snapshot:
+            last = json.loads(snapshot.readline())["last_id"]
+        count = 0
+        for session in _read_log(log):
+            last = max(last, session.get("id", 0))
+            count += 1
+        return last, count
+
+    def metadata(self):
+        """Store-level metadata such as created_at / reset_at"""
+        header = self.read_header()
+        return {k: v for k, v in header.items()
+                if k not in ("format", "count", "last_id", "aggregates", "total_study_time", "total_distractions")}
+
+    def add(self, session):
+        """Assign the next id and append, all under the exclusive lock
+
+        last_write holds the store signature just before and after the
+        append, so callers can tell whether anyone else wrote in between.
+        """
+        with self.lock:
+            before = self.signature()
+            self._refresh()
+            last, pending = self._scan_log()
+            session = dict(session, id=last + 1)
+            self.append(session)
+            self.aggregates.add(session)
+            if pending + 1 >= self.compact_threshold:
+                self.compact()
+            self._seen_signature = self.signature()
+            self.last_write = (before, self._seen_signature)
+        return session
+
+    def sessions_between(self, start_date, end_date):
+        """Sessions whose date is within [start_date, end_date] (YYYY-MM-DD)"""
+        return [s for s in self.iter_sessions() if start_date <= s.get("date", "") <= end_date]
+
+    def statistics(self):
+        """Totals and averages from the running aggregates (O(1))"""
+        self._refresh()
+        return self.aggregates.statistics()
+
+    def get_aggregates(self):
+        """Current SessionAggregates"""
+        self._refresh()
+        return self.aggregates
+
+    def rebuild_aggregates(self):
+        """Recompute aggregates from every session and persist them"""
+        self.compact()
+
+    def append(self, session):
+        """Durably append one session record to the log"""
+        with self.lock:
+            with open(self.log_file, "a") as f:
+                f.write(_dumps(session) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact(self):
+        """Fold the log tail into a new snapshot and start an empty log"""
+        with self.lock:
+            header = self.read_header()
+            sessions = list(self.iter_sessions())
+            header["last_id"] = max([header["last_id"]] + [s.get("id", 0) for s in sessions])
+            header["compacted_at"] = datetime.now().isoformat()
+            self.write_snapshot(header, sessions)
+            self._reset_log()
+            self._seen_signature = self.signature()
+
+    def write_snapshot(self, header, sessions):
+        """Atomically replace the snapshot; aggregates are recomputed from sessions"""
+        aggregates = SessionAggregates.from_sessions(sessions)
+        header = dict(header, format=SNAPSHOT_FORMAT, count=len(sessions), aggregates=aggregates.to_dict())
+        header["total_study_time"] = aggregates.total["duration"]
+        header["total_distractions"] = aggregates.total["distractions"]
+        lines = [_dumps(header)]
+        lines.extend(_dumps(s) for s in sessions)
+        with self.lock:
+            _fsync_write(self.snapshot_file, lines)
+        self.aggregates = aggregates
+
+    def replace_all(self, header, sessions):
+        """Replace the whole history (snapshot rewrite + empty log)"""
+        with self.lock:
+            header = dict(header)
+            header["last_id"] = max([header.get("last_id", 0), self.last_id()] + [s.get("id", 0) for s in sessions])
+            self.write_snapshot(header, sessions)
+            self._reset_log()
+            self._seen_signature = self.signature()
+
+    def _reset_log(self):
+        _fsync_write(self.log_file, [])
+
+    def _new_header(self):
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "last_id": 0,
+            "total_study_time": 0,
+            "total_distractions": 0,
+            "created_at": datetime.now().isoformat()
+        }
+
+
+def _reverse_lines(f, start, block_size=1 << 16):
+    """Yield the non-empty lines of binary file f after offset start, last line first"""
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    partial = b""
+    while position > start:
+        size = min(block_size, position - start)
+        position -= size
+        f.seek(position)
+        lines = (f.read(size) + partial).split(b"\n")
+        partial = lines[0]
+        for line in reversed(lines[1:]):
+            if line.strip():
+                yield line
+    if partial.strip():
+        yield partial
+
+
+def _read_log(log):
+    """Yield complete records from an open log handle, stopping at a torn line"""
+    if log is None:
+        return
+    with log:
+        for line in log:
+            if not line.endswith("\n"):
+                return
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+
+class SqliteSessionStore:
+    """SQLite session storage with indexed date queries and SQL aggregates
+
+    Runs in WAL mode so readers never block the writer. Ids come from an
+    AUTOINCREMENT key and are never reused, even after clearing. Session
+    keys outside the fixed columns are kept in a JSON "extra" column.
+    Concurrent writers from other processes are serialised by SQLite's
+    own locking (busy timeout 30 s). Running aggregates live in a rollups table (one row for the whole
+    history, one per day, one per ISO week) upserted in the same
+    transaction as each insert.
+    """
+
+    def __init__(self, data_file=config.DATA_FILE):
+        self.legacy_file = data_file
+        self.db_file = os.path.splitext(data_file)[0] + ".db"
+        self._conn = None
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.last_write = (None, None)
+
+    indexed = True
+
+    def signature(self):
+        """Changes on commits by other connections (data_version) or by this one"""
+        with self._lock:
+            data_version = self._connect().execute("PRAGMA data_version").fetchone()[0]
+        return (data_version, self.generation)
+
+    def ensure(self):
+        """Create the schema and import existing JSON data on first use"""
+        directory = os.path.dirname(self.db_file)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        conn = self._connect()
+        with self._lock, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    start_time TEXT,
+                    end_time TEXT,
+                    duration INTEGER NOT NULL DEFAULT 0,
+                    distractions INTEGER NOT NULL DEFAULT 0,
+                    focus_score REAL NOT NULL DEFAULT 100,
+                    date TEXT,
+                    time TEXT,
+                    extra TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON sessions(start_time)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    period TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    duration INTEGER NOT NULL,
+                    distractions INTEGER NOT NULL,
+                    focus_sum REAL NOT NULL,
+                    min_duration INTEGER,
+                    max_duration INTEGER,
+                    min_focus REAL,
+                    max_focus REAL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('created_at', ?)", (datetime.now().isoformat(),))
+            imported = conn.execute("SELECT value FROM meta WHERE key = 'imported'").fetchone()
+        if imported is None:
+            self._import_json()
+            self.rebuild_aggregates()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def _import_json(self):
+        """One-time import from the JSON-lines store or a legacy sessions.json"""
+        sessions = []
+        jsonl = JsonLinesSessionStore(self.legacy_file)
+        if os.path.exists(jsonl.snapshot_file):
+            sessions = list(jsonl.iter_sessions())
+        elif os.path.exists(self.legacy_file):
+            with open(self.legacy_file, "r") as f:
+                sessions = json.load(f).get("sessions", [])
+        conn = self._connect()
+        with self._lock, conn:
+            conn.executemany(self._insert_sql(True), [self._to_row(s, True) for s in sessions])
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('imported', ?)", (str(len(sessions)),))
+
+    def _insert_sql(self, with_id):
+        columns = SESSION_COLUMNS if with_id else SESSION_COLUMNS[1:]
+        names = ", ".join(columns + ("extra",))
+        marks = ", ".join("?" for _ in columns + ("extra",))
+        return f"INSERT INTO sessions ({names}) VALUES ({marks})"
+
+    def _to_row(self, session, with_id):
+        columns = SESSION_COLUMNS if with_id else SESSION_COLUMNS[1:]
+        extra = {k: v for k, v in session.items() if k not in SESSION_COLUMNS}
+        return tuple(session.get(c) for c in columns) + (json.dumps(extra) if extra else None,)
+
+    def _to_session(self, row):
+        session = {c: row[c] for c in SESSION_COLUMNS}
+        if row["extra"]:
+            session.update(json.loads(row["extra"]))
+        return session
+
+    def metadata(self):
+        """Store-level metadata such as created_at / reset_at"""
+        with self._lock:
+            rows = self._connect().execute("SELECT key, value FROM meta WHERE key != 'imported'").fetchall()
+        return {row["key"]: row["value"] for row in rows}
+
+    def add(self, session):
+        """Insert a session; SQLite assigns the id
+
+        BEGIN IMMEDIATE takes the write lock up front, so the data_version
+        read inside the transaction tells whether anyone else committed
+        since the caller last looked (see last_write).
+        """
+        session = {k: v for k, v in session.items() if k != "id"}
+        conn = self._connect()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+                cursor = conn.execute(self._insert_sql(False), self._to_row(session, False))
+                self._upsert_rollups(conn, session)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self.generation += 1
+            self.last_write = ((data_version, self.generation - 1), (data_version, self.generation))
+        return dict(session, id=cursor.lastrowid)
+
+    def _upsert_rollups(self, conn, session):
+        date = session.get("date") or "unknown"
+        duration = session.get("duration", 0)
+        focus = session.get("focus_score", 0)
+        row = (duration, session.get("distractions", 0), focus, duration, duration, focus, focus)
+        for period in ("all", "day:" + date, "week:" + week_key(date)):
+            conn.execute("""
+                INSERT INTO rollups VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(period) DO UPDATE SET
+                    count = count + 1,
+                    duration = duration + excluded.duration,
+                    distractions = distractions + excluded.distractions,
+                    focus_sum = focus_sum + excluded.focus_sum,
+                    min_duration = MIN(min_duration, excluded.min_duration),
+                    max_duration = MAX(max_duration, excluded.max_duration),
+                    min_focus = MIN(min_focus, excluded.min_focus),
+                    max_focus = MAX(max_focus, excluded.max_focus)
+            """, (period,) + row)
+
+    def get_aggregates(self):
+        """SessionAggregates read back from the rollups table"""
+        with self._lock:
+            rows = self._connect().execute("SELECT * FROM rollups").fetchall()
+        aggregates = SessionAggregates()
+        for row in rows:
+            rollup = {field: row[field] for field in ROLLUP_FIELDS}
+            kind, _, key = row["period"].partition(":")
+            if kind == "all":
+                aggregates.total = rollup
+            elif kind == "day":
+                aggregates.daily[key] = rollup
+            elif kind == "week":
+                aggregates.weekly[key] = rollup
+        return aggregates
+
+    def rebuild_aggregates(self):
+        """Recompute the rollups table from the sessions table"""
+        aggregates = SessionAggregates.from_sessions(self.iter_sessions())
+        rows = [("all", aggregates.total)]
+        rows += [("day:" + k, v) for k, v in aggregates.daily.items()]
+        rows += [("week:" + k, v) for k, v in aggregates.weekly.items()]
+        conn = self._connect()
+        with self._lock, conn:
+            conn.execute("DELETE FROM rollups")
+            self.generation += 1
+            conn.executemany(
+                "INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(period,) + tuple(r[f] for f in ROLLUP_FIELDS) for period, r in rows if r["count"]]
+            )
+
+    def iter_sessions(self):
+        """Yield every stored session in id order"""
+        with self._lock:
+            cursor = self._connect().execute("SELECT * FROM sessions ORDER BY id")
+            rows = cursor.fetchmany(1000)
+        while rows:
+            for row in rows:
+                yield self._to_session(row)
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+
+    def _range_query(self, start_date, end_date, id_clause, id_value):
+        clauses, params = [], []
+        if id_value is not None:
+            clauses.append(id_clause)
+            params.append(id_value)
+        if start_date is not None:
+            clauses.append("date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append("date <= ?")
+            params.append(end_date)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def iter_range(self, start_date=None, end_date=None, after_id=0):
+        """Yield sessions with id > after_id dated within [start_date, end_date], in id order
+
+        Rows are fetched in batches, so memory stays constant.
+        """
+        where, params = self._range_query(start_date, end_date, "id > ?", after_id)
+        with self._lock:
+            cursor = self._connect().execute(f"SELECT * FROM sessions{where} ORDER BY id", params)
+            rows = cursor.fetchmany(1000)
+        while rows:
+            for row in rows:
+                yield self._to_session(row)
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+
+    def page(self, cursor=None, limit=config.HISTORY_PAGE_SIZE, start_date=None, end_date=None,
+             newest_first=True):
+        """Up to limit sessions after cursor (an id; None starts at the newest or oldest)
+
+        Keyset pagination on the primary key: each page is one indexed
+        range scan, however deep into the history it is.
+        """
+        id_clause, order = ("id < ?", "DESC") if newest_first else ("id > ?", "ASC")
+        where, params = self._range_query(start_date, end_date, id_clause, cursor)
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT * FROM sessions{where} ORDER BY id {order} LIMIT ?", params + [limit]
+            ).fetchall()
+        return [self._to_session(row) for row in rows]
+
+    def sessions_between(self, start_date, end_date):
+        """Sessions whose date is within [start_date, end_date], via the date index"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT * FROM sessions WHERE date BETWEEN ? AND ? ORDER BY id",
+                (start_date, end_date)
+            ).fetchall()
+        return [self._to_session(row) for row in rows]
+
+    def statistics(self):
+        """Totals and averages from the maintained rollup row (O(1))"""
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM rollups WHERE period = 'all'").fetchone()
+        if row is None:
+            return dict(EMPTY_STATISTICS)
+        return rollup_statistics({field: row[field] for field in ROLLUP_FIELDS})
+
+    def replace_all(self, header, sessions):
+        """Replace the whole history; ids keep increasing across clears"""
+        conn = self._connect()
+        with self._lock, conn:
+            conn.execute("DELETE FROM sessions")
+            self.generation += 1
+            conn.executemany(self._insert_sql(True), [self._to_row(s, True) for s in sessions if "id" in s])
+            conn.executemany(self._insert_sql(False), [self._to_row(s, False) for s in sessions if "id" not in s])
+            for key, value in header.items():
+                if key not in ("total_study_time", "total_distractions", "last_id"):
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+        self.rebuild_aggregates()
+
+    def compact(self):
+        """Checkpoint the WAL into the main database file"""
+        with self._lock:
+            self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_session_store(data_file=config.DATA_FILE, backend=config.STORAGE_BACKEND):
+    """Build the configured session store backend"""
+    if backend == "sqlite":
+        return SqliteSessionStore(data_file)
+    if backend == "jsonl":
+        return JsonLinesSessionStore(data_file)
+    raise ValueError(f"Unknown storage backend: {backend}")
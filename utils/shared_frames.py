@@ -0,0 +1,495 @@
+import multiprocessing
+import os
+import queue
+import struct
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+import config
+from utils.attention import is_attentive
+from utils.detection_engine import PipelineStage
+from utils.face_detector import FaceDetector, create_face_detector
+from utils.frame_source import create_frame_source
+from utils.preview import PreviewEncoder
+
+# Detection result passed back from workers: seq, timestamp, face, confidence, box, latency
+RESULT_STRUCT = struct.Struct("<qdBfffffdBff")
+
+# Header layout (int64 words): head seq, finished flag, released seq, then one seq per slot
+_HEAD, _FINISHED, _RELEASED, _SLOTS = 0, 1, 2, 3
+_WRITING = -1
+
+# End-of-stream marker for the preview render thread
+_END = object()
+
+
+class SharedFrameRing:
+    """Fixed ring of preallocated BGR frame slots in shared memory
+
+    One writer (the capture process) fills slot seq % slots in place, then
+    publishes its sequence number and timestamp; readers in any process get
+    numpy views of the slot without copying. A slot is marked as being
+    written while it is filled, and readers compare its sequence number
+    before and after use (valid()) to detect frames overwritten under them.
+    Frames are never queued: when readers fall behind, the writer simply
+    laps them and older frames are lost, unless it writes with block=True,
+    which waits until the consumer release()s the slot (used for recordings
+    that must not lose frames).
+    """
+
+    def __init__(self, slots=config.SHARED_RING_SLOTS, width=config.CAMERA_WIDTH,
+                 height=config.CAMERA_HEIGHT, channels=3, name=None):
+        self.slots = slots
+        self.shape = (height, width, channels)
+        header_size = 8 * (_SLOTS + slots) + 8 * slots
+        frame_size = int(np.prod(self.shape))
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_size + slots * frame_size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        buffer = self.shm.buf
+        self.header = np.ndarray((_SLOTS + slots,), dtype=np.int64, buffer=buffer)
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buffer, offset=8 * (_SLOTS + slots))
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buffer, offset=header_size)
+        if self.owner:
+            self.header[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """Arguments to attach to this ring from another process"""
+        return {"slots": self.slots, "width": self.shape[1], "height": self.shape[0],
+                "channels": self.shape[2], "name": self.name}
+
+    # Writer side
+
+    def begin_write(self, block=False, stop_event=None):
+        """(seq, view) of the next slot to fill; the slot is marked invalid until commit()
+
+        With block, waits until the frame previously in the slot was released;
+        returns (None, None) if stop_event is set meanwhile.
+        """
+        seq = int(self.header[_HEAD]) + 1
+        while block and seq - self.slots > self.header[_RELEASED]:
+            if stop_event is not None and stop_event.is_set():
+                return None, None
+            time.sleep(0.001)
+        index = seq % self.slots
+        self.header[_SLOTS + index] = _WRITING
+        return seq, self.frames[index]
+
+    def commit(self, seq, timestamp):
+        """Publish a slot filled after begin_write()"""
+        index = seq % self.slots
+        self.timestamps[index] = timestamp
+        self.header[_SLOTS + index] = seq
+        self.header[_HEAD] = seq
+
+    def finish(self):
+        """Mark the end of the stream"""
+        self.header[_FINISHED] = 1
+
+    # Reader side
+
+    def head(self):
+        """Sequence number of the newest complete frame (0 = none yet)"""
+        return int(self.header[_HEAD])
+
+    def finished(self):
+        return bool(self.header[_FINISHED])
+
+    def release(self, seq):
+        """Tell a blocking writer that frames up to seq are no longer needed"""
+        self.header[_RELEASED] = seq
+
+    def get(self, seq):
+        """(view, timestamp) of frame seq, or (None, None) if it was overwritten"""
+        index = seq % self.slots
+        if self.header[_SLOTS + index] != seq:
+            return None, None
+        return self.frames[index], float(self.timestamps[index])
+
+    def valid(self, seq):
+        """True if frame seq has not been overwritten since get()"""
+        return self.header[_SLOTS + seq % self.slots] == seq
+
+    def close(self):
+        """Detach; the creating side also frees the shared memory"""
+        self.header = self.timestamps = self.frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def pack_result(seq, result, latency):
+    x, y, w, h = result["box"] or (0.0, 0.0, 0.0, 0.0)
+    return RESULT_STRUCT.pack(seq, result["timestamp"], result["face_detected"], result["confidence"],
+                              x, y, w, h, latency, result.get("looking_away", False),
+                              result.get("yaw", 0.0), result.get("pitch", 0.0))
+
+
+def unpack_result(data):
+    """(seq, result dict, latency) from a packed worker result"""
+    seq, timestamp, face, confidence, x, y, w, h, latency, away, yaw, pitch = RESULT_STRUCT.unpack(data)
+    result = {
+        "timestamp": timestamp,
+        "face_detected": bool(face),
+        "confidence": confidence,
+        "box": (x, y, w, h) if face else None,
+        "looking_away": bool(away),
+        "yaw": yaw,
+        "pitch": pitch,
+        "detected_at": timestamp,
+        "skipped": False,
+        "frame": None
+    }
+    return seq, result, latency
+
+
+def capture_main(ring_spec, source_spec, realtime, block, stop_event):
+    """Capture process: decode frames straight into ring slots"""
+    ring = SharedFrameRing(**ring_spec)
+    height, width = ring.shape[:2]
+    source = create_frame_source(source_spec, width=width, height=height, realtime=realtime)
+    try:
+        while not stop_event.is_set():
+            seq, slot = ring.begin_write(block, stop_event)
+            if slot is None:
+                break
+            if not source.read_into(slot):
+                if source.live:
+                    time.sleep(0.05)
+                    continue
+                break
+            ring.commit(seq, source.timestamp)
+    except Exception as e:
+        print(f"Error in capture process: {e}")
+    finally:
+        ring.finish()
+        source.release()
+        ring.close()
+
+
+def inference_main(ring_spec, task_queue, result_queue, detector_factory, inference_mode):
+    """Inference worker: detect on ring views and send back packed results
+
+    A result whose frame was overwritten during detection is reported with
+    seq negated so the dispatcher can count and discard it.
+    """
+    ring = SharedFrameRing(**ring_spec)
+    detector = detector_factory()
+    face = FaceDetector(detector, mode=inference_mode)
+    try:
+        while True:
+            seq = task_queue.get()
+            if seq is None:
+                break
+            frame, timestamp = ring.get(seq)
+            if frame is None:
+                result_queue.put(RESULT_STRUCT.pack(-seq, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0.0, 0.0))
+                continue
+            start = time.perf_counter()
+            try:
+                result = face.detect(frame, timestamp)
+            except Exception as e:
+                print(f"Error in inference worker: {e}")
+                result = {"timestamp": timestamp, "face_detected": False, "confidence": 0.0, "box": None}
+            packed_seq = seq if ring.valid(seq) else -seq
+            result_queue.put(pack_result(packed_seq, result, time.perf_counter() - start))
+    finally:
+        detector.close()
+        ring.close()
+
+
+class SharedFrameDetector:
+    """Detection with capture and inference in separate processes
+
+    A capture process decodes frames into a SharedFrameRing; inference
+    worker processes run the detector on views of the ring slots. Only
+    sequence numbers (to workers) and packed result structs (back) cross
+    process boundaries, so no frame is ever pickled and detection does not
+    compete for this process's GIL. A dispatcher thread here hands the
+    newest frame to the pool (at most max_in_flight outstanding) and applies
+    the optional DetectionScheduler. For the preview it copies the frame out
+    of its slot (kept only if the slot was not overwritten meanwhile) and
+    hands it to a render thread through a drop-oldest queue, so resizing
+    and JPEG encoding never hold up dispatching. With more than one worker
+    the "roi" inference mode runs as "downscaled", since no worker sees
+    consecutive frames to track a face across. It mirrors DetectionEngine's
+    poll() / latest / preview / get_stats().
+    """
+
+    def __init__(self, source=config.FRAME_SOURCE, workers=config.SHARED_WORKERS,
+                 detector_factory=create_face_detector, inference_mode=config.INFERENCE_MODE,
+                 scheduler=None, slots=config.SHARED_RING_SLOTS, width=config.CAMERA_WIDTH,
+                 height=config.CAMERA_HEIGHT, realtime=True, queue_size=config.RESULT_QUEUE_SIZE,
+                 keep_frames=True, drop_when_full=True):
+        self.source = source
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_in_flight = self.workers * config.MONITOR_IN_FLIGHT_PER_WORKER
+        self.detector_factory = detector_factory
+        # Consecutive frames go to different workers, so each worker's ROI
+        # track would be several frames stale; track only with one worker
+        self.inference_mode = "downscaled" if inference_mode == "roi" and self.workers > 1 else inference_mode
+        self.scheduler = scheduler
+        self.slots = max(slots, self.max_in_flight + 2)
+        self.width = width
+        self.height = height
+        self.realtime = realtime
+        self.drop_when_full = drop_when_full
+        self.preview = PreviewEncoder() if keep_frames else None
+        self.results = queue.Queue(maxsize=queue_size)
+        self.render_stage = PipelineStage("render", config.PREVIEW_QUEUE_SIZE, drop_oldest=True)
+
+        self._context = multiprocessing.get_context("spawn")
+        self._ring = None
+        self._processes = []
+        self._thread = None
+        self._render_thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._process_stop = None
+
+        self.finished = False
+        self.latest = None
+        self._last_detection = None
+        self.in_flight = 0
+        self._pending = set()
+        self._dispatched = 0
+        self.frames_captured = 0
+        self.frames_dispatched = 0
+        self.frames_dropped = 0
+        self.stale_results = 0
+        self._capture_times = deque(maxlen=config.STATS_WINDOW)
+        self._detect_latencies = deque(maxlen=config.STATS_WINDOW)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Create the ring and start the capture process, workers and dispatcher"""
+        with self._lock:
+            if self.is_running():
+                return
+            self._stop_event.clear()
+            self.finished = False
+            self._ring = SharedFrameRing(self.slots, self.width, self.height)
+            ring_spec = self._ring.spec()
+            self._tasks = self._context.Queue()
+            self._results = self._context.Queue()
+            self._process_stop = self._context.Event()
+            self._processes = [
+                self._context.Process(target=capture_main, name="shared-capture", daemon=True,
+                                      args=(ring_spec, self.source, self.realtime, not self.drop_when_full,
+                                            self._process_stop))
+            ] + [
+                self._context.Process(target=inference_main, name=f"shared-infer-{i}", daemon=True,
+                                      args=(ring_spec, self._tasks, self._results, self.detector_factory,
+                                            self.inference_mode))
+                for i in range(self.workers)
+            ]
+            for process in self._processes:
+                process.start()
+            self.render_stage.queue = queue.Queue(maxsize=self.render_stage.queue.maxsize)
+            if self.preview is not None:
+                self._render_thread = threading.Thread(target=self._render_loop, name="shared-render",
+                                                       daemon=True)
+                self._render_thread.start()
+            self._thread = threading.Thread(target=self._dispatch_loop, name="shared-dispatch", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop all processes and free the ring
+
+        Queued results, the latest result and the scheduler state are
+        dropped too, so a restart does not hand the previous session's
+        results to the next.
+        """
+        with self._lock:
+            self._stop_event.set()
+            for thread in (self._thread, self._render_thread):
+                if thread is not None:
+                    thread.join(timeout)
+            # A dispatcher still shutting down keeps is_running() true, so
+            # start() cannot build a second ring before it has freed the first
+            if self._thread is not None and not self._thread.is_alive():
+                self._thread = None
+            self._render_thread = None
+            self.poll()
+            self.render_stage.queue = queue.Queue(maxsize=self.render_stage.queue.maxsize)
+            self.latest = None
+            self._last_detection = None
+            if self.scheduler is not None:
+                self.scheduler.reset()
+
+    def wait(self, timeout=None):
+        """Block until a recorded source has been fully processed"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished
+
+    def poll(self, max_items=None):
+        """Return all results queued since the last poll (non-blocking)"""
+        items = []
+        while max_items is None or len(items) < max_items:
+            try:
+                items.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def get_stats(self):
+        """Capture FPS, detection latency and ring/pool counters"""
+        times = list(self._capture_times)
+        latencies = list(self._detect_latencies)
+        capture_fps = 0.0
+        if len(times) > 1 and times[-1][0] > times[0][0]:
+            capture_fps = (times[-1][1] - times[0][1]) / (times[-1][0] - times[0][0])
+        return {
+            "capture_fps": capture_fps,
+            "detect_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "queue_depth": self.results.qsize(),
+            "frames_captured": self.frames_captured,
+            "frames_dispatched": self.frames_dispatched,
+            "frames_dropped": self.frames_dropped,
+            "stale_results": self.stale_results,
+            "in_flight": self.in_flight,
+            "workers": self.workers,
+            "running": self.is_running(),
+            "preview_dropped": self.render_stage.dropped,
+            **(self.preview.get_stats() if self.preview is not None else {}),
+            **(self.scheduler.get_stats() if self.scheduler is not None else {})
+        }
+
+    def _dispatch_loop(self):
+        ring = self._ring
+        self._pending.clear()
+        self._dispatched = 0
+        try:
+            while not self._stop_event.is_set():
+                head = ring.head()
+                if head != self.frames_captured:
+                    self.frames_captured = head
+                    self._capture_times.append((time.time(), head))
+                if head > self._dispatched:
+                    self._dispatch(ring, head)
+                elif ring.finished() and not self.in_flight:
+                    self.finished = True
+                    break
+                self._collect(ring, timeout=0.005)
+                ring.release(min(self._pending) - 1 if self._pending else self._dispatched)
+        except Exception as e:
+            print(f"Error in shared frame dispatcher: {e}")
+        finally:
+            self._shutdown()
+
+    def _dispatch(self, ring, head):
+        # Live sources only ever send the newest frame; recorded ones send every frame
+        first = self._dispatched + 1 if not self.drop_when_full else head
+        self.frames_dropped += first - self._dispatched - 1
+        for seq in range(first, head + 1):
+            while self.in_flight >= self.max_in_flight and not self._stop_event.is_set():
+                if self.drop_when_full:
+                    self.frames_dropped += 1
+                    self._dispatched = head
+                    return
+                self._collect(ring, timeout=0.05)
+            self._dispatched = seq
+            frame, timestamp = ring.get(seq)
+            if frame is None:
+                self.frames_dropped += 1
+                continue
+            if self.scheduler is not None and self._last_detection is not None and \
+                    not self.scheduler.should_run(timestamp, frame):
+                self._publish(dict(self._last_detection, timestamp=timestamp, skipped=True), ring, seq)
+                continue
+            self._tasks.put(seq)
+            self._pending.add(seq)
+            self.in_flight += 1
+            self.frames_dispatched += 1
+
+    def _collect(self, ring, timeout):
+        try:
+            data = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while data is not None:
+            self.in_flight -= 1
+            seq, result, latency = unpack_result(data)
+            self._pending.discard(abs(seq))
+            if seq < 0:
+                self.stale_results += 1
+            else:
+                self._detect_latencies.append(latency)
+                self._last_detection = dict(result)
+                if self.scheduler is not None:
+                    self.scheduler.record(result["timestamp"], is_attentive(result), result["confidence"])
+                self._publish(result, ring, seq)
+            try:
+                data = self._results.get_nowait()
+            except queue.Empty:
+                data = None
+
+    def _publish(self, result, ring, seq):
+        self.latest = result
+        if self.preview is not None:
+            frame, _ = ring.get(seq)
+            if frame is not None:
+                # The capture process may refill the slot while it is copied
+                frame = frame.copy()
+                if ring.valid(seq):
+                    self.render_stage.put((frame, result), self._stop_event)
+        while True:
+            try:
+                self.results.put_nowait(result)
+                return
+            except queue.Full:
+                if not self.drop_when_full:
+                    time.sleep(0.01)
+                    if self._stop_event.is_set():
+                        return
+                    continue
+                try:
+                    self.results.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _render_loop(self):
+        stage = self.render_stage
+        while True:
+            item = stage.get(self._stop_event)
+            if item is None or item is _END:
+                return
+            frame, result = item
+            start = time.perf_counter()
+            self.preview.render(frame, result["box"])
+            stage.latency.add(time.perf_counter() - start)
+            stage.processed += 1
+
+    def _shutdown(self):
+        if self.preview is not None:
+            self.render_stage.put(_END, self._stop_event)
+        if self._process_stop is not None:
+            self._process_stop.set()
+        for _ in range(self.workers):
+            try:
+                self._tasks.put(None)
+            except Exception:
+                pass
+        for process in self._processes:
+            process.join(2.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import config
+from utils.attention import STATES
+
+FRAME_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("face", "u1"),
+    ("skipped", "u1"),
+    ("state", "u1"),
+    ("confidence", "<f4"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("w", "<f4"),
+    ("h", "<f4")
+])
+
+EVENT_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("kind", "u1"),
+    ("previous", "u1"),
+    ("state", "u1")
+])
+
+EVENT_KINDS = ("transition", "alert")
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+
+def timeline_paths(key, directory=config.TIMELINE_DIR):
+    """Frame and event file paths for a session timeline"""
+    base = os.path.join(directory, key)
+    return base + ".frames.bin", base + ".events.bin"
+
+
+def load_timeline(key, directory=config.TIMELINE_DIR):
+    """Memory-map a recorded timeline as (frames, events) structured arrays
+
+    Nothing is read into memory until the arrays are sliced.
+    """
+    arrays = []
+    for path, dtype in zip(timeline_paths(key, directory), (FRAME_DTYPE, EVENT_DTYPE)):
+        if os.path.exists(path) and os.path.getsize(path) >= dtype.itemsize:
+            arrays.append(np.memmap(path, dtype=dtype, mode="r"))
+        else:
+            arrays.append(np.empty(0, dtype=dtype))
+    return tuple(arrays)
+
+
+class TimelineRecorder:
+    """Per-session record of detection results and attention transitions
+
+    Rows go into preallocated numpy chunks that are appended to raw binary
+    files (fixed little-endian record layout, see FRAME_DTYPE / EVENT_DTYPE)
+    whenever a chunk fills, so memory stays at one chunk no matter how
+    long the session runs. Read back with load_timeline().
+    """
+
+    def __init__(self, key, directory=config.TIMELINE_DIR, chunk_size=config.TIMELINE_CHUNK_SIZE):
+        self.key = key
+        self.directory = directory
+        self.frames_file, self.events_file = timeline_paths(key, directory)
+        self.frames = np.zeros(chunk_size, dtype=FRAME_DTYPE)
+        self.events = np.zeros(max(16, chunk_size // 64), dtype=EVENT_DTYPE)
+        self.frame_count = 0
+        self.event_count = 0
+        self.frames_written = 0
+        self.events_written = 0
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def record(self, result, state):
+        """Add one detection result row"""
+        if self.frame_count == len(self.frames):
+            self._flush_frames()
+        x, y, w, h = result["box"] or (0.0, 0.0, 0.0, 0.0)
+        self.frames[self.frame_count] = (
+            result["timestamp"], result["face_detected"], result.get("skipped", False),
+            STATE_CODES[state], result["confidence"], x, y, w, h
+        )
+        self.frame_count += 1
+
+    def record_event(self, event):
+        """Add one AttentionEvent"""
+        if self.event_count == len(self.events):
+            self._flush_events()
+        self.events[self.event_count] = (
+            event.timestamp, EVENT_KINDS.index(event.kind),
+            STATE_CODES[event.previous], STATE_CODES[event.state]
+        )
+        self.event_count += 1
+
+    def flush(self):
+        """Write buffered rows to disk"""
+        self._flush_frames()
+        self._flush_events()
+
+    def close(self):
+        """Flush and return the number of (frames, events) recorded"""
+        self.flush()
+        return self.frames_written, self.events_written
+
+    def _flush_frames(self):
+        if self.frame_count:
+            with open(self.frames_file, "ab") as f:
+                self.frames[:self.frame_count].tofile(f)
+            self.frames_written += self.frame_count
+            self.frame_count = 0
+
+    def _flush_events(self):
+        if self.event_count:
+            with open(self.events_file, "ab") as f:
+                self.events[:self.event_count].tofile(f)
+            self.events_written += self.event_count
+            self.event_count = 0
@@ -0,0 +1,51 @@
+import time
+
+import config
+from utils.detection_engine import DetectionEngine, draw_box
+from utils.face_detector import create_face_detector
+
+
+class AttentionVideoProcessor:
+    """streamlit-webrtc video processor that runs face detection per frame
+
+    recv() is called on streamlit-webrtc's worker thread for every browser
+    frame, so detection runs at camera rate independently of script runs.
+    Results go into a push-mode DetectionEngine (source=None) that the
+    script's polling loop drains with poll(); the annotated frame goes
+    straight back to the browser, so frames never pass through Streamlit.
+    """
+
+    def __init__(self, scheduler=None, detector_factory=create_face_detector,
+                 inference_mode=config.INFERENCE_MODE):
+        self.engine = DetectionEngine(source=None, detector_factory=detector_factory,
+                                      keep_frames=False, scheduler=scheduler,
+                                      inference_mode=inference_mode)
+
+    @property
+    def scheduler(self):
+        return self.engine.scheduler
+
+    @property
+    def latest(self):
+        return self.engine.latest
+
+    def recv(self, frame):
+        import av
+
+        image = frame.to_ndarray(format="bgr24")
+        try:
+            result = self.engine.process_frame(image, time.time())
+            draw_box(image, result["box"], color=(234, 126, 102))
+        except Exception as e:
+            print(f"Error processing WebRTC frame: {e}")
+        return av.VideoFrame.from_ndarray(image, format="bgr24")
+
+    def set_distraction_threshold(self, seconds):
+        self.engine.scheduler.set_distraction_threshold(seconds)
+
+    def poll(self, max_items=None):
+        """Return all results produced since the last poll"""
+        return self.engine.poll(max_items)
+
+    def get_stats(self):
+        return self.engine.get_stats()